@@ -0,0 +1,95 @@
+"""
+記錄輸出效能測試
+
+比較各種逐檔記錄輸出每筆的寫入成本，並與 scan_files 掃描每個檔案的成本對照：
+輸出的成本應低於掃描本身，匯出上百萬個檔案時才不會成為瓶頸。
+
+執行方式:
+    PYTHONPATH=src python benchmarks/bench_export.py
+"""
+
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+
+from day_11_file_organizer.exporters import open_record_writer
+from day_11_file_organizer.models import FileStats
+from day_11_file_organizer.scanner import scan_files
+
+# 寫入的記錄數
+RECORD_COUNT = 500_000
+
+# 掃描對照用的檔案數
+SCAN_FILES = 20_000
+
+FORMATS = [".jsonl", ".csv", ".fcol"]
+
+TYPES = ["jpg", "pdf", "doc", "mp4", "zip", "txt", "png", "other"]
+
+
+def make_records(rng: random.Random) -> list:
+    """產生常見樣式的 FileStats（5% 失敗）"""
+    records = []
+    for i in range(RECORD_COUNT):
+        folder = f"/home/user/Downloads/project_{rng.randrange(500)}/sub_{rng.randrange(20)}"
+        name = f"IMG_{i}.{rng.choice(TYPES)}"
+        failed = rng.random() < 0.05
+        records.append(
+            FileStats(
+                original_path=f"{folder}/{name}",
+                filename=name,
+                size_bytes=rng.randrange(1, 1 << 30),
+                modified_time=datetime.fromtimestamp(rng.randrange(1_300_000_000, 1_700_000_000)),
+                year=rng.randrange(2011, 2024),
+                file_type=rng.choice(TYPES),
+                success=not failed,
+                error_message="權限不足: [Errno 13] Permission denied" if failed else "",
+            )
+        )
+    return records
+
+
+def bench_scan(folder: str) -> float:
+    """scan_files 每個檔案的平均時間（奈秒）"""
+    for d in range(SCAN_FILES // 100):
+        sub = os.path.join(folder, f"d{d}")
+        os.mkdir(sub)
+        for i in range(100):
+            open(os.path.join(sub, f"f{i}.txt"), "w").close()
+
+    start = time.perf_counter()
+    count = sum(1 for _ in scan_files(folder))
+    return (time.perf_counter() - start) / count * 1e9
+
+
+def main() -> None:
+    rng = random.Random(42)
+    records = make_records(rng)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tree = os.path.join(tmp, "tree")
+        os.mkdir(tree)
+        scan_ns = bench_scan(tree)
+
+        print(f"{'格式':>8} {'ns/筆':>10} {'MB':>8} {'位元組/筆':>10}")
+        for ext in FORMATS:
+            path = os.path.join(tmp, f"records{ext}")
+            start = time.perf_counter()
+            writer = open_record_writer(path)
+            for stats in records:
+                writer.write(stats)
+            writer.close()
+            per_record = (time.perf_counter() - start) / len(records) * 1e9
+            size = os.path.getsize(path)
+            print(
+                f"{ext:>8} {per_record:>10.0f} {size / 1024 / 1024:>8.1f}"
+                f" {size / len(records):>10.1f}"
+            )
+
+    print(f"\nscan_files 對照: {scan_ns:.0f} ns/檔案（快取中的本機檔案系統，實際磁碟更慢）")
+
+
+if __name__ == "__main__":
+    main()
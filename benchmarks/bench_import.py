@@ -0,0 +1,158 @@
+"""
+啟動時間測試（匯入時間預算）
+
+以 python -X importtime 在新的程序中匯入 day_11_file_organizer.main，取多次中最快的
+一次與預算比較；另外確認 GUI、互動輸入、報告、多程序，以及只有特定選項才用到的
+模組（增量索引、規則檔、重複偵測、逐檔輸出、監看等）沒有在匯入時被載入，
+以及 -s / -t 都指定的排程執行（-q）不會載入 tkinter、互動輸入與沒有指定的選項。
+超出預算或載入了不該載入的模組時以結束碼 1 結束，可放進 CI。
+預算與機器有關，可用 --budget-ms 調整；模組檢查則與機器無關。
+
+執行方式:
+    PYTHONPATH=src python benchmarks/bench_import.py --budget-ms 120
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List
+
+# 匯入 day_11_file_organizer.main 時不應載入的模組（用到時才匯入）
+LAZY_MODULES = [
+    "tkinter",
+    "rich.prompt",
+    "rich.live",
+    "asyncio",
+    "multiprocessing",
+    "concurrent.futures.process",
+    "ctypes",
+    "day_11_file_organizer.reporter",
+    "day_11_file_organizer.roast",
+    # 只有對應的選項或流程才用到
+    "sqlite3",
+    "tomllib",
+    "hashlib",
+    "csv",
+    "json",
+    "day_11_file_organizer.cleanup",
+    "day_11_file_organizer.dedup",
+    "day_11_file_organizer.exporters",
+    "day_11_file_organizer.filters",
+    "day_11_file_organizer.index",
+    "day_11_file_organizer.journal",
+    "day_11_file_organizer.planner",
+    "day_11_file_organizer.rules",
+    "day_11_file_organizer.watcher",
+]
+
+# 匯入時間預算（毫秒）
+DEFAULT_BUDGET_MS = 120.0
+
+# 排程執行（-s、-t、-q）整個流程都不需要的模組
+UNUSED_IN_BATCH = [
+    "tkinter",
+    "rich.prompt",
+    "rich.live",
+    "asyncio",
+    "multiprocessing",
+    "sqlite3",
+    "tomllib",
+    "hashlib",
+    "day_11_file_organizer.dedup",
+    "day_11_file_organizer.exporters",
+    "day_11_file_organizer.index",
+    "day_11_file_organizer.rules",
+    "day_11_file_organizer.watcher",
+]
+
+RUNS = 10
+
+
+def _env() -> Dict[str, str]:
+    env = dict(os.environ)
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (src, env.get("PYTHONPATH")) if p)
+    return env
+
+
+def import_ms() -> float:
+    """匯入 day_11_file_organizer.main 的累計時間（毫秒，importtime 的最後一行）"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import day_11_file_organizer.main"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=_env(),
+    )
+    last = completed.stderr.strip().splitlines()[-1]
+    return int(last.split("|")[1]) / 1000
+
+
+def loaded_modules(code: str) -> List[str]:
+    """在新的程序中執行 code，回傳 LAZY_MODULES 中已被載入的模組"""
+    script = (
+        f"{code}\nimport sys\n"
+        f"print(' '.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=_env(),
+    )
+    return completed.stdout.split()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="匯入時間預算檢查")
+    parser.add_argument(
+        "--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="匯入時間預算（毫秒）"
+    )
+    parser.add_argument("--runs", type=int, default=RUNS, help="取最快一次的執行次數")
+    args = parser.parse_args()
+
+    failures: List[str] = []
+
+    times = sorted(import_ms() for _ in range(max(1, args.runs)))
+    best, median = times[0], times[len(times) // 2]
+    print(
+        f"匯入 day_11_file_organizer.main: 最快 {best:.1f} ms，"
+        f"中位數 {median:.1f} ms（預算 {args.budget_ms:.0f} ms）"
+    )
+    if best > args.budget_ms:
+        failures.append(f"匯入時間 {best:.1f} ms 超出預算 {args.budget_ms:.0f} ms")
+
+    eager = loaded_modules("import day_11_file_organizer.main")
+    print(f"匯入時載入的延遲模組: {', '.join(eager) or '無'}")
+    if eager:
+        failures.append(f"匯入時不應載入: {', '.join(eager)}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "source")
+        os.mkdir(source)
+        with open(os.path.join(source, "a.txt"), "w") as f:
+            f.write("x")
+        argv = ["file-organizer", "-s", source, "-t", os.path.join(tmp, "target"), "-q"]
+        batch = loaded_modules(
+            "import contextlib, io, sys\n"
+            "from day_11_file_organizer import main\n"
+            f"sys.argv = {argv!r}\n"
+            "with contextlib.redirect_stdout(io.StringIO()):\n"
+            "    main()"
+        )
+    unused = [m for m in batch if m in UNUSED_IN_BATCH]
+    print(f"排程執行（-s -t -q）載入的延遲模組: {', '.join(batch) or '無'}")
+    if unused:
+        failures.append(f"排程執行不應載入: {', '.join(unused)}")
+
+    if failures:
+        for message in failures:
+            print(f"失敗: {message}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
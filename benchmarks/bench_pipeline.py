@@ -0,0 +1,319 @@
+"""
+整理流程效能測試
+
+以 synthtree 產生可重現的來源樹，分別量測各階段：
+
+- scan：scan_files 列出整棵樹
+- classify：已掃描的記錄轉為搬移計畫（分類規則與檔名衝突處理，不碰檔案系統）
+- move：執行搬移計畫（apply_plan）
+- organize：classify_files_by_year_and_type 完整流程（掃描、分類、搬移、日誌）
+- report：ReportPrinter 輸出完整報告（輸出到記憶體）
+- cleanup：clean_empty_folders 清理搬空後的資料夾樹（整理完再走訪一次）
+- organize_clean：organize 加上 --clean（搬移時逐步刪除搬空的資料夾）
+
+每個階段都在新的子程序中執行（破壞性的階段各自使用新產生的樹），
+記錄每秒處理數、每個項目的系統呼叫數與尖峰記憶體，結果可輸出為 JSON，
+以 --compare 與其他 commit 的結果對照。
+處理的項目（unit）為檔案；cleanup 只處理資料夾，以產生的資料夾數換算。
+系統呼叫數需要 strace：以 strace -c 分別執行「只做準備」與「準備加量測階段」，
+兩者相減即為量測階段本身的呼叫數；沒有 strace 時為 null。
+
+執行方式:
+    PYTHONPATH=src python benchmarks/bench_pipeline.py --files 50000 -o after.json --compare before.json
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from typing import Dict, List, Optional
+
+from synthtree import TreeInfo, TreeSpec, add_spec_arguments, generate_tree, spec_from_args
+
+SCENARIOS = ["scan", "classify", "move", "organize", "report", "cleanup", "organize_clean"]
+
+# 會改動來源樹的階段，每次執行前都要重新產生
+_DESTRUCTIVE = {"move", "organize", "cleanup", "organize_clean"}
+
+
+# ---- 子程序 ----
+
+
+def _run_child(scenario: str, source: str, target: str, workers: int, measure: bool) -> None:
+    """在子程序中執行一個階段，將結果以 JSON 寫到 stdout"""
+    from rich.console import Console
+
+    from day_11_file_organizer.main import (
+        apply_plan,
+        classify_files_by_year_and_type,
+        clean_empty_folders,
+    )
+    from day_11_file_organizer.models import ClassifyResult
+    from day_11_file_organizer.naming import NameIndex
+    from day_11_file_organizer.planner import build_plan, iter_plan
+    from day_11_file_organizer.reporter import ReportPrinter
+    from day_11_file_organizer.roast import RoastGenerator
+    from day_11_file_organizer.scanner import scan_files
+
+    def on_error(entry, error) -> None:
+        pass
+
+    # 準備（不計時）
+    if scenario == "classify":
+        entries = list(scan_files(source))
+    elif scenario == "move":
+        plan = build_plan(source, target)
+        os.makedirs(target, exist_ok=True)
+    elif scenario == "report":
+        result = ClassifyResult(compact=True)
+        for move in build_plan(source, target).moves:
+            result.add(move.to_stats())
+        printer = ReportPrinter()
+        printer.console = Console(file=io.StringIO(), width=120, force_terminal=True)
+        printer.roaster = RoastGenerator(seed=0)
+    elif scenario == "cleanup":
+        console = Console(file=io.StringIO())
+
+    seconds = 0.0
+    if measure:
+        start = time.perf_counter()
+        if scenario == "scan":
+            sum(1 for _ in scan_files(source))
+        elif scenario == "classify":
+            for _ in iter_plan(entries, target, NameIndex(), on_error):
+                pass
+        elif scenario == "move":
+            apply_plan(plan)
+        elif scenario == "organize":
+            classify_files_by_year_and_type(source, target, workers=workers, journal=True)
+        elif scenario == "organize_clean":
+            classify_files_by_year_and_type(
+                source, target, workers=workers, journal=True, clean=True
+            )
+        elif scenario == "report":
+            printer.print_report(result)
+        elif scenario == "cleanup":
+            clean_empty_folders(source, console)
+        seconds = time.perf_counter() - start
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 回報，macOS 以位元組
+    peak_bytes = peak if sys.platform == "darwin" else peak * 1024
+    json.dump({"seconds": seconds, "peak_rss_bytes": peak_bytes}, sys.stdout)
+
+
+# ---- 主程序 ----
+
+
+def _child_command(
+    scenario: str, source: str, target: str, workers: int, measure: bool
+) -> List[str]:
+    command = [sys.executable, os.path.abspath(__file__), "--child", scenario, source, target]
+    command += ["--workers", str(workers)]
+    if not measure:
+        command.append("--setup-only")
+    return command
+
+
+def _child_env() -> Dict[str, str]:
+    """子程序要能 import 套件（src 版面配置）"""
+    env = dict(os.environ)
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (src, env.get("PYTHONPATH")) if p)
+    return env
+
+
+def _strace_calls(command: List[str], workdir: str) -> int:
+    """以 strace -c 執行指令，回傳系統呼叫總數（包含所有執行緒）"""
+    out = os.path.join(workdir, "strace.txt")
+    subprocess.run(
+        ["strace", "-f", "-c", "-qq", "-o", out] + command,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        env=_child_env(),
+    )
+    with open(out, encoding="utf-8") as f:
+        for line in f:
+            parts = line.split()
+            # 100.00    0.012345           1     12345       123 total
+            if parts and parts[-1] == "total":
+                return int(parts[3])
+    raise RuntimeError("無法解析 strace 輸出")
+
+
+def run_scenario(
+    scenario: str, spec: TreeSpec, workdir: str, workers: int, syscalls: bool
+) -> dict:
+    """產生來源樹並執行一個階段，回傳量測結果"""
+    source = os.path.join(workdir, "source")
+    target = os.path.join(workdir, "target")
+    skeleton = scenario == "cleanup"
+
+    def fresh_tree() -> TreeInfo:
+        for folder in (source, target):
+            shutil.rmtree(folder, ignore_errors=True)
+        return generate_tree(spec, source, skeleton=skeleton)
+
+    info = fresh_tree()
+    calls: Optional[int] = None
+    if syscalls:
+        baseline = _strace_calls(_child_command(scenario, source, target, workers, False), workdir)
+        total = _strace_calls(_child_command(scenario, source, target, workers, True), workdir)
+        calls = max(total - baseline, 0)
+        if scenario in _DESTRUCTIVE:
+            fresh_tree()
+        else:
+            shutil.rmtree(target, ignore_errors=True)
+
+    # 計時用的執行（不經過 strace）
+    completed = subprocess.run(
+        _child_command(scenario, source, target, workers, True),
+        check=True,
+        capture_output=True,
+        text=True,
+        env=_child_env(),
+    )
+    child = json.loads(completed.stdout)
+    shutil.rmtree(source, ignore_errors=True)
+    shutil.rmtree(target, ignore_errors=True)
+
+    # 以實際處理的項目數正規化（cleanup 的樹只有資料夾，以資料夾數換算）
+    unit, count = ("dirs", info.dirs) if skeleton else ("files", info.files)
+    seconds = child["seconds"]
+    return {
+        "unit": unit,
+        "count": count,
+        "seconds": round(seconds, 4),
+        "per_s": round(count / seconds, 1) if seconds > 0 else None,
+        "syscalls": calls,
+        "syscalls_per_unit": round(calls / count, 2) if calls is not None and count else None,
+        "peak_rss_mb": round(child["peak_rss_bytes"] / 1024 / 1024, 1),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    """目前的 commit（不是 git 工作目錄時為 None）"""
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+    except OSError:
+        return None
+    return completed.stdout.strip() or None
+
+
+def _change(new: Optional[float], old: Optional[float]) -> str:
+    """相對變化（百分比）"""
+    if new is None or not old:
+        return ""
+    return f"{(new - old) / old * 100:+.1f}%"
+
+
+def _normalized(result: dict) -> dict:
+    """讀取單一階段的結果（相容 unit 欄位之前以檔案數換算的舊格式）"""
+    if "unit" in result:
+        return result
+    return dict(
+        result,
+        unit="files",
+        count=result["files"],
+        per_s=result["files_per_s"],
+        syscalls_per_unit=result["syscalls_per_file"],
+    )
+
+
+def print_table(report: dict, baseline: Optional[dict]) -> None:
+    """輸出結果表格；有對照組時附上相對變化（單位不同的階段不比較速率）"""
+    header = f"{'階段':<14} {'單位':<6} {'每秒':>12} {'syscall/單位':>13} {'尖峰 MB':>9}"
+    if baseline:
+        header += f" {'每秒 變化':>13} {'syscall 變化':>13} {'記憶體 變化':>12}"
+    print(header)
+
+    old_results = baseline["results"] if baseline else {}
+    for scenario, r in report["results"].items():
+        rate = f"{r['per_s']:,.0f}" if r["per_s"] else "-"
+        calls = f"{r['syscalls_per_unit']:.2f}" if r["syscalls_per_unit"] is not None else "-"
+        line = f"{scenario:<14} {r['unit']:<6} {rate:>12} {calls:>13} {r['peak_rss_mb']:>9.1f}"
+        old = old_results.get(scenario)
+        if old:
+            old = _normalized(old)
+            same_unit = old["unit"] == r["unit"]
+            line += (
+                f" {_change(r['per_s'], old['per_s']) if same_unit else '-':>13}"
+                f" {_change(r['syscalls_per_unit'], old['syscalls_per_unit']) if same_unit else '-':>13}"
+                f" {_change(r['peak_rss_mb'], old['peak_rss_mb']):>12}"
+            )
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="整理流程各階段的效能測試")
+    add_spec_arguments(parser)
+    parser.add_argument(
+        "--scenarios",
+        default=",".join(SCENARIOS),
+        help=f"要執行的階段，以逗號分隔（預設全部：{','.join(SCENARIOS)}）",
+    )
+    parser.add_argument("-w", "--workers", type=int, default=1, help="organize 的搬移執行緒數")
+    parser.add_argument("-o", "--output", metavar="PATH", help="將結果寫入 JSON 檔")
+    parser.add_argument("--compare", metavar="PATH", help="與先前輸出的 JSON 結果對照")
+    parser.add_argument("--no-syscalls", action="store_true", help="不以 strace 計算系統呼叫數")
+    parser.add_argument(
+        "--child", nargs=3, metavar=("SCENARIO", "SOURCE", "TARGET"), help=argparse.SUPPRESS
+    )
+    parser.add_argument("--setup-only", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        scenario, source, target = args.child
+        _run_child(scenario, source, target, args.workers, measure=not args.setup_only)
+        return
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"未知的階段: {', '.join(sorted(unknown))}")
+
+    syscalls = not args.no_syscalls and shutil.which("strace") is not None
+    if not args.no_syscalls and not syscalls:
+        print("找不到 strace，不計算系統呼叫數", file=sys.stderr)
+
+    spec = spec_from_args(args)
+    report = {
+        "benchmark": "pipeline",
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "workers": args.workers,
+        "spec": asdict(spec),
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for scenario in scenarios:
+            report["results"][scenario] = run_scenario(scenario, spec, tmp, args.workers, syscalls)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_table(report, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+分類規則引擎效能測試
+
+比較不同規則數量下，每個檔案的判斷成本（奈秒/檔案）。
+規則數量從 0 增加到數百條時，RuleSet 的數字應該大致持平；
+「逐條比對」欄是每個檔案依序嘗試每條規則的寫法，作為對照。
+
+執行方式:
+    PYTHONPATH=src python benchmarks/bench_rules.py
+"""
+
+import os
+import random
+import re
+import string
+import time
+
+from day_11_file_organizer.rules import RuleSet
+
+# 每種規則數量比對的檔名數
+NAME_COUNT = 100_000
+
+RULE_COUNTS = [0, 10, 100, 300, 1000]
+
+# regex 規則的數量（不隨規則總數增加）
+REGEX_RULES = 3
+
+EXTENSIONS = [".jpg", ".pdf", ".docx", ".mp4", ".txt", ".zip", ".heic", ".xyz", ""]
+
+
+def make_names(rng: random.Random) -> list:
+    """產生常見樣式的檔名（IMG_1234.jpg、report_final.pdf ...）"""
+    prefixes = ["IMG_", "DSC", "report_", "Screenshot ", "invoice-", "data", "備份_"]
+    return [
+        f"{rng.choice(prefixes)}{rng.randrange(100000)}{rng.choice(EXTENSIONS)}"
+        for _ in range(NAME_COUNT)
+    ]
+
+
+def make_rules(count: int, rng: random.Random) -> dict:
+    """
+    產生 count 條規則：大部分是固定開頭的 glob，
+    另有兩成「包含」型的 glob（*word*）、固定數量的 regex、大小門檻與年齡分組
+    """
+    patterns = []
+    for i in range(count):
+        word = "".join(rng.choices(string.ascii_letters, k=rng.randint(3, 8)))
+        if i < REGEX_RULES:
+            # regex 規則無法建立索引，數量固定
+            patterns.append({"type": f"t{i}", "regex": f".*{word}\\d+", "ignore_case": True})
+        elif i % 5 == 0:
+            patterns.append({"type": f"t{i}", "glob": f"*{word}*"})
+        else:
+            patterns.append({"type": f"t{i}", "glob": f"{word}*", "ignore_case": i % 3 == 0})
+
+    return {
+        "types": {f"group{i}": [f"e{i}"] for i in range(count)},
+        "patterns": patterns,
+        "sizes": [{"min_size": 1024 * (i + 1), "type": f"s{i}"} for i in range(count // 10)],
+        "ages": [{"older_than": i + 1, "folder": f"a{i}"} for i in range(count // 10)],
+    }
+
+
+def bench(rules: RuleSet, names: list, sizes: list, mtimes: list) -> float:
+    """回傳每個檔案的平均判斷時間（奈秒）"""
+    file_type = rules.file_type
+    folder = rules.folder
+    start = time.perf_counter()
+    for name, size, mtime in zip(names, sizes, mtimes):
+        file_type(name, size)
+        folder(2024, mtime)
+    return (time.perf_counter() - start) / len(names) * 1e9
+
+
+def bench_naive(rules: RuleSet, names: list, sizes: list) -> float:
+    """對照組：每個檔案逐條嘗試規則（奈秒/檔案）"""
+    patterns = [(re.compile(r.regex), r.file_type) for r in rules.patterns]
+    extensions = rules.extensions
+    start = time.perf_counter()
+    for name, size in zip(names, sizes):
+        for pattern, file_type in patterns:
+            if pattern.match(name):
+                break
+        else:
+            extensions.get(os.path.splitext(name)[1].lower())
+    return (time.perf_counter() - start) / len(names) * 1e9
+
+
+def main() -> None:
+    rng = random.Random(42)
+    names = make_names(rng)
+    sizes = [rng.randrange(1, 1 << 20) for _ in names]
+    now = time.time()
+    mtimes = [now - rng.randrange(0, 400 * 86400) for _ in names]
+
+    print(f"{'規則數':>8} {'編譯 (ms)':>10} {'ns/檔案':>10} {'逐條比對':>10}")
+    for count in RULE_COUNTS:
+        config = make_rules(count, rng)
+        start = time.perf_counter()
+        rules = RuleSet.from_dict(config)
+        compile_ms = (time.perf_counter() - start) * 1000
+        per_file = min(bench(rules, names, sizes, mtimes) for _ in range(3))
+        naive = bench_naive(rules, names[:10_000], sizes)
+        print(f"{rules.rule_count:>8} {compile_ms:>10.1f} {per_file:>10.0f} {naive:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+合成檔案樹產生器（效能測試用）
+
+依 TreeSpec 產生可重現的來源資料夾：相同的規格與種子一定產生相同的路徑、
+大小與修改時間。檔案預設以 truncate 建立為稀疏檔，大小分布接近真實但不佔磁碟空間。
+
+執行方式:
+    python benchmarks/synthtree.py /tmp/tree --files 50000 --depth 4
+"""
+
+import argparse
+import math
+import os
+import random
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+# 預設的副檔名比例（大致是一般下載資料夾的組成，"" 為沒有副檔名）
+DEFAULT_EXTENSIONS: Dict[str, float] = {
+    ".jpg": 30,
+    ".png": 10,
+    ".pdf": 12,
+    ".docx": 6,
+    ".xlsx": 4,
+    ".mp4": 5,
+    ".mp3": 5,
+    ".zip": 6,
+    ".txt": 8,
+    ".py": 4,
+    ".heic": 4,
+    ".xyz": 4,
+    "": 2,
+}
+
+# 修改時間的基準點（2025-01-01 UTC），不隨執行時間改變，年份分布才能重現
+REFERENCE_TIME = 1_735_689_600.0
+
+_WRITE_CHUNK = 1024 * 1024
+
+
+@dataclass
+class TreeSpec:
+    """合成檔案樹的規格"""
+
+    files: int = 20_000
+    # 子資料夾層數與每個資料夾的子資料夾數（檔案平均分散在所有資料夾）
+    depth: int = 3
+    fanout: int = 8
+    extensions: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_EXTENSIONS))
+    # 與先前某個檔案同名且同年份（整理後落在同一個目標資料夾，需要改名）的比例
+    collision_rate: float = 0.05
+    # 檔案大小為對數常態分布：中位數與 sigma，上限 max_size
+    size_median: int = 64 * 1024
+    size_sigma: float = 2.5
+    max_size: int = 4 * 1024**3
+    # 修改時間平均分布在基準點之前幾年內
+    mtime_years: float = 12.0
+    # True 時以 truncate 建立稀疏檔；False 時實際寫入內容
+    sparse: bool = True
+    seed: int = 42
+
+
+@dataclass
+class TreeInfo:
+    """產生結果"""
+
+    root: str
+    files: int
+    dirs: int
+    total_bytes: int
+
+
+def _folders(root: str, depth: int, fanout: int) -> List[str]:
+    """根目錄與所有子資料夾（依層級順序）"""
+    folders = [root]
+    level = [root]
+    for d in range(depth):
+        level = [os.path.join(parent, f"d{d}_{i}") for parent in level for i in range(fanout)]
+        folders.extend(level)
+    return folders
+
+
+def plan_tree(spec: TreeSpec, root: str) -> Tuple[List[str], List[Tuple[str, int, float]]]:
+    """
+    依規格決定資料夾與檔案（不寫入磁碟）
+
+    Returns:
+        (資料夾清單, [(檔案路徑, 大小, 修改時間)])
+    """
+    rng = random.Random(spec.seed)
+    folders = _folders(root, spec.depth, spec.fanout)
+    extensions = list(spec.extensions)
+    weights = list(spec.extensions.values())
+    log_median = math.log(max(spec.size_median, 1))
+    spread = spec.mtime_years * 365.25 * 86400
+
+    files: List[Tuple[str, int, float]] = []
+    # 已產生的 (檔名, 修改時間)，同名檔案從這裡挑
+    names: List[Tuple[str, float]] = []
+    used = set()
+    for i in range(spec.files):
+        if names and rng.random() < spec.collision_rate:
+            name, mtime = rng.choice(names)
+        else:
+            name = f"file_{i}{rng.choices(extensions, weights)[0]}"
+            mtime = REFERENCE_TIME - rng.uniform(0, spread)
+            names.append((name, mtime))
+
+        # 同名檔案要放在不同的資料夾（資料夾都用過時改名，不再算作衝突）
+        for _ in range(8):
+            path = os.path.join(rng.choice(folders), name)
+            if path not in used:
+                break
+        else:
+            path = os.path.join(rng.choice(folders), f"file_{i}_{name}")
+        used.add(path)
+
+        size = int(min(spec.max_size, rng.lognormvariate(log_median, spec.size_sigma)))
+        files.append((path, size, mtime))
+    return folders, files
+
+
+def generate_tree(spec: TreeSpec, root: str, skeleton: bool = False) -> TreeInfo:
+    """
+    在 root 產生合成檔案樹（root 必須不存在或是空資料夾）
+
+    Args:
+        spec: 檔案樹規格
+        root: 輸出位置
+        skeleton: 只建立資料夾（清理空資料夾的測試用）
+
+    Returns:
+        TreeInfo: 產生的檔案數、資料夾數與總大小
+    """
+    folders, files = plan_tree(spec, root)
+    for folder in folders:
+        os.makedirs(folder, exist_ok=True)
+    if skeleton:
+        return TreeInfo(root, 0, len(folders) - 1, 0)
+
+    zeros = bytes(min(spec.max_size, _WRITE_CHUNK))
+    total = 0
+    for path, size, mtime in files:
+        with open(path, "wb") as f:
+            if spec.sparse:
+                f.truncate(size)
+            else:
+                remaining = size
+                while remaining > 0:
+                    remaining -= f.write(zeros[: min(remaining, _WRITE_CHUNK)])
+        os.utime(path, (mtime, mtime))
+        total += size
+    return TreeInfo(root, len(files), len(folders) - 1, total)
+
+
+def add_spec_arguments(parser: argparse.ArgumentParser) -> None:
+    """加入 TreeSpec 對應的命令列參數"""
+    defaults = TreeSpec()
+    parser.add_argument("--files", type=int, default=defaults.files, help="檔案數")
+    parser.add_argument("--depth", type=int, default=defaults.depth, help="子資料夾層數")
+    parser.add_argument("--fanout", type=int, default=defaults.fanout, help="每個資料夾的子資料夾數")
+    parser.add_argument(
+        "--extensions",
+        metavar="EXT=WEIGHT,...",
+        help="副檔名比例，例如 .jpg=5,.pdf=1（預設為一般下載資料夾的組成）",
+    )
+    parser.add_argument(
+        "--collision-rate", type=float, default=defaults.collision_rate, help="同名檔案比例"
+    )
+    parser.add_argument(
+        "--size-median", type=int, default=defaults.size_median, help="檔案大小中位數（位元組）"
+    )
+    parser.add_argument(
+        "--size-sigma", type=float, default=defaults.size_sigma, help="檔案大小的對數常態 sigma"
+    )
+    parser.add_argument(
+        "--mtime-years", type=float, default=defaults.mtime_years, help="修改時間分布的年數"
+    )
+    parser.add_argument("--dense", action="store_true", help="實際寫入檔案內容（預設為稀疏檔）")
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="亂數種子")
+
+
+def spec_from_args(args: argparse.Namespace) -> TreeSpec:
+    """由 add_spec_arguments 的參數建立 TreeSpec"""
+    spec = TreeSpec(
+        files=args.files,
+        depth=args.depth,
+        fanout=args.fanout,
+        collision_rate=args.collision_rate,
+        size_median=args.size_median,
+        size_sigma=args.size_sigma,
+        mtime_years=args.mtime_years,
+        sparse=not args.dense,
+        seed=args.seed,
+    )
+    if args.extensions:
+        spec.extensions = {}
+        for item in args.extensions.split(","):
+            ext, _, weight = item.partition("=")
+            spec.extensions[ext.strip()] = float(weight or 1)
+    return spec
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="產生可重現的合成檔案樹")
+    parser.add_argument("root", help="輸出資料夾（必須不存在或是空資料夾）")
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+
+    info = generate_tree(spec_from_args(args), args.root)
+    print(f"{info.files} 個檔案、{info.dirs} 個資料夾、{info.total_bytes / 1024**3:.1f} GB（邏輯大小）")
+
+
+if __name__ == "__main__":
+    main()
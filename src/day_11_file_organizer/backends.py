@@ -0,0 +1,216 @@
+"""搬移後端 - 同裝置直接 rename，跨裝置用核心層級複製"""
+
+import errno
+import os
+import shutil
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+from .models import BackendStats
+
+# Linux 的 FICLONE ioctl（_IOW(0x94, 9, int)），Btrfs / XFS 等支援 reflink
+_FICLONE = 0x40049409
+
+# 每次核心複製的最大位元組數
+_CHUNK = 64 * 1024 * 1024
+
+# 表示「這個方法在此裝置組合上不可用」的錯誤碼
+_UNSUPPORTED = {
+    errno.EXDEV,
+    errno.EINVAL,
+    errno.ENOSYS,
+    errno.EBADF,
+    errno.EPERM,
+    getattr(errno, "EOPNOTSUPP", errno.EINVAL),
+    getattr(errno, "ENOTSUP", errno.EINVAL),
+    getattr(errno, "ENOTTY", errno.EINVAL),
+}
+
+
+class _Unsupported(Exception):
+    """複製方法不支援目前的來源/目標組合"""
+
+
+def _reflink(src_fd: int, dst_fd: int, size: int) -> None:
+    """以 FICLONE 建立共用區塊的副本（不實際複製資料）"""
+    import fcntl
+
+    try:
+        fcntl.ioctl(dst_fd, _FICLONE, src_fd)
+    except OSError as e:
+        if e.errno in _UNSUPPORTED:
+            raise _Unsupported from e
+        raise
+
+
+def _copy_file_range(src_fd: int, dst_fd: int, size: int) -> None:
+    """以 os.copy_file_range 在核心內複製"""
+    offset = 0
+    while offset < size:
+        try:
+            copied = os.copy_file_range(src_fd, dst_fd, min(_CHUNK, size - offset))
+        except OSError as e:
+            if offset == 0 and e.errno in _UNSUPPORTED:
+                raise _Unsupported from e
+            raise
+        if copied == 0:
+            break
+        offset += copied
+
+
+def _sendfile(src_fd: int, dst_fd: int, size: int) -> None:
+    """以 os.sendfile 在核心內複製（Linux 支援檔案對檔案）"""
+    offset = 0
+    while offset < size:
+        try:
+            sent = os.sendfile(dst_fd, src_fd, offset, min(_CHUNK, size - offset))
+        except OSError as e:
+            if offset == 0 and e.errno in _UNSUPPORTED:
+                raise _Unsupported from e
+            raise
+        if sent == 0:
+            break
+        offset += sent
+
+
+def _read_write(src_fd: int, dst_fd: int, size: int) -> None:
+    """一般的使用者空間複製（最後手段）"""
+    with open(src_fd, "rb", closefd=False) as src, open(dst_fd, "wb", closefd=False) as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+
+
+def _copy_methods() -> List[Tuple[str, Callable[[int, int, int], None]]]:
+    """目前平台可用的複製方法（由快到慢）"""
+    methods: List[Tuple[str, Callable[[int, int, int], None]]] = []
+    if sys.platform.startswith("linux"):
+        methods.append(("reflink", _reflink))
+    if hasattr(os, "copy_file_range"):
+        methods.append(("copy_file_range", _copy_file_range))
+    if sys.platform.startswith("linux"):
+        methods.append(("sendfile", _sendfile))
+    methods.append(("copy", _read_write))
+    return methods
+
+
+class MoveBackend:
+    """
+    依來源與目標裝置選擇搬移方式，並記錄各方式的吞吐量
+
+    - 同裝置：直接 os.replace（遇到 EXDEV 才改為複製）
+    - 跨裝置：依序嘗試 FICLONE reflink、copy_file_range、sendfile、
+      一般讀寫，複製完保留時間戳記後刪除來源
+
+    目標資料夾的裝置編號與每組 (來源裝置, 目標裝置) 可用的複製方法都只判斷一次。
+    可在多個執行緒中同時使用。
+    """
+
+    def __init__(self) -> None:
+        self.stats: Dict[str, BackendStats] = {}
+        self._dir_devs: Dict[str, int] = {}
+        self._methods: Dict[Tuple[int, int], List[Tuple[str, Callable]]] = {}
+        self._lock = threading.Lock()
+
+    def move(self, source: str, target: str, size: int, source_dev: int = 0) -> str:
+        """
+        搬移檔案並回傳實際使用的方式
+
+        Raises:
+            OSError: 搬移失敗（目標不會留下不完整的檔案）
+        """
+        start = time.perf_counter()
+        target_dev = self._target_dev(os.path.dirname(target))
+        method = ""
+
+        # source_dev 為 0 表示未知（例如舊格式的計畫檔），一律先試 rename
+        if source_dev in (0, target_dev):
+            try:
+                # os.replace：目標可能是跨程序命名時預先建立的空佔位檔
+                os.replace(source, target)
+                method = "rename"
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+
+        if not method:
+            method = self._copy_and_unlink(source, target, size, source_dev, target_dev)
+
+        self._record(method, size, time.perf_counter() - start)
+        return method
+
+    def _target_dev(self, target_dir: str) -> int:
+        """目標資料夾的裝置編號（每個資料夾只 stat 一次）"""
+        dev = self._dir_devs.get(target_dir)
+        if dev is None:
+            dev = os.stat(target_dir).st_dev
+            self._dir_devs[target_dir] = dev
+        return dev
+
+    def _copy_and_unlink(
+        self, source: str, target: str, size: int, source_dev: int, target_dev: int
+    ) -> str:
+        """跨裝置搬移：複製、保留 metadata、刪除來源"""
+        # 符號連結交給 shutil.move 重建連結本身，而不是複製指向的內容
+        if os.path.islink(source):
+            shutil.move(source, target)
+            return "copy"
+
+        pair = (source_dev, target_dev)
+        methods = self._methods.get(pair)
+        if methods is None:
+            methods = self._methods[pair] = _copy_methods()
+
+        src_fd = os.open(source, os.O_RDONLY)
+        try:
+            # 以開啟當下的實際大小為準，掃描後才變大的檔案也能完整複製
+            size = os.fstat(src_fd).st_size
+            dst_fd = os.open(target, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+        except BaseException:
+            os.close(src_fd)
+            raise
+
+        try:
+            while True:
+                name, func = methods[0]
+                try:
+                    func(src_fd, dst_fd, size)
+                    break
+                except _Unsupported:
+                    # 這組裝置不支援此方法，之後都直接跳過
+                    with self._lock:
+                        if len(methods) > 1 and methods[0][0] == name:
+                            methods.pop(0)
+                    os.ftruncate(dst_fd, 0)
+                    os.lseek(src_fd, 0, os.SEEK_SET)
+                    os.lseek(dst_fd, 0, os.SEEK_SET)
+        except BaseException:
+            # 複製失敗：不留下不完整的目標檔
+            os.close(dst_fd)
+            os.close(src_fd)
+            try:
+                os.unlink(target)
+            except OSError:
+                pass
+            raise
+
+        os.close(dst_fd)
+        os.close(src_fd)
+
+        # 與 shutil.move 相同保留時間戳記與權限（失敗不影響搬移結果）
+        try:
+            shutil.copystat(source, target)
+        except OSError:
+            pass
+        os.unlink(source)
+        return name
+
+    def _record(self, method: str, size: int, seconds: float) -> None:
+        """累計各搬移方式的次數、位元組與耗時"""
+        with self._lock:
+            stats = self.stats.get(method)
+            if stats is None:
+                stats = self.stats[method] = BackendStats(method)
+            stats.calls += 1
+            stats.bytes += size
+            stats.seconds += seconds
@@ -0,0 +1,92 @@
+"""分類規則 - 決定檔案的年份與類型（不做任何搬移）"""
+
+import os
+import sys
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from .models import FileStats
+from .scanner import ScanEntry
+
+if TYPE_CHECKING:
+    from .rules import RuleSet
+
+# 檔案分類對應表
+EXTENSION_MAPPING = {
+    ".doc": "doc",
+    ".docx": "doc",
+    ".xls": "xls",
+    ".xlsx": "xls",
+    ".ppt": "ppt",
+    ".pptx": "ppt",
+    ".pdf": "pdf",
+    ".txt": "txt",
+    ".jpg": "jpg",
+    ".jpeg": "jpg",
+    ".png": "png",
+    ".gif": "gif",
+    ".mp3": "mp3",
+    ".mp4": "mp4",
+    ".mov": "mov",
+    ".zip": "zip",
+    ".rar": "rar",
+    ".7z": "7z",
+}
+
+
+def get_file_type(filename: str) -> str:
+    """根據副檔名決定類型資料夾名稱"""
+    file_extension = os.path.splitext(filename)[1].lower()
+
+    if file_extension in EXTENSION_MAPPING:
+        return EXTENSION_MAPPING[file_extension]
+    elif file_extension:
+        # 移除開頭的點；intern 讓相同類型共用同一個字串物件
+        return sys.intern(file_extension[1:])
+    else:
+        return "other"
+
+
+def classify_entry(
+    entry: ScanEntry, rules: Optional["RuleSet"] = None
+) -> Tuple[int, str, str]:
+    """
+    依掃描記錄決定 (年份, 類型, 第一層資料夾)
+
+    Args:
+        entry: 掃描記錄
+        rules: 自訂分類規則（None 表示內建的副檔名對應，資料夾即年份）
+
+    Raises:
+        OSError: 掃描時 stat 失敗的檔案
+    """
+    if entry.error is not None:
+        raise entry.error
+
+    # 年份取自修改時間（與 datetime.fromtimestamp 相同的本地時區）
+    year = time.localtime(entry.mtime).tm_year
+    if rules is None:
+        return year, get_file_type(entry.name), str(year)
+    return year, rules.file_type(entry.name, entry.size), rules.folder(year, entry.mtime)
+
+
+def failed_stats(file_path: str, filename: str, error: Exception) -> FileStats:
+    """依例外類型建立失敗的 FileStats"""
+    if isinstance(error, PermissionError):
+        message = f"權限不足: {error}"
+    elif isinstance(error, FileNotFoundError):
+        message = f"檔案不存在: {error}"
+    else:
+        message = str(error)
+
+    return FileStats(
+        original_path=file_path,
+        filename=filename,
+        size_bytes=0,
+        modified_time=datetime.now(),
+        year=0,
+        file_type="unknown",
+        success=False,
+        error_message=message,
+    )
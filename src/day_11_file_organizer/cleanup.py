@@ -0,0 +1,150 @@
+"""空資料夾清理 - 搬移過程中逐步移除被搬空的來源資料夾（--clean）"""
+
+import os
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from .scanner import ScanEntry, ScanState
+
+
+class _Folder:
+    """一個來源資料夾的清理狀態"""
+
+    __slots__ = ("pending", "listed", "kept")
+
+    def __init__(self) -> None:
+        # 還沒有結果的檔案與子資料夾數
+        self.pending = 0
+        # 掃描端已列完內容
+        self.listed = False
+        # 有檔案或子資料夾留下（資料夾一定刪不掉）
+        self.kept = False
+
+
+class EmptyDirCleaner:
+    """
+    搬移時逐步清理搬空的來源資料夾
+
+    每個資料夾記錄還沒有結果的檔案與子資料夾數：掃描到的檔案（track）與列完時
+    的子資料夾（visit_dir）加入計數，檔案搬走（moved）、留在原處（kept）或子資料夾
+    處理完畢時減一。資料夾列完且計數歸零時立刻 rmdir，再往上通知父資料夾，
+    由深到淺一路清理，不必在整理結束後重新走訪整棵樹。
+
+    隱藏檔、符號連結等掃描不會產生記錄的項目不計數，rmdir 會因資料夾不是空的
+    而失敗，視同有內容留下。來源資料夾本身不會被刪除。
+
+    包在既有的掃描狀態（ScanIndex、MoveJournal）外面，以 scan_files 的掃描狀態
+    介面轉發；所有路徑都必須與 scan_files 產生的一致（來源資料夾不可帶結尾斜線）。
+    moved / kept 可在工作執行緒中呼叫。
+    """
+
+    def __init__(
+        self,
+        source_folder: str,
+        state: Optional[ScanState] = None,
+        on_remove: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        self.source_folder = source_folder
+        self.removed_count = 0
+        self._state = state
+        self._on_remove = on_remove
+        self._lock = threading.Lock()
+        self._folders: Dict[str, _Folder] = {}
+
+    # ---- 掃描端 ----
+
+    def unchanged_subdirs(self, folder: str, mtime_ns: int) -> Optional[List[str]]:
+        """轉發給內層狀態；沒有重新列出的資料夾只等子資料夾處理完就嘗試刪除"""
+        if self._state is None:
+            return None
+        subdirs = self._state.unchanged_subdirs(folder, mtime_ns)
+        if subdirs is not None:
+            self._listed(folder, subdirs)
+        return subdirs
+
+    def visit_dir(self, folder: str, mtime_ns: int, subdirs: List[str]) -> None:
+        """資料夾已列完（內層狀態先記錄，再決定能否刪除）"""
+        if self._state is not None:
+            self._state.visit_dir(folder, mtime_ns, subdirs)
+        self._listed(folder, subdirs)
+
+    def is_unchanged_file(self, path: str, size: int, mtime: float, inode: int) -> bool:
+        """略過的檔案不會產生記錄，留在原處的資料夾 rmdir 時自然會失敗"""
+        return self._state is not None and self._state.is_unchanged_file(
+            path, size, mtime, inode
+        )
+
+    def track(self, entries: Iterable[ScanEntry]) -> Iterator[ScanEntry]:
+        """計算每個資料夾掃描到的檔案數（包在 scan_files 外面）"""
+        for entry in entries:
+            with self._lock:
+                self._folder(entry.parent).pending += 1
+            yield entry
+
+    # ---- 搬移端 ----
+
+    def moved(self, path: str) -> None:
+        """一個檔案已搬離來源"""
+        with self._lock:
+            self._resolve(os.path.dirname(path), kept=False)
+
+    def kept(self, path: str) -> None:
+        """一個檔案留在來源（失敗、略過的重複檔案等）"""
+        with self._lock:
+            self._resolve(os.path.dirname(path), kept=True)
+
+    # ---- 內部 ----
+
+    def _folder(self, folder: str) -> _Folder:
+        """取得資料夾狀態（呼叫端需持有鎖）"""
+        state = self._folders.get(folder)
+        if state is None:
+            state = self._folders[folder] = _Folder()
+        return state
+
+    def _listed(self, folder: str, subdirs: List[str]) -> None:
+        with self._lock:
+            state = self._folder(folder)
+            state.pending += len(subdirs)
+            state.listed = True
+            self._collapse(folder)
+
+    def _resolve(self, folder: str, kept: bool) -> None:
+        """資料夾中的一個項目有了結果（呼叫端需持有鎖）"""
+        state = self._folders.get(folder)
+        if state is None:
+            return
+        state.pending -= 1
+        if kept:
+            state.kept = True
+        self._collapse(folder)
+
+    def _collapse(self, folder: str) -> None:
+        """資料夾處理完畢時刪除，並依序往上處理父資料夾（呼叫端需持有鎖）"""
+        while True:
+            state = self._folders[folder]
+            if state.pending > 0 or not state.listed:
+                return
+            del self._folders[folder]
+            if folder == self.source_folder:
+                return
+
+            kept = state.kept
+            if not kept:
+                try:
+                    os.rmdir(folder)
+                except OSError:
+                    # 還有掃描不到的內容，或沒有權限
+                    kept = True
+                else:
+                    self.removed_count += 1
+                    if self._on_remove is not None:
+                        self._on_remove(folder)
+
+            parent = self._folders.get(os.path.dirname(folder))
+            if parent is None:
+                return
+            parent.pending -= 1
+            if kept:
+                parent.kept = True
+            folder = os.path.dirname(folder)
@@ -0,0 +1,125 @@
+"""重複檔案偵測 - 依大小分組，分階段雜湊，只有極少數檔案需要完整讀取"""
+
+import hashlib
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .models import DuplicateGroup
+from .scanner import ScanEntry
+
+# 部分雜湊讀取的頭尾區塊大小
+PARTIAL_CHUNK = 64 * 1024
+
+# 需要完整雜湊的檔案少於此數量時不啟動程序池
+_POOL_THRESHOLD = 8
+
+
+def _partial_digest(path: str, size: int) -> bytes:
+    """
+    讀取檔案頭尾各 64KB 的雜湊
+
+    檔案不超過 128KB 時等於讀完整個檔案，此雜湊即為完整雜湊。
+    """
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        if size <= 2 * PARTIAL_CHUNK:
+            h.update(f.read())
+        else:
+            h.update(f.read(PARTIAL_CHUNK))
+            f.seek(-PARTIAL_CHUNK, os.SEEK_END)
+            h.update(f.read(PARTIAL_CHUNK))
+    return h.digest()
+
+
+def _full_digest(path: str) -> Tuple[str, Optional[str]]:
+    """串流讀取整個檔案的 BLAKE2b 雜湊（在子程序中執行）"""
+    try:
+        with open(path, "rb") as f:
+            return path, hashlib.file_digest(f, "blake2b").hexdigest()
+    except OSError:
+        return path, None
+
+
+def _group(items: Iterable[Tuple[object, ScanEntry]]) -> List[List[ScanEntry]]:
+    """依 key 分組，只留下超過一個檔案的組（保持原順序）"""
+    buckets: Dict[object, List[ScanEntry]] = {}
+    for key, entry in items:
+        buckets.setdefault(key, []).append(entry)
+    return [group for group in buckets.values() if len(group) > 1]
+
+
+def find_duplicates(
+    entries: Iterable[ScanEntry], processes: Optional[int] = None
+) -> List[DuplicateGroup]:
+    """
+    找出內容完全相同的檔案
+
+    1. 依 size_bytes 分組，大小唯一的檔案不可能重複，直接排除
+    2. 同大小的檔案比對頭尾 64KB 的雜湊
+    3. 頭尾也相同的大檔案才在程序池中做完整雜湊
+
+    空檔案與 stat 失敗的檔案不參與比對。每組中第一個（掃描順序）為保留的正本。
+
+    Args:
+        entries: 掃描記錄
+        processes: 完整雜湊的程序數（None 表示 CPU 數量）
+
+    Returns:
+        List[DuplicateGroup]: 重複檔案組，依浪費空間由大到小排序
+    """
+    # 第一階段：依大小分組
+    candidates = ((e.size, e) for e in entries if e.error is None and e.size > 0)
+    size_groups = _group(candidates)
+
+    # 第二階段：頭尾部分雜湊
+    partial_items = []
+    for group in size_groups:
+        for entry in group:
+            try:
+                partial_items.append(
+                    ((entry.size, _partial_digest(entry.path, entry.size)), entry)
+                )
+            except OSError:
+                continue
+    partial_groups = _group(partial_items)
+
+    # 小檔案的部分雜湊就是完整雜湊；大檔案需要第三階段
+    groups: List[DuplicateGroup] = []
+    need_full: List[List[ScanEntry]] = []
+    for group in partial_groups:
+        if group[0].size <= 2 * PARTIAL_CHUNK:
+            groups.append(
+                DuplicateGroup(
+                    size_bytes=group[0].size,
+                    paths=[e.path for e in group],
+                )
+            )
+        else:
+            need_full.append(group)
+
+    # 第三階段：完整雜湊
+    paths = [e.path for group in need_full for e in group]
+    if len(paths) >= _POOL_THRESHOLD:
+        # 多程序模組只在需要時匯入（載入成本約數十毫秒）
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        # spawn：呼叫端可能已有進度顯示等執行緒，不以 fork 複製（同 organize_sharded）
+        with ProcessPoolExecutor(
+            max_workers=processes, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            digests = dict(pool.map(_full_digest, paths, chunksize=4))
+    else:
+        digests = dict(map(_full_digest, paths))
+
+    for group in need_full:
+        full_items = [
+            (digests[e.path], e) for e in group if digests.get(e.path) is not None
+        ]
+        for dup in _group(full_items):
+            groups.append(
+                DuplicateGroup(size_bytes=dup[0].size, paths=[e.path for e in dup])
+            )
+
+    groups.sort(key=lambda g: -g.wasted_bytes)
+    return groups
@@ -0,0 +1,58 @@
+"""目標資料夾快取 - 只在第一次用到時建立資料夾"""
+
+import os
+import threading
+from typing import Iterable
+
+
+class DirectoryCache:
+    """
+    已確認存在的目標資料夾集合
+
+    年份/類型的組合通常只有幾十種，快取命中時 ensure() 不會產生任何系統呼叫；
+    上一層（年份資料夾）已知存在時只需一次 os.mkdir，不必走 os.makedirs
+    逐層檢查。資料夾在執行中被外部刪除時，呼叫端用 invalidate() 讓下次重建。
+    可在多個執行緒中同時使用。
+    """
+
+    def __init__(self, *existing: str) -> None:
+        self._known = set(existing)
+        self._lock = threading.Lock()
+        # 實際呼叫 mkdir / makedirs 的次數（快取未命中）
+        self.mkdir_count = 0
+
+    def ensure(self, path: str) -> None:
+        """確保資料夾存在"""
+        if path in self._known:
+            return
+
+        parent = os.path.dirname(path)
+        if parent in self._known:
+            try:
+                os.mkdir(path)
+            except FileExistsError:
+                if not os.path.isdir(path):
+                    raise
+        else:
+            os.makedirs(path, exist_ok=True)
+
+        with self._lock:
+            self._known.add(path)
+            self._known.add(parent)
+            self.mkdir_count += 1
+
+    def precreate(self, paths: Iterable[str]) -> None:
+        """
+        一次建立所有需要的資料夾（忽略個別失敗，留給實際搬移時回報）
+        """
+        for path in sorted(set(paths)):
+            try:
+                self.ensure(path)
+            except OSError:
+                continue
+
+    def invalidate(self, path: str) -> None:
+        """資料夾可能已被刪除，從快取移除（連同上一層）"""
+        with self._lock:
+            self._known.discard(path)
+            self._known.discard(os.path.dirname(path))
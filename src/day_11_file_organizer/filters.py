@@ -0,0 +1,122 @@
+"""掃描篩選 - 排除 / 包含樣式、最大深度、大小與修改時間條件"""
+
+import fnmatch
+import math
+import re
+import time
+from typing import Optional, Pattern, Sequence
+
+from .scanner import ScanEntry
+
+
+def _combine(globs: Sequence[str]) -> Optional[Pattern[str]]:
+    """將多個 glob 合併成單一正規表示式（沒有 glob 時為 None）"""
+    if not globs:
+        return None
+    return re.compile("|".join(fnmatch.translate(glob) for glob in globs))
+
+
+class _Globs:
+    """一組 glob：不含 "/" 的比對名稱，含 "/" 的比對相對於來源資料夾的路徑"""
+
+    __slots__ = ("_name", "_path")
+
+    def __init__(self, globs: Sequence[str]) -> None:
+        self._name = _combine([g for g in globs if "/" not in g])
+        self._path = _combine([g.lstrip("/") for g in globs if "/" in g])
+
+    def __bool__(self) -> bool:
+        return self._name is not None or self._path is not None
+
+    def match(self, name: str, relpath: str) -> bool:
+        if self._name is not None and self._name.match(name) is not None:
+            return True
+        return self._path is not None and self._path.match(relpath) is not None
+
+
+class ScanFilter:
+    """
+    掃描時套用的篩選條件
+
+    樣式為 glob：不含 "/" 的比對名稱（例如 node_modules、*.tmp），含 "/" 的
+    比對相對於來源資料夾的路徑（以 "/" 分隔，例如 build/*.o）；以 "/" 結尾的
+    排除樣式只套用在資料夾上。排除的資料夾整棵子樹都不會被列出，名稱條件在
+    stat 之前判斷，只有大小與修改時間條件需要 stat 的結果。
+    包含樣式只套用在檔案上：有指定時只處理符合任一樣式的檔案。
+
+    深度以來源資料夾為 0：max_depth=0 只處理來源資料夾本身的檔案，
+    1 再加上第一層子資料夾，依此類推。
+    """
+
+    def __init__(
+        self,
+        exclude: Sequence[str] = (),
+        include: Sequence[str] = (),
+        max_depth: Optional[int] = None,
+        min_size: int = 0,
+        older_than: Optional[float] = None,
+        newer_than: Optional[float] = None,
+        now: Optional[float] = None,
+    ) -> None:
+        """
+        Args:
+            exclude: 排除的檔案與資料夾樣式
+            include: 只處理符合的檔案樣式（空的表示全部）
+            max_depth: 最多進入幾層子資料夾（None 表示不限制）
+            min_size: 小於此位元組數的檔案不處理
+            older_than: 只處理修改時間早於此秒數之前的檔案
+            newer_than: 只處理修改時間在此秒數之內的檔案
+            now: 計算修改時間門檻的基準時間（None 表示現在）
+
+        Raises:
+            ValueError: max_depth 為負數
+        """
+        if max_depth is not None and max_depth < 0:
+            raise ValueError(f"最大深度不能是負數: {max_depth}")
+        self.max_depth = max_depth
+        self.min_size = min_size
+        self._exclude = _Globs([g for g in exclude if not g.endswith("/")])
+        self._exclude_dirs = _Globs([g.rstrip("/") for g in exclude if g.endswith("/")])
+        self._include = _Globs(include)
+
+        now = time.time() if now is None else now
+        # 允許的修改時間範圍
+        self._newest = now - older_than if older_than is not None else math.inf
+        self._oldest = now - newer_than if newer_than is not None else -math.inf
+
+    def prunes_dir(self, name: str, relpath: str, depth: int) -> bool:
+        """
+        是否不進入這個子資料夾
+
+        Args:
+            name: 資料夾名稱
+            relpath: 相對於來源資料夾的路徑（以 "/" 分隔）
+            depth: 資料夾的層數（來源資料夾的子資料夾為 1）
+        """
+        if self.max_depth is not None and depth > self.max_depth:
+            return True
+        return self._exclude.match(name, relpath) or self._exclude_dirs.match(name, relpath)
+
+    def skips_name(self, name: str, relpath: str) -> bool:
+        """只依檔名與路徑就能排除的檔案（不需要 stat）"""
+        if self._exclude.match(name, relpath):
+            return True
+        return bool(self._include) and not self._include.match(name, relpath)
+
+    def skips_stat(self, size: int, mtime: float) -> bool:
+        """依 stat 結果排除的檔案（大小、修改時間）"""
+        return size < self.min_size or mtime > self._newest or mtime < self._oldest
+
+    def accepts(self, entry: ScanEntry, relpath: str) -> bool:
+        """
+        單獨檢查一筆記錄的所有條件（監看事件等不經過資料夾走訪的檔案）
+
+        stat 失敗的記錄只檢查路徑條件，錯誤照常回報。
+        """
+        parts = relpath.split("/")
+        for depth in range(1, len(parts)):
+            if self.prunes_dir(parts[depth - 1], "/".join(parts[:depth]), depth):
+                return False
+        if self.skips_name(entry.name, relpath):
+            return False
+        return entry.error is not None or not self.skips_stat(entry.size, entry.mtime)
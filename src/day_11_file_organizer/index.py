@@ -0,0 +1,272 @@
+"""增量掃描索引 - 以 SQLite 記錄已處理的檔案與資料夾"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from .models import CumulativeStats
+
+# 索引檔名（放在目標資料夾，隱藏檔不會被掃描）
+INDEX_FILENAME = ".file-organizer-index.sqlite"
+
+# 修改時間距今少於此秒數的資料夾視為「不穩定」，下次仍會重新掃描，
+# 避免檔案系統時間精度不足時漏掉掃描後才加入的檔案
+_RACY_SECONDS = 2.0
+
+# 累積多少筆記錄後寫入一次
+_BATCH_SIZE = 1000
+
+# 路徑與類型以 os.fsencode 存成 BLOB：不是合法 UTF-8 的檔名（surrogateescape）
+# 也能原樣寫入與讀回。版本 0 的索引以 TEXT 儲存，開啟時轉換
+_SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source_folder BLOB NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS organized (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL,
+    source BLOB NOT NULL,
+    target BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    inode INTEGER NOT NULL,
+    year INTEGER NOT NULL,
+    file_type BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pending (
+    path BLOB PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    inode INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dirs (
+    path BLOB PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    subdirs TEXT NOT NULL
+);
+"""
+
+# 版本 0 → 1：TEXT 欄位轉成 UTF-8 位元組（與 os.fsencode 的結果相同）
+_MIGRATE_TO_BLOB = """
+UPDATE runs SET source_folder = CAST(source_folder AS BLOB);
+UPDATE organized SET source = CAST(source AS BLOB), target = CAST(target AS BLOB),
+    file_type = CAST(file_type AS BLOB);
+UPDATE pending SET path = CAST(path AS BLOB);
+UPDATE dirs SET path = CAST(path AS BLOB);
+"""
+
+
+class ScanIndex:
+    """
+    目標資料夾中的持久化索引
+
+    - organized：每次成功搬移的檔案（用於累計統計）
+    - pending：留在來源資料夾、未搬移的檔案（例如權限不足），
+      size / mtime / inode 都沒變時下次直接略過
+    - dirs：來源資料夾的修改時間與子資料夾清單，
+      修改時間沒變時下次不必重新列出內容
+
+    所有路徑都必須是絕對路徑。record_* 方法可在工作執行緒中呼叫；
+    其餘方法只在主執行緒使用。
+    """
+
+    def __init__(self, target_folder: str, source_folder: str) -> None:
+        self.path = os.path.join(target_folder, INDEX_FILENAME)
+        self.skipped_count = 0
+
+        # 第一次整理時目標資料夾可能還不存在
+        os.makedirs(target_folder, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < _SCHEMA_VERSION:
+            self._conn.executescript(
+                f"BEGIN; {_MIGRATE_TO_BLOB} PRAGMA user_version = {_SCHEMA_VERSION}; COMMIT;"
+            )
+        self._lock = threading.Lock()
+        self._organized: List[Tuple] = []
+        self._pending: List[Tuple] = []
+        self._visited: Dict[str, Tuple[int, List[str]]] = {}
+        self._listed: Set[str] = set()
+
+        cur = self._conn.execute(
+            "INSERT INTO runs (source_folder, started_at) VALUES (?, ?)",
+            (os.fsencode(os.path.abspath(source_folder)), time.time()),
+        )
+        self._run_id = cur.lastrowid
+        self._scan_started = time.time()
+
+        # 只載入本次來源資料夾底下的資料夾與待處理檔案
+        prefix = os.path.abspath(source_folder)
+        self._dirs = {
+            path: (mtime_ns, json.loads(subdirs))
+            for path, mtime_ns, subdirs in (
+                (os.fsdecode(row[0]), row[1], row[2])
+                for row in self._conn.execute("SELECT path, mtime_ns, subdirs FROM dirs")
+            )
+            if _is_within(path, prefix)
+        }
+        self._known = {
+            path: (size, mtime, inode)
+            for path, size, mtime, inode in (
+                (os.fsdecode(row[0]), *row[1:])
+                for row in self._conn.execute("SELECT path, size, mtime, inode FROM pending")
+            )
+            if _is_within(path, prefix)
+        }
+
+    # ---- 掃描端 ----
+
+    def unchanged_subdirs(self, folder: str, mtime_ns: int) -> Optional[List[str]]:
+        """資料夾沒有變動時回傳上次記錄的子資料夾清單，否則回傳 None"""
+        record = self._dirs.get(folder)
+        if record is None or record[0] != mtime_ns:
+            return None
+        self._visited[folder] = record
+        return [os.path.join(folder, name) for name in record[1]]
+
+    def visit_dir(self, folder: str, mtime_ns: int, subdirs: List[str]) -> None:
+        """記錄本次列出內容的資料夾（列出之前的修改時間）"""
+        names = [os.path.basename(d) for d in subdirs]
+        self._visited[folder] = (mtime_ns, names)
+        self._listed.add(folder)
+
+    def is_unchanged_file(self, path: str, size: int, mtime: float, inode: int) -> bool:
+        """檔案是否與上次記錄完全相同（相同則略過並計數）"""
+        known = self._known.get(path)
+        if known is not None and known == (size, mtime, inode):
+            self.skipped_count += 1
+            self._pending.append((os.fsencode(path), size, mtime, inode))
+            return True
+        return False
+
+    # ---- 搬移端（執行緒安全） ----
+
+    def record_organized(
+        self,
+        source: str,
+        target: str,
+        size: int,
+        mtime: float,
+        inode: int,
+        year: int,
+        file_type: str,
+    ) -> None:
+        """記錄一筆成功的搬移"""
+        row = (
+            self._run_id,
+            os.fsencode(source),
+            os.fsencode(target),
+            size,
+            mtime,
+            inode,
+            year,
+            os.fsencode(file_type),
+        )
+        with self._lock:
+            self._organized.append(row)
+            if len(self._organized) >= _BATCH_SIZE:
+                self._flush_organized()
+
+    def record_pending(self, path: str, size: int, mtime: float, inode: int) -> None:
+        """記錄一筆留在來源資料夾的檔案"""
+        with self._lock:
+            self._pending.append((os.fsencode(path), size, mtime, inode))
+
+    # ---- 結束 ----
+
+    def cumulative_stats(self) -> CumulativeStats:
+        """歷次執行的累計統計"""
+        with self._lock:
+            self._flush_organized()
+
+        conn = self._conn
+        run_count = conn.execute(
+            "SELECT COUNT(*) FROM runs WHERE finished_at IS NOT NULL"
+        ).fetchone()[0]
+        total_count, total_size = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM organized"
+        ).fetchone()
+        years = conn.execute(
+            "SELECT year, COUNT(*) FROM organized GROUP BY year ORDER BY year"
+        ).fetchall()
+        types = conn.execute(
+            "SELECT file_type, COUNT(*) AS n FROM organized"
+            " GROUP BY file_type ORDER BY n DESC"
+        ).fetchall()
+
+        return CumulativeStats(
+            run_count=run_count,
+            total_count=total_count,
+            total_size_bytes=total_size,
+            year_distribution=dict(years),
+            type_distribution={os.fsdecode(t): n for t, n in types},
+        )
+
+    def finish(self) -> None:
+        """寫入本次掃描的資料夾與待處理檔案，結束本次執行"""
+        with self._lock:
+            self._flush_organized()
+
+        with self._conn:
+            # 本次重新列出的資料夾，其待處理檔案以本次結果取代
+            self._conn.executemany(
+                "DELETE FROM pending WHERE path = ?",
+                [
+                    (os.fsencode(p),)
+                    for p in self._known
+                    if os.path.dirname(p) in self._listed
+                ],
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO pending (path, size, mtime, inode)"
+                " VALUES (?, ?, ?, ?)",
+                self._pending,
+            )
+            # 來源底下的資料夾記錄全部以本次走訪結果取代（已刪除的資料夾會消失）
+            self._conn.executemany(
+                "DELETE FROM dirs WHERE path = ?",
+                [(os.fsencode(p),) for p in self._dirs],
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO dirs (path, mtime_ns, subdirs) VALUES (?, ?, ?)",
+                [
+                    # 子資料夾名稱以 \u 跳脫，無法解碼的名稱也能存成 TEXT
+                    (os.fsencode(path), mtime_ns, json.dumps(subdirs))
+                    for path, (mtime_ns, subdirs) in self._visited.items()
+                    if mtime_ns / 1e9 < self._scan_started - _RACY_SECONDS
+                ],
+            )
+            self._conn.execute(
+                "UPDATE runs SET finished_at = ? WHERE id = ?",
+                (time.time(), self._run_id),
+            )
+
+    def close(self) -> None:
+        """關閉資料庫連線"""
+        self._conn.close()
+
+    def _flush_organized(self) -> None:
+        """寫入累積的搬移記錄（呼叫端需持有鎖）"""
+        if not self._organized:
+            return
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO organized"
+                " (run_id, source, target, size, mtime, inode, year, file_type)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                self._organized,
+            )
+        self._organized.clear()
+
+
+def _is_within(path: str, folder: str) -> bool:
+    """path 是否為 folder 本身或其子路徑"""
+    return path == folder or path.startswith(folder.rstrip(os.sep) + os.sep)
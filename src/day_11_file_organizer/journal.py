@@ -0,0 +1,379 @@
+"""搬移日誌 - 先寫入再搬移（write-ahead），中斷後可接續或還原"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+
+from .scanner import ScanEntry
+
+if TYPE_CHECKING:
+    from .planner import PlannedMove
+
+# 日誌檔名（放在目標資料夾，隱藏檔不會被掃描）
+JOURNAL_FILENAME = ".file-organizer-journal.jsonl"
+
+# 累積多少筆計畫記錄後 fsync 一次
+_SYNC_BATCH = 512
+
+# 計畫記錄最多等待多久就 fsync（掃描很慢時也不會讓搬移一直等下去）
+_SYNC_INTERVAL = 0.5
+
+# 日誌最多保留幾次整理（開始新的整理時壓縮，更早的整理不能再還原）
+JOURNAL_KEEP_RUNS = 20
+
+
+def journal_path(target_folder: str) -> str:
+    """目標資料夾中的日誌路徑"""
+    return os.path.join(target_folder, JOURNAL_FILENAME)
+
+
+@dataclass
+class JournalState:
+    """從日誌讀回的內容"""
+
+    source_folder: str = ""
+    # 來源 -> 目標（依記錄順序）
+    planned: Dict[str, str] = field(default_factory=dict)
+    done: Set[str] = field(default_factory=set)
+    undone: Set[str] = field(default_factory=set)
+    # 已完成的來源資料夾：(完成時的修改時間, 子資料夾名稱)
+    dirs: Dict[str, Tuple[int, List[str]]] = field(default_factory=dict)
+    # 最後一次整理或還原是否正常結束
+    finished: bool = False
+    undoing: bool = False
+
+    @property
+    def in_flight(self) -> Dict[str, str]:
+        """已寫入計畫、但沒有完成記錄的搬移"""
+        return {src: dst for src, dst in self.planned.items() if src not in self.done}
+
+
+def read_journal(target_folder: str) -> Optional[JournalState]:
+    """
+    讀取目標資料夾中最近一次、還沒完全還原的整理（沒有時回傳 None）
+
+    日誌保留每一次整理：新的整理以 run 記錄開始一段新的內容，接續
+    （resume）延續最後一段。還原把最後一段的檔案全部搬回後，這段就不再
+    回傳，下一次 --undo 會還原更早的整理。
+    當機時最後一行可能只寫了一半，無法解析的行直接略過。
+    """
+    try:
+        runs, _ = _read_runs(journal_path(target_folder))
+    except FileNotFoundError:
+        return None
+    return runs[-1][0] if runs else None
+
+
+def compact_journal(target_folder: str, keep: int = JOURNAL_KEEP_RUNS) -> bool:
+    """
+    壓縮日誌：移除已完全還原的整理與無法解析的行，只保留最近 keep 次整理
+
+    有內容要移除時才重寫：先寫入暫存檔並 fsync，再以 os.replace 取代，
+    中途當機時原本的日誌維持不變。
+
+    Args:
+        target_folder: 目標資料夾
+        keep: 最多保留幾次整理（更早的整理無法再以 --undo 還原）
+
+    Returns:
+        bool: 是否重寫了日誌
+    """
+    path = journal_path(target_folder)
+    try:
+        runs, line_count = _read_runs(path)
+    except FileNotFoundError:
+        return False
+    kept = [lines for _, lines in runs[-keep:]] if keep > 0 else []
+    if sum(len(lines) for lines in kept) == line_count:
+        return False
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8", errors="surrogateescape") as f:
+        for lines in kept:
+            f.writelines(lines)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return True
+
+
+def _read_runs(path: str) -> Tuple[List[Tuple[JournalState, List[str]]], int]:
+    """
+    逐行解析日誌，依 run 記錄分段
+
+    Returns:
+        (還沒完全還原的每一段整理與其原始各行, 日誌的總行數)
+
+    Raises:
+        FileNotFoundError: 沒有日誌
+    """
+    runs: List[Tuple[JournalState, List[str]]] = []
+    line_count = 0
+    # 檔名不一定是合法的 UTF-8，以 surrogateescape 原樣保留
+    with open(path, encoding="utf-8", errors="surrogateescape") as f:
+        for line in f:
+            line_count += 1
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if not line.endswith("\n"):
+                line += "\n"
+
+            op = record["op"]
+            if op == "run":
+                if not (record.get("resume") and runs):
+                    runs.append((JournalState(), []))
+                state, lines = runs[-1]
+                state.source_folder = record["source"]
+                state.finished = False
+                lines.append(line)
+                continue
+            if not runs:
+                continue
+
+            state, lines = runs[-1]
+            lines.append(line)
+            if op == "plan":
+                state.planned[record["src"]] = record["dst"]
+            elif op == "done":
+                state.done.add(record["src"])
+            elif op == "dir":
+                state.dirs[record["path"]] = (record["mtime_ns"], record["subdirs"])
+            elif op == "end":
+                state.finished = True
+            elif op == "undo_start":
+                state.undoing = True
+                state.finished = False
+            elif op == "undo":
+                state.undone.add(record["src"])
+            elif op == "undo_end":
+                state.finished = True
+                # 全部搬回後改為還原更早的整理；有檔案沒搬回時下次 --undo 再試一次
+                if state.done <= state.undone:
+                    runs.pop()
+    return runs, line_count
+
+
+class MoveJournal:
+    """
+    只附加（append-only）的 JSONL 搬移日誌
+
+    - plan：搬移前寫入來源與目標；呼叫端要等 plan() 回傳 True
+      （或呼叫 sync()）之後才能開始搬移，確保當機時日誌一定比檔案系統新
+    - done：搬移完成（不個別 fsync，隨下一批計畫一起寫入磁碟；
+      遺失的完成記錄在接續時以檔案實際位置補回）
+    - dir：來源資料夾的檔案都已搬完，記錄完成時的修改時間與子資料夾，
+      接續時修改時間沒變就不必再列出內容
+
+    同時實作 scan_files 的掃描狀態介面（unchanged_subdirs / visit_dir /
+    is_unchanged_file），資料夾完成與否由掃描端與搬移端共同決定。
+    所有路徑都必須是絕對路徑。done / failed / undone 可在工作執行緒中呼叫。
+
+    每次整理都附加在既有日誌後面（以 run 記錄分段），之前的整理仍可依序還原；
+    開始新的整理時先以 compact_journal 移除已還原的整理，最多保留
+    JOURNAL_KEEP_RUNS 次。
+    undo=True 時以 undone() 記錄搬回原位的檔案。
+    """
+
+    def __init__(
+        self,
+        target_folder: str,
+        source_folder: str = "",
+        resume: Optional[JournalState] = None,
+        undo: bool = False,
+    ) -> None:
+        self.path = journal_path(target_folder)
+        self._dirs = dict(resume.dirs) if resume is not None else {}
+        self._lock = threading.Lock()
+        self._undo = undo
+        # 尚未 fsync 的計畫記錄數與其中第一筆的時間
+        self._unsynced = 0
+        self._first_unsynced = 0.0
+
+        # 每個資料夾還沒有結果的檔案數、有失敗的資料夾、已列完等待完成的資料夾
+        self._outstanding: Dict[str, int] = {}
+        self._dirty: Set[str] = set()
+        self._listed: Dict[str, List[str]] = {}
+
+        os.makedirs(target_folder, exist_ok=True)
+        if resume is None and not undo:
+            # 新的整理開始前先移除已還原與過舊的整理，日誌不會無限制地成長
+            compact_journal(target_folder)
+        self._file: Optional[TextIO] = open(
+            self.path, "a", encoding="utf-8", errors="surrogateescape"
+        )
+        # 上次當機時只寫了一半的行：換行後再寫，讀取時只會略過那一行
+        if self._file.tell() > 0:
+            with open(self.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self._file.write("\n")
+        now = datetime.now().isoformat(timespec="seconds")
+        if undo:
+            self._write({"op": "undo_start", "time": now})
+        else:
+            self._write(
+                {
+                    "op": "run",
+                    "source": source_folder,
+                    "time": now,
+                    "resume": resume is not None,
+                }
+            )
+        self.sync()
+
+    # ---- 接續 ----
+
+    def recover(self, state: JournalState) -> Tuple[int, int]:
+        """
+        處理上次中斷時還在進行中的搬移
+
+        - 來源已不在、目標存在：搬移其實已完成，補寫完成記錄
+        - 來源還在、目標也存在：跨裝置複製到一半（或複製完還沒刪除來源），
+          刪除目標，稍後重新掃描時再搬一次
+        - 來源還在、目標不存在：還沒開始，重新掃描時自然會處理
+
+        Returns:
+            (補回的完成數, 撤回的半成品數)
+        """
+        completed = rolled_back = 0
+        for src, dst in state.in_flight.items():
+            if os.path.lexists(src):
+                if os.path.lexists(dst):
+                    try:
+                        os.unlink(dst)
+                        rolled_back += 1
+                    except OSError:
+                        pass
+            elif os.path.lexists(dst):
+                self._write({"op": "done", "src": src})
+                completed += 1
+        self.sync()
+        return completed, rolled_back
+
+    # ---- 掃描端 ----
+
+    def unchanged_subdirs(self, folder: str, mtime_ns: int) -> Optional[List[str]]:
+        """上次已完成且之後沒有變動的資料夾，回傳子資料夾清單（不必再列出）"""
+        record = self._dirs.get(folder)
+        if record is None or record[0] != mtime_ns:
+            return None
+        return [os.path.join(folder, name) for name in record[1]]
+
+    def visit_dir(self, folder: str, mtime_ns: int, subdirs: List[str]) -> None:
+        """資料夾已列完：所有檔案都有結果時即可寫入完成記錄"""
+        with self._lock:
+            self._listed[folder] = [os.path.basename(d) for d in subdirs]
+            self._checkpoint(folder)
+
+    def is_unchanged_file(self, path: str, size: int, mtime: float, inode: int) -> bool:
+        """日誌不略過個別檔案（已搬走的檔案不會再出現在來源）"""
+        return False
+
+    def track(self, entries: Iterable[ScanEntry]) -> Iterator[ScanEntry]:
+        """計算每個資料夾掃描到的檔案數（包在 scan_files 外面）"""
+        for entry in entries:
+            with self._lock:
+                self._outstanding[entry.parent] = self._outstanding.get(entry.parent, 0) + 1
+            yield entry
+
+    # ---- 搬移端 ----
+
+    def plan(self, move: "PlannedMove") -> bool:
+        """
+        寫入一筆計畫記錄
+
+        Returns:
+            bool: 這次呼叫觸發了 fsync，之前寫入的計畫都可以開始搬移
+        """
+        with self._lock:
+            self._write({"op": "plan", "src": move.source, "dst": move.target})
+            self._unsynced += 1
+            if self._unsynced == 1:
+                self._first_unsynced = time.monotonic()
+            if (
+                self._unsynced < _SYNC_BATCH
+                and time.monotonic() - self._first_unsynced < _SYNC_INTERVAL
+            ):
+                return False
+        self.sync()
+        return True
+
+    def done(self, move: "PlannedMove") -> None:
+        """一筆搬移完成"""
+        with self._lock:
+            self._write({"op": "done", "src": move.source})
+            self._resolve(os.path.dirname(move.source), failed=False)
+
+    def failed(self, path: str) -> None:
+        """一個檔案處理失敗（留在來源，所在資料夾不會被標記為完成）"""
+        with self._lock:
+            self._resolve(os.path.dirname(path), failed=True)
+
+    def undone(self, source: str) -> None:
+        """一個檔案已搬回原位（還原時使用）"""
+        with self._lock:
+            self._write({"op": "undo", "src": source})
+
+    def sync(self) -> None:
+        """將已寫入的記錄 fsync 到磁碟"""
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.flush()
+            fd = self._file.fileno()
+            self._unsynced = 0
+        os.fsync(fd)
+
+    def finish(self) -> None:
+        """整理或還原正常結束"""
+        with self._lock:
+            self._write({"op": "undo_end" if self._undo else "end"})
+        self.close()
+
+    def close(self) -> None:
+        """寫入剩餘記錄並關閉（未呼叫 finish 時日誌維持「未完成」）"""
+        if self._file is None:
+            return
+        self.sync()
+        with self._lock:
+            self._file.close()
+            self._file = None
+
+    # ---- 內部 ----
+
+    def _write(self, record: dict) -> None:
+        """附加一筆記錄（呼叫端需持有鎖）"""
+        assert self._file is not None
+        self._file.write(json.dumps(record, ensure_ascii=False))
+        self._file.write("\n")
+
+    def _resolve(self, folder: str, failed: bool) -> None:
+        """資料夾中的一個檔案有了結果（呼叫端需持有鎖）"""
+        remaining = self._outstanding.get(folder, 0) - 1
+        self._outstanding[folder] = remaining
+        if failed:
+            self._dirty.add(folder)
+        if remaining <= 0:
+            self._checkpoint(folder)
+
+    def _checkpoint(self, folder: str) -> None:
+        """資料夾已列完且所有檔案都已搬走時寫入完成記錄（呼叫端需持有鎖）"""
+        if folder not in self._listed or self._outstanding.get(folder, 0) > 0:
+            return
+        subdirs = self._listed.pop(folder)
+        self._outstanding.pop(folder, None)
+        if folder in self._dirty:
+            self._dirty.discard(folder)
+            return
+        try:
+            # 檔案都搬走之後的修改時間，接續時以此判斷資料夾是否又有變動
+            mtime_ns = os.stat(folder).st_mtime_ns
+        except OSError:
+            return
+        self._write({"op": "dir", "path": folder, "mtime_ns": mtime_ns, "subdirs": subdirs})
@@ -2,52 +2,74 @@
 
 import argparse
 import os
-import shutil
-import sys
+import threading
+import time
+from dataclasses import dataclass, field
 from datetime import datetime
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple, Union
 
 from rich.console import Console
-from rich.prompt import Prompt
 
-from .models import ClassifyResult, FileStats
-from .reporter import ReportPrinter
+from .classifier import failed_stats
+from .backends import MoveBackend
+from .dircache import DirectoryCache
+from .models import DEDUP_ACTIONS, ClassifyResult, RecordSink
+from .naming import NameIndex
+from .mover import MoveEngine
+from .profiling import NullProfiler
+from .progress import NullProgress, ProgressSink, create_progress
+from .scanner import ScanEntry, ScanState, list_dir, scan_files, shard_tree, stat_entry
+
+if TYPE_CHECKING:
+    from .cleanup import EmptyDirCleaner
+    from .filters import ScanFilter
+    from .index import ScanIndex
+    from .journal import MoveJournal
+    from .planner import MovePlan, PlannedMove
+    from .profiling import Profiler
+    from .reporter import ReportPrinter
+    from .rules import RuleSet
+
+# GUI、互動輸入、報告（含吐槽產生器）、asyncio 與多程序模組都在用到時才匯入，
+# 排程執行（-s 與 -t 都有指定）時不必付出這些模組的載入時間。
+# 增量索引（sqlite3）、規則檔（tomllib）、重複偵測（hashlib）、逐檔輸出（csv / zlib）、
+# 監看、日誌、篩選與搬移計畫也只在對應的選項或流程用到時才匯入
+
+# 監看模式沒有事件時最久多少秒檢查一次是否要結束
+_WATCH_WAKEUP = 1.0
 
-# 檢查 tkinter 是否可用
-try:
-    import tkinter as tk
-    from tkinter import filedialog
 
-    TKINTER_AVAILABLE = True
-except ImportError:
-    TKINTER_AVAILABLE = False
-
-# 檔案分類對應表
-EXTENSION_MAPPING = {
-    ".doc": "doc",
-    ".docx": "doc",
-    ".xls": "xls",
-    ".xlsx": "xls",
-    ".ppt": "ppt",
-    ".pptx": "ppt",
-    ".pdf": "pdf",
-    ".txt": "txt",
-    ".jpg": "jpg",
-    ".jpeg": "jpg",
-    ".png": "png",
-    ".gif": "gif",
-    ".mp3": "mp3",
-    ".mp4": "mp4",
-    ".mov": "mov",
-    ".zip": "zip",
-    ".rar": "rar",
-    ".7z": "7z",
-}
+@lru_cache(maxsize=None)
+def _tkinter_available() -> bool:
+    """檢查 tkinter 是否可用（第一次呼叫時才匯入）"""
+    try:
+        import tkinter  # noqa: F401
+        from tkinter import filedialog  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def __getattr__(name: str) -> object:
+    """保留舊的 TKINTER_AVAILABLE（存取時才檢查 tkinter）與 EXTENSION_MAPPING 常數"""
+    if name == "TKINTER_AVAILABLE":
+        return _tkinter_available()
+    if name == "EXTENSION_MAPPING":
+        # 副檔名對應已移到 classifier，保留舊的匯入路徑
+        from .classifier import EXTENSION_MAPPING
+
+        return EXTENSION_MAPPING
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_folder_path_gui(prompt: str) -> str:
     """使用 tkinter 選擇資料夾"""
-    if not TKINTER_AVAILABLE:
+    if not _tkinter_available():
         return ""
+    import tkinter as tk
+    from tkinter import filedialog
+
     root = tk.Tk()
     root.withdraw()
     folder_path = filedialog.askdirectory(title=prompt)
@@ -57,46 +79,240 @@ def get_folder_path_gui(prompt: str) -> str:
 
 def get_folder_path_cli(prompt: str) -> str:
     """使用命令列輸入資料夾路徑"""
+    from rich.prompt import Prompt
+
     path = Prompt.ask(f"[cyan]{prompt}[/]")
     # 展開 ~ 為家目錄
     path = os.path.expanduser(path)
     return path
 
 
-def clean_empty_folders(folder: str, console: Console) -> int:
+def clean_empty_folders(
+    folder: str, console: Console, scan_filter: Optional["ScanFilter"] = None
+) -> int:
     """
     清理空資料夾（從最深層開始往上清理）
 
+    整理完再走訪一次整棵樹，用於沒有在搬移時逐步清理的模式
+    （預設流程見 EmptyDirCleaner）。與掃描相同，不進入隱藏資料夾
+    與篩選條件排除的資料夾。
+
     Args:
         folder: 要清理的資料夾路徑
         console: Rich Console 物件
+        scan_filter: 整理時使用的篩選條件（排除的子樹不清理）
 
     Returns:
         int: 清理的空資料夾數量
     """
     cleaned_count = 0
 
-    # 從最深層開始往上遍歷
-    for root, dirs, files in os.walk(folder, topdown=False):
-        # 跳過根目錄本身
-        if root == folder:
-            continue
+    # 由淺到深列出沒有檔案的資料夾（同時剪除不進入的子樹），再反向處理
+    candidates: List[str] = []
+    for root, dirs, files in os.walk(folder):
+        rel = os.path.relpath(root, folder).replace(os.sep, "/")
+        rel = "" if rel == "." else rel + "/"
+        dirs[:] = [
+            name
+            for name in dirs
+            if not name.startswith(".")
+            and (
+                scan_filter is None
+                or not scan_filter.prunes_dir(name, rel + name, rel.count("/") + 1)
+            )
+        ]
+        # 跳過根目錄本身；有檔案就不是空資料夾
+        if root != folder and not files:
+            candidates.append(root)
 
-        # 檢查是否為空資料夾（沒有檔案，也沒有子資料夾）
+    # 子資料夾已先處理過，直接 rmdir，還有內容時會失敗（不必另外 listdir）
+    for root in reversed(candidates):
         try:
-            if not os.listdir(root):
-                os.rmdir(root)
-                console.print(f"[dim]清理空資料夾: {root}[/]")
-                cleaned_count += 1
+            os.rmdir(root)
         except OSError:
-            # 無法刪除（可能有權限問題或其他原因）
-            pass
+            # 不是空的，或無法刪除（可能有權限問題或其他原因）
+            continue
+        console.print(f"[dim]清理空資料夾: {root}[/]")
+        cleaned_count += 1
 
     return cleaned_count
 
 
+@dataclass
+class _Session:
+    """單次整理執行的共用狀態（每個搬移工作都會用到）"""
+
+    result: ClassifyResult
+    progress: ProgressSink
+    dirs: DirectoryCache
+    backend: MoveBackend = field(default_factory=MoveBackend)
+    index: Optional["ScanIndex"] = None
+    # 目標檔名已以佔位檔保留（NameIndex exclusive 模式），失敗時要刪除
+    placeholders: bool = False
+    journal: Optional["MoveJournal"] = None
+    # --clean：搬移時逐步刪除搬空的來源資料夾
+    cleaner: Optional["EmptyDirCleaner"] = None
+    profiler: Union["Profiler", NullProfiler] = field(default_factory=NullProfiler)
+
+    def fail(self, path: str, filename: str, error: Exception) -> None:
+        """記錄一筆失敗"""
+        stats = failed_stats(path, filename, error)
+        self.result.add(stats)
+        self.progress.fail(f"{path} - {stats.error_message}")
+        if self.journal is not None:
+            self.journal.failed(path)
+        if self.cleaner is not None:
+            self.cleaner.kept(path)
+
+    def move_file(self, move: "PlannedMove") -> None:
+        """搬移單一檔案（可在工作執行緒中執行）"""
+        profiler = self.profiler
+        try:
+            # 創建目標資料夾（已知存在時不做任何系統呼叫）
+            with profiler.op("makedirs"):
+                self.dirs.ensure(move.target_dir)
+
+            # 移動檔案到目標資料夾（同裝置 rename，跨裝置核心複製）
+            try:
+                with profiler.op("move", move.size_bytes):
+                    self._transfer(move)
+            except FileNotFoundError:
+                # 目標資料夾在執行中被外部刪除：重建後重試一次
+                if os.path.isdir(move.target_dir) or not os.path.lexists(move.source):
+                    raise
+                self.dirs.invalidate(move.target_dir)
+                self.dirs.ensure(move.target_dir)
+                self._transfer(move)
+        except Exception as e:
+            self._failed(move, e)
+            return
+
+        self._succeeded(move, "移動")
+
+    def link_file(self, move: "PlannedMove", existing: str) -> None:
+        """
+        重複檔案改以硬連結指向已搬移的正本，再刪除來源
+
+        無法建立硬連結時（跨裝置、正本搬移失敗等）改為一般搬移。
+        """
+        try:
+            self.dirs.ensure(move.target_dir)
+            os.link(existing, move.target)
+        except OSError:
+            self.move_file(move)
+            return
+
+        try:
+            os.unlink(move.source)
+        except OSError as e:
+            # 來源刪不掉就撤回連結，維持「檔案只在一處」
+            try:
+                os.unlink(move.target)
+            except OSError:
+                pass
+            self._failed(move, e)
+            return
+
+        self._succeeded(move, "硬連結")
+
+    def finish(self) -> None:
+        """將搬移方式統計寫入結果"""
+        self.result.backend_stats = sorted(
+            self.backend.stats.values(), key=lambda b: -b.bytes
+        )
+
+    def _transfer(self, move: "PlannedMove") -> None:
+        """透過搬移後端搬移單一檔案"""
+        self.backend.move(move.source, move.target, move.size_bytes, move.source_dev)
+
+    def _succeeded(self, move: "PlannedMove", action: str) -> None:
+        """記錄一筆成功的搬移"""
+        if self.journal is not None:
+            with self.profiler.op("journal"):
+                self.journal.done(move)
+        if self.cleaner is not None:
+            # 日誌先記錄資料夾完成（需要 stat 資料夾），再刪除搬空的資料夾
+            with self.profiler.op("cleanup"):
+                self.cleaner.moved(move.source)
+        with self.profiler.op("record"):
+            self.result.add(move.to_stats())
+            self.progress.advance(move.size_bytes, move.file_type)
+            if self.progress.logging:
+                self.progress.log(f"{action}: {move.source} -> {move.target}")
+            if self.index is not None:
+                self.index.record_organized(
+                    move.source,
+                    move.target,
+                    move.size_bytes,
+                    move.mtime,
+                    move.source_ino,
+                    move.year,
+                    move.file_type,
+                )
+
+    def _failed(self, move: "PlannedMove", error: Exception) -> None:
+        """記錄一筆失敗的搬移（檔案仍留在來源資料夾）"""
+        if self.placeholders:
+            try:
+                os.unlink(move.target)
+            except OSError:
+                pass
+        self.fail(move.source, move.filename, error)
+        if self.index is not None:
+            self.index.record_pending(
+                move.source, move.size_bytes, move.mtime, move.source_ino
+            )
+
+
+def _open_records(
+    stream_log: Optional[str], exports: Optional[List[str]]
+) -> Optional[RecordSink]:
+    """
+    開啟串流模式記錄檔與 --export 的逐檔記錄輸出（都沒有時回傳 None）
+
+    串流記錄附加寫入；--export 每次覆寫，與同時寫出的彙總統計一致。
+    """
+    if not stream_log and not exports:
+        return None
+    from .exporters import open_record_writers
+
+    return open_record_writers(list(exports or []), [stream_log] if stream_log else [])
+
+
+def _write_error_log(result: ClassifyResult) -> None:
+    """將失敗的檔案寫入目標資料夾的 error.txt"""
+    errors = result.failed_files
+    if not errors:
+        return
+
+    error_file_path = os.path.join(result.target_folder, "error.txt")
+    with open(error_file_path, "w", encoding="utf-8") as f:
+        f.write(f"錯誤記錄 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write("=" * 50 + "\n\n")
+        for err in errors:
+            f.write(f"檔案: {err.original_path}\n")
+            f.write(f"錯誤: {err.error_message}\n")
+            f.write("-" * 30 + "\n")
+
+
 def classify_files_by_year_and_type(
-    source_folder: str, target_folder: str
+    source_folder: str,
+    target_folder: str,
+    workers: int = 1,
+    incremental: bool = False,
+    precreate_dirs: bool = False,
+    dedup: Optional[str] = None,
+    stream_log: Optional[str] = None,
+    compact: bool = True,
+    progress: Optional[ProgressSink] = None,
+    rules: Optional["RuleSet"] = None,
+    detail_k: int = 0,
+    journal: bool = False,
+    resume: bool = False,
+    exports: Optional[List[str]] = None,
+    profiler: Optional["Profiler"] = None,
+    clean: bool = False,
+    scan_filter: Optional["ScanFilter"] = None,
 ) -> ClassifyResult:
     """
     依照年份和類型分類檔案
@@ -104,129 +320,801 @@ def classify_files_by_year_and_type(
     Args:
         source_folder: 來源資料夾路徑
         target_folder: 目標資料夾路徑
+        workers: 搬移用的工作執行緒數量（1 表示在主執行緒依序搬移）
+        incremental: 使用目標資料夾中的索引，只處理新增或變動的檔案
+        precreate_dirs: 先掃描完整棵樹並一次建立所有目標資料夾，再開始搬移
+        dedup: 搬移前偵測重複檔案；"report" 只回報，"skip" 將重複檔案留在來源，
+            "hardlink" 讓重複檔案以硬連結指向正本
+        stream_log: 串流模式；逐檔記錄附加寫入此 JSONL / CSV 檔，
+            結果只保留累計統計，記憶體用量與檔案數無關
+        compact: result.files 使用欄式儲存（FileStore），大幅降低每個檔案的記憶體
+        progress: 進度顯示與逐檔記錄（None 表示不顯示也不記錄）
+        rules: 自訂分類規則（None 表示內建的副檔名對應）
+        detail_k: 完整報告：每個年份、類型的前 K 大檔案與最古老的 K 個檔案（0 表示不追蹤）
+        journal: 在目標資料夾寫入搬移日誌（先寫入計畫再搬移），中斷後可接續或還原
+            （預設關閉；CLI 預設開啟，以 --no-journal 關閉）
+        resume: 接續上一次中斷的整理：補齊進行中的搬移，已完成的來源資料夾不再列出
+        exports: 逐檔記錄輸出（.jsonl / .csv / .fcol），執行中逐筆寫入，不影響 result.files
+        profiler: 記錄掃描、分類、建立資料夾、搬移等各種操作的次數與耗時（None 表示不剖析）
+        clean: 搬移時逐步刪除搬空的來源資料夾（數量記在 result.cleaned_count）
+        scan_filter: 掃描篩選條件（排除 / 包含樣式、最大深度、大小與修改時間）
+
+    Returns:
+        ClassifyResult: 分類結果統計（incremental 時附帶累計統計）
+    """
+    result = ClassifyResult(
+        source_folder=source_folder,
+        target_folder=target_folder,
+        keep_files=stream_log is None,
+        compact=compact,
+        detail_k=detail_k,
+        record_sink=_open_records(stream_log, exports),
+    )
+    index: Optional["ScanIndex"] = None
+    if incremental:
+        from .index import ScanIndex
+
+        source_folder = os.path.abspath(source_folder)
+        index = ScanIndex(target_folder, source_folder)
+
+    move_journal: Optional["MoveJournal"] = None
+    if journal:
+        from .journal import MoveJournal, read_journal
+
+        source_folder = os.path.abspath(source_folder)
+        state = read_journal(target_folder) if resume else None
+        move_journal = MoveJournal(target_folder, source_folder, state)
+        if state is not None:
+            result.resumed_count, _ = move_journal.recover(state)
+
+    progress = progress or NullProgress()
+    prof = profiler or NullProfiler()
+
+    # 增量索引優先；否則由日誌略過上次已完成的資料夾
+    scan_state: Optional[ScanState] = index if index is not None else move_journal
+    cleaner: Optional["EmptyDirCleaner"] = None
+    if clean:
+        from .cleanup import EmptyDirCleaner
+
+        # 資料夾路徑要與 os.path.dirname 的結果一致（不帶結尾斜線）
+        source_folder = os.path.abspath(source_folder)
+
+        def on_remove(folder: str) -> None:
+            if progress.logging:
+                progress.log(f"清理空資料夾: {folder}")
+
+        cleaner = EmptyDirCleaner(source_folder, scan_state, on_remove)
+        scan_state = cleaner
+
+    session = _Session(
+        result=result,
+        progress=progress,
+        dirs=DirectoryCache(target_folder),
+        index=index,
+        journal=move_journal,
+        cleaner=cleaner,
+        profiler=prof,
+    )
+    from .planner import iter_plan
+
+    names = NameIndex()
+
+    def on_error(entry: ScanEntry, error: Exception) -> None:
+        session.fail(entry.path, entry.name, error)
+
+    try:
+        with progress:
+            entries: Iterable[ScanEntry] = prof.iterate(
+                scan_files(source_folder, scan_state, scan_filter), "scan"
+            )
+            if move_journal is not None:
+                entries = move_journal.track(entries)
+            if cleaner is not None:
+                entries = cleaner.track(entries)
+
+            # 重複檔案偵測需要完整的檔案清單
+            duplicate_of: Dict[str, str] = {}
+            if dedup:
+                from .dedup import find_duplicates
+
+                entries = list(entries)
+                with prof.op("dedup"):
+                    result.duplicate_groups = find_duplicates(entries)
+                result.dedup_action = dedup
+                for group in result.duplicate_groups:
+                    for path in group.duplicates:
+                        duplicate_of[path] = group.kept
+
+                if dedup == "skip":
+                    skipped = [e for e in entries if e.path in duplicate_of]
+                    entries = [e for e in entries if e.path not in duplicate_of]
+                    for e in skipped:
+                        if index is not None:
+                            index.record_pending(e.path, e.size, e.mtime, e.ino)
+                        if cleaner is not None:
+                            cleaner.kept(e.path)
+                progress.expect(len(entries))
+
+            # 硬連結模式：重複檔案等正本搬完後再處理
+            kept_paths = set(duplicate_of.values())
+            kept_targets: Dict[str, str] = {}
+            linked: List["PlannedMove"] = []
+
+            # 以 scandir 串流掃描，決策在主執行緒，搬移交給工作執行緒
+            with MoveEngine(workers) as engine:
+                moves: Iterable["PlannedMove"] = prof.iterate(
+                    iter_plan(entries, target_folder, names, on_error, rules), "classify"
+                )
+                if precreate_dirs:
+                    moves = list(moves)
+                    progress.expect(len(moves))
+                    with prof.op("makedirs"):
+                        session.dirs.precreate(move.target_dir for move in moves)
+
+                # 有日誌時，計畫記錄 fsync 之後才送出這一批搬移
+                ready: List["PlannedMove"] = []
+                for move in moves:
+                    synced = False
+                    if move_journal is not None:
+                        with prof.op("journal"):
+                            synced = move_journal.plan(move)
+                    if dedup == "hardlink" and move.source in duplicate_of:
+                        linked.append(move)
+                    else:
+                        if dedup == "hardlink" and move.source in kept_paths:
+                            kept_targets[move.source] = move.target
+                        ready.append(move)
+                    if move_journal is None or synced:
+                        # 佇列滿時 submit 會等待工作執行緒（搬移跟不上掃描）
+                        with prof.op("submit"):
+                            for pending in ready:
+                                engine.submit(session.move_file, pending)
+                        ready.clear()
+
+                if move_journal is not None:
+                    with prof.op("journal"):
+                        move_journal.sync()
+                for pending in ready:
+                    engine.submit(session.move_file, pending)
+
+            if linked:
+                with MoveEngine(workers) as engine:
+                    for move in linked:
+                        kept = kept_targets.get(duplicate_of[move.source], "")
+                        engine.submit(session.link_file, move, kept)
+
+            if index is not None:
+                with prof.op("index"):
+                    index.finish()
+                result.skipped_count = index.skipped_count
+                result.cumulative = index.cumulative_stats()
+            if move_journal is not None:
+                with prof.op("journal"):
+                    move_journal.finish()
+            if cleaner is not None:
+                result.cleaned_count = cleaner.removed_count
+    finally:
+        if index is not None:
+            index.close()
+        if move_journal is not None:
+            move_journal.close()
+        if result.record_sink is not None:
+            result.record_sink.close()
+
+    session.finish()
+
+    # 寫入錯誤記錄
+    with prof.op("error_log"):
+        _write_error_log(result)
+
+    return result
+
+
+async def organize_async(
+    source_folder: str,
+    target_folder: str,
+    concurrency: int = 32,
+    stream_log: Optional[str] = None,
+    compact: bool = True,
+    progress: Optional[ProgressSink] = None,
+    rules: Optional["RuleSet"] = None,
+    detail_k: int = 0,
+    exports: Optional[List[str]] = None,
+    scan_filter: Optional["ScanFilter"] = None,
+) -> ClassifyResult:
+    """
+    非同步版本的整理流程，適合 NFS / SMB 等高延遲的檔案系統
+
+    列出資料夾、stat 與搬移都交給有界的執行緒池，由 asyncio 同時發出多個
+    操作，讓每個檔案的網路延遲互相重疊，而不是逐一累加。每個來源掛載點
+    （裝置編號）各有一個 semaphore 與大小同為 concurrency 的執行緒池，
+    一個掛載點很慢時不會佔滿其他掛載點的執行緒。
+    處理順序不固定，同名檔案的序號可能與同步版本不同。
+    不支援增量索引與重複偵測。
+
+    Args:
+        source_folder: 來源資料夾路徑
+        target_folder: 目標資料夾路徑
+        concurrency: 每個掛載點同時進行的操作上限
+        stream_log: 串流模式的逐檔記錄檔（同 classify_files_by_year_and_type）
+        compact: result.files 使用欄式儲存
+        progress: 進度顯示與逐檔記錄（None 表示不顯示也不記錄）
+        rules: 自訂分類規則（None 表示內建的副檔名對應）
+        detail_k: 完整報告：每個年份、類型的前 K 大檔案與最古老的 K 個檔案（0 表示不追蹤）
+        exports: 逐檔記錄輸出（.jsonl / .csv / .fcol），執行中逐筆寫入，不影響 result.files
+        scan_filter: 掃描篩選條件（排除 / 包含樣式、最大深度、大小與修改時間）
 
     Returns:
         ClassifyResult: 分類結果統計
     """
-    result = ClassifyResult(source_folder=source_folder, target_folder=target_folder)
-    console = Console()
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+
+    from .planner import iter_plan
+
+    loop = asyncio.get_running_loop()
+    concurrency = max(1, concurrency)
+    result = ClassifyResult(
+        source_folder=source_folder,
+        target_folder=target_folder,
+        keep_files=stream_log is None,
+        compact=compact,
+        detail_k=detail_k,
+        record_sink=_open_records(stream_log, exports),
+    )
+    progress = progress or NullProgress()
+    session = _Session(
+        result=result,
+        progress=progress,
+        dirs=DirectoryCache(target_folder),
+    )
+    names = NameIndex()
+    # 裝置編號 -> (同時進行的操作上限, 執行緒池)
+    devices: Dict[int, Tuple[asyncio.Semaphore, ThreadPoolExecutor]] = {}
+    tasks: Set[asyncio.Task] = set()
+
+    def on_error(entry: ScanEntry, error: Exception) -> None:
+        session.fail(entry.path, entry.name, error)
 
-    # 遍歷資料夾及其子資料夾
-    for root, dirs, files in os.walk(source_folder):
-        for file in files:
-            # 跳過隱藏檔案
-            if file.startswith("."):
-                continue
+    def process(folder: str, name: str) -> None:
+        """stat、分類並搬移單一檔案（在執行緒池中執行）"""
+        entry = stat_entry(folder, name)
+        if _skips_stat(entry, scan_filter):
+            return
+        for move in iter_plan((entry,), target_folder, names, on_error, rules):
+            session.move_file(move)
 
-            file_path = os.path.join(root, file)
+    def device(dev: int) -> Tuple[asyncio.Semaphore, ThreadPoolExecutor]:
+        lane = devices.get(dev)
+        if lane is None:
+            pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="organizer")
+            lane = devices[dev] = (asyncio.Semaphore(concurrency), pool)
+        return lane
 
+    def spawn(coro) -> None:
+        task = loop.create_task(coro)
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    async def handle_file(
+        folder: str, name: str, sem: asyncio.Semaphore, pool: ThreadPoolExecutor
+    ) -> None:
+        try:
+            await loop.run_in_executor(pool, process, folder, name)
+        finally:
+            sem.release()
+
+    async def walk(folder: str, dev: int) -> None:
+        sem, pool = device(dev)
+        async with sem:
             try:
-                # 獲取檔案資訊
-                file_stat = os.stat(file_path)
-                file_mtime = datetime.fromtimestamp(file_stat.st_mtime)
-                file_year = file_mtime.year
-
-                # 獲取檔案的副檔名
-                file_extension = os.path.splitext(file)[1].lower()
-
-                # 根據副檔名確定目標資料夾名稱
-                if file_extension in EXTENSION_MAPPING:
-                    folder_name = EXTENSION_MAPPING[file_extension]
-                elif file_extension:
-                    folder_name = file_extension[1:]  # 移除開頭的點
-                else:
-                    folder_name = "other"
-
-                # 建立 FileStats
-                stats = FileStats(
-                    original_path=file_path,
-                    filename=file,
-                    size_bytes=file_stat.st_size,
-                    modified_time=file_mtime,
-                    year=file_year,
-                    file_type=folder_name,
-                    success=True,
+                filenames, subdirs = await loop.run_in_executor(
+                    pool, list_dir, folder, scan_filter, source_folder
                 )
+            except OSError:
+                # 與 os.walk 相同：無法列出的資料夾直接略過
+                return
 
-                # 定義目標資料夾路徑
-                target_folder_by_year = os.path.join(target_folder, str(file_year))
-                target_folder_by_type = os.path.join(target_folder_by_year, folder_name)
-
-                # 創建目標資料夾（如果不存在）
-                os.makedirs(target_folder_by_type, exist_ok=True)
-
-                # 處理同名檔案
-                target_file_path = os.path.join(target_folder_by_type, file)
-                if os.path.exists(target_file_path):
-                    # 加上時間戳避免覆蓋
-                    name, ext = os.path.splitext(file)
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    new_name = f"{name}_{timestamp}{ext}"
-                    target_file_path = os.path.join(target_folder_by_type, new_name)
-
-                # 移動檔案到目標資料夾
-                shutil.move(file_path, target_file_path)
-                console.print(f"[dim]移動: {file}[/]")
-
-                result.files.append(stats)
-
-            except PermissionError as e:
-                stats = FileStats(
-                    original_path=file_path,
-                    filename=file,
-                    size_bytes=0,
-                    modified_time=datetime.now(),
-                    year=0,
-                    file_type="unknown",
-                    success=False,
-                    error_message=f"權限不足: {e}",
-                )
-                result.files.append(stats)
-                console.print(f"[red]權限錯誤: {file}[/]")
-
-            except FileNotFoundError as e:
-                stats = FileStats(
-                    original_path=file_path,
-                    filename=file,
-                    size_bytes=0,
-                    modified_time=datetime.now(),
-                    year=0,
-                    file_type="unknown",
-                    success=False,
-                    error_message=f"檔案不存在: {e}",
+        # 子資料夾先送出，讓目錄列出與檔案搬移同時進行
+        for path, subdir_dev in subdirs:
+            spawn(walk(path, subdir_dev))
+        # 取得名額後才建立工作，進行中的檔案數維持在上限內
+        for name in filenames:
+            await sem.acquire()
+            spawn(handle_file(folder, name, sem, pool))
+
+    try:
+        with progress:
+            try:
+                spawn(walk(source_folder, os.stat(source_folder).st_dev))
+                while tasks:
+                    await asyncio.gather(*tasks)
+            finally:
+                for _, pool in devices.values():
+                    pool.shutdown()
+    finally:
+        if result.record_sink is not None:
+            result.record_sink.close()
+
+    session.finish()
+    _write_error_log(result)
+
+    return result
+
+
+def _organize_shard(
+    folder: str,
+    recursive: bool,
+    target_folder: str,
+    workers: int,
+    precreate_dirs: bool,
+    rules: Optional["RuleSet"],
+    detail_k: int,
+    scan_filter: Optional["ScanFilter"],
+    source_folder: str,
+) -> ClassifyResult:
+    """
+    在工作程序中整理一個分片
+
+    目標檔名以佔位檔跨程序保留，不會與其他程序搬入同一資料夾的檔案衝突。
+    篩選條件的路徑與深度以整個來源資料夾 source_folder 為準。
+    """
+    from .planner import iter_plan
+
+    result = ClassifyResult(
+        source_folder=folder,
+        target_folder=target_folder,
+        compact=True,
+        detail_k=detail_k,
+    )
+    session = _Session(
+        result=result,
+        progress=NullProgress(),
+        dirs=DirectoryCache(target_folder),
+        placeholders=True,
+    )
+    names = NameIndex(exclusive=True)
+
+    def on_error(entry: ScanEntry, error: Exception) -> None:
+        session.fail(entry.path, entry.name, error)
+
+    entries: Iterable[ScanEntry]
+    if recursive:
+        entries = scan_files(folder, scan_filter=scan_filter, root=source_folder)
+    else:
+        try:
+            filenames, _ = list_dir(folder, scan_filter, source_folder)
+        except OSError:
+            filenames = []
+        entries = (stat_entry(folder, name) for name in filenames)
+        if scan_filter is not None:
+            entries = (e for e in entries if not _skips_stat(e, scan_filter))
+
+    with MoveEngine(workers) as engine:
+        moves: Iterable["PlannedMove"] = iter_plan(
+            entries, target_folder, names, on_error, rules
+        )
+        if precreate_dirs:
+            moves = list(moves)
+            session.dirs.precreate(move.target_dir for move in moves)
+        for move in moves:
+            engine.submit(session.move_file, move)
+
+    session.finish()
+    return result
+
+
+def organize_sharded(
+    source_folder: str,
+    target_folder: str,
+    processes: int,
+    workers: int = 1,
+    precreate_dirs: bool = False,
+    compact: bool = True,
+    progress: Optional[ProgressSink] = None,
+    rules: Optional["RuleSet"] = None,
+    detail_k: int = 0,
+    exports: Optional[List[str]] = None,
+    scan_filter: Optional["ScanFilter"] = None,
+) -> ClassifyResult:
+    """
+    以多個程序平行整理，適合單一程序已吃滿一顆 CPU 的超大來源樹
+
+    來源樹依最上層子資料夾切成分片（分片太少時再往下展開），全部送進程序池，
+    先做完的程序直接接手下一個分片，大小不均的樹也不會只剩一個程序在忙。
+    每個程序各自分類與搬移，回傳的部分結果在主程序合併，
+    目標檔名以 O_EXCL 佔位檔跨程序保留。不支援增量索引、重複偵測與串流模式。
+
+    Args:
+        source_folder: 來源資料夾路徑
+        target_folder: 目標資料夾路徑
+        processes: 工作程序數量
+        workers: 每個程序內搬移用的工作執行緒數量
+        precreate_dirs: 每個分片先建立所有目標資料夾再搬移
+        compact: result.files 使用欄式儲存
+        progress: 進度顯示（以分片為單位更新）
+        rules: 自訂分類規則（None 表示內建的副檔名對應）
+        detail_k: 完整報告：每個年份、類型的前 K 大檔案與最古老的 K 個檔案（0 表示不追蹤）
+        exports: 逐檔記錄輸出（.jsonl / .csv / .fcol），每個分片合併時寫入
+        scan_filter: 掃描篩選條件（排除的資料夾不會成為分片）
+
+    Returns:
+        ClassifyResult: 合併後的分類結果統計
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    source_folder = os.path.abspath(source_folder)
+    target_folder = os.path.abspath(target_folder)
+    result = ClassifyResult(
+        source_folder=source_folder,
+        target_folder=target_folder,
+        compact=compact,
+        detail_k=detail_k,
+        record_sink=_open_records(None, exports),
+    )
+    progress = progress or NullProgress()
+    shards = shard_tree(source_folder, max(1, processes) * 4, scan_filter=scan_filter)
+
+    # spawn：主程序有進度顯示等執行緒，不以 fork 複製
+    try:
+        with progress, ProcessPoolExecutor(
+            max_workers=max(1, processes),
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as pool:
+            futures = [
+                pool.submit(
+                    _organize_shard,
+                    folder,
+                    recursive,
+                    target_folder,
+                    workers,
+                    precreate_dirs,
+                    rules,
+                    detail_k,
+                    scan_filter,
+                    source_folder,
                 )
-                result.files.append(stats)
-                console.print(f"[red]找不到檔案: {file}[/]")
-
-            except Exception as e:
-                stats = FileStats(
-                    original_path=file_path,
-                    filename=file,
-                    size_bytes=0,
-                    modified_time=datetime.now(),
-                    year=0,
-                    file_type="unknown",
-                    success=False,
-                    error_message=str(e),
+                for folder, recursive in shards
+            ]
+            for future in as_completed(futures):
+                partial = future.result()
+                result.merge(partial)
+                progress.advance_result(partial)
+    finally:
+        if result.record_sink is not None:
+            result.record_sink.close()
+
+    _write_error_log(result)
+
+    return result
+
+
+def apply_plan(
+    plan: "MovePlan",
+    workers: int = 1,
+    progress: Optional[ProgressSink] = None,
+    detail_k: int = 0,
+    exports: Optional[List[str]] = None,
+) -> ClassifyResult:
+    """
+    執行事先建立的搬移計畫
+
+    先一次建立所有目標資料夾，再依「同裝置 rename 優先、跨裝置複製最後」
+    的順序搬移。執行前若目標已被佔用（計畫建立後才出現的檔案），會重新命名。
+
+    Args:
+        plan: 搬移計畫
+        workers: 搬移用的工作執行緒數量
+        progress: 進度顯示與逐檔記錄（None 表示不顯示也不記錄）
+        detail_k: 完整報告：每個年份、類型的前 K 大檔案與最古老的 K 個檔案（0 表示不追蹤）
+        exports: 逐檔記錄輸出（.jsonl / .csv / .fcol），執行中逐筆寫入
+
+    Returns:
+        ClassifyResult: 分類結果統計
+    """
+    result = ClassifyResult(
+        source_folder=plan.source_folder,
+        target_folder=plan.target_folder,
+        compact=True,
+        detail_k=detail_k,
+        record_sink=_open_records(None, exports),
+    )
+    progress = progress or NullProgress()
+    session = _Session(
+        result=result,
+        progress=progress,
+        dirs=DirectoryCache(plan.target_folder),
+    )
+
+    for failure in plan.failures:
+        result.add(failure.to_stats())
+
+    # 批次建立目標資料夾（失敗的資料夾留給個別搬移時回報）
+    session.dirs.precreate(plan.target_dirs)
+
+    target_dev = os.stat(plan.target_folder).st_dev
+    names = NameIndex()
+
+    try:
+        with progress, MoveEngine(workers) as engine:
+            progress.expect(len(plan.moves))
+            for move in plan.ordered_moves(target_dev):
+                move.target = names.reserve(move.target_dir, os.path.basename(move.target))
+                engine.submit(session.move_file, move)
+    finally:
+        if result.record_sink is not None:
+            result.record_sink.close()
+
+    session.finish()
+    _write_error_log(result)
+
+    return result
+
+
+def watch_folder(
+    source_folder: str,
+    target_folder: str,
+    workers: int = 1,
+    settle: Optional[float] = None,
+    poll_interval: Optional[float] = None,
+    stream_log: Optional[str] = None,
+    exports: Optional[List[str]] = None,
+    progress: Optional[ProgressSink] = None,
+    rules: Optional["RuleSet"] = None,
+    detail_k: int = 0,
+    stop: Optional[threading.Event] = None,
+    scan_filter: Optional["ScanFilter"] = None,
+) -> ClassifyResult:
+    """
+    持續監看來源資料夾，新檔案寫完後立即整理（直到 Ctrl-C 或 stop 被設定）
+
+    Linux 使用 inotify，其他平台或 watch 數量超過上限時改為輪詢。每個檔案
+    在最後一次事件後等 settle 秒、且前後兩次 stat 相同才視為寫完，同一時間
+    寫完的檔案成為一個小批次，交給與一般整理相同的分類與搬移流程。
+    啟動時資料夾中已有的檔案也會先整理。沒有事件時阻塞等待，不耗用 CPU。
+    結果只保留累計統計（同串流模式），長時間執行時記憶體用量不會增加。
+
+    Args:
+        source_folder: 要監看的來源資料夾
+        target_folder: 目標資料夾（位於來源底下時不會被監看）
+        workers: 搬移用的工作執行緒數量
+        settle: 檔案最後一次事件後要安靜多久才檢查是否寫完（秒，None 表示 DEFAULT_SETTLE）
+        poll_interval: 輪詢模式的掃描間隔（秒，None 表示 DEFAULT_POLL_INTERVAL）
+        stream_log: 逐檔記錄檔（同 classify_files_by_year_and_type）
+        exports: 逐檔記錄輸出（.jsonl / .csv / .fcol），執行中逐筆寫入
+        progress: 進度顯示與逐檔記錄（None 表示不顯示也不記錄）
+        rules: 自訂分類規則（None 表示內建的副檔名對應）
+        detail_k: 完整報告：每個年份、類型的前 K 大檔案與最古老的 K 個檔案（0 表示不追蹤）
+        stop: 設定後結束監看（None 表示只能以 Ctrl-C 結束）
+        scan_filter: 掃描篩選條件（既有檔案與新檔案都適用）
+
+    Returns:
+        ClassifyResult: 監看期間的分類結果統計
+    """
+    source_folder = os.path.abspath(source_folder)
+    target_folder = os.path.abspath(target_folder)
+    result = ClassifyResult(
+        source_folder=source_folder,
+        target_folder=target_folder,
+        keep_files=False,
+        detail_k=detail_k,
+        record_sink=_open_records(stream_log, exports),
+    )
+    progress = progress or NullProgress()
+    session = _Session(
+        result=result,
+        progress=progress,
+        dirs=DirectoryCache(target_folder),
+    )
+    from .planner import iter_plan
+    from .watcher import CLOSED, DEFAULT_POLL_INTERVAL, DEFAULT_SETTLE, Debouncer, create_watcher
+
+    names = NameIndex()
+    debouncer = Debouncer(DEFAULT_SETTLE if settle is None else settle)
+
+    def on_error(entry: ScanEntry, error: Exception) -> None:
+        session.fail(entry.path, entry.name, error)
+
+    try:
+        with progress, create_watcher(
+            source_folder,
+            exclude=[target_folder],
+            poll_interval=DEFAULT_POLL_INTERVAL if poll_interval is None else poll_interval,
+            scan_filter=scan_filter,
+        ) as watcher, MoveEngine(workers) as engine:
+            # 監看開始後才列出既有檔案，兩者之間出現的檔案不會漏掉
+            now = time.monotonic()
+            for entry in scan_files(source_folder, scan_filter=scan_filter):
+                if not _is_within(entry.path, target_folder):
+                    debouncer.add(entry.path, CLOSED, now)
+
+            while stop is None or not stop.is_set():
+                deadline = debouncer.next_deadline()
+                timeout = _WATCH_WAKEUP
+                if deadline is not None:
+                    timeout = min(timeout, max(0.0, deadline - time.monotonic()))
+
+                now = time.monotonic()
+                for path, kind in watcher.read(timeout):
+                    # 隱藏檔案與隱藏資料夾中的檔案同掃描時一樣略過
+                    relpath = os.path.relpath(path, source_folder).replace(os.sep, "/")
+                    if not any(part.startswith(".") for part in relpath.split("/")):
+                        debouncer.add(path, kind, now)
+
+                ready = debouncer.pop_ready(time.monotonic())
+                if not ready:
+                    continue
+                entries: Iterable[ScanEntry] = (
+                    stat_entry(os.path.dirname(p), os.path.basename(p)) for p in ready
                 )
-                result.files.append(stats)
-                console.print(f"[red]錯誤: {file} - {e}[/]")
+                if scan_filter is not None:
+                    entries = (
+                        e
+                        for e in entries
+                        if scan_filter.accepts(
+                            e, os.path.relpath(e.path, source_folder).replace(os.sep, "/")
+                        )
+                    )
+                for move in iter_plan(entries, target_folder, names, on_error, rules):
+                    engine.submit(session.move_file, move)
+                if progress.logging:
+                    progress.log(f"批次: {len(ready)} 個檔案")
+    except KeyboardInterrupt:
+        # Ctrl-C 是正常的結束方式；已送出的搬移會在 MoveEngine 結束時完成
+        pass
+    finally:
+        if result.record_sink is not None:
+            result.record_sink.close()
 
-    # 寫入錯誤記錄
-    errors = result.failed_files
-    if errors:
-        error_file_path = os.path.join(target_folder, "error.txt")
-        with open(error_file_path, "w", encoding="utf-8") as f:
-            f.write(f"錯誤記錄 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write("=" * 50 + "\n\n")
-            for err in errors:
-                f.write(f"檔案: {err.original_path}\n")
-                f.write(f"錯誤: {err.error_message}\n")
-                f.write("-" * 30 + "\n")
+    session.finish()
+    _write_error_log(result)
 
     return result
 
 
+def _skips_stat(entry: ScanEntry, scan_filter: Optional["ScanFilter"]) -> bool:
+    """單獨 stat 的檔案是否被大小或修改時間條件排除（stat 失敗的照常回報）"""
+    return (
+        scan_filter is not None
+        and entry.error is None
+        and scan_filter.skips_stat(entry.size, entry.mtime)
+    )
+
+
+def _is_within(path: str, folder: str) -> bool:
+    """path 是否位於 folder 之中"""
+    return path.startswith(folder + os.sep)
+
+
+def undo_organize(
+    target_folder: str,
+    workers: int = 1,
+    progress: Optional[ProgressSink] = None,
+) -> Tuple[int, List[str]]:
+    """
+    依目標資料夾中的日誌，把上一次整理搬過的檔案搬回原位
+
+    再執行一次會還原更早的一次整理。
+    以記錄的相反順序處理；中斷的還原可以再執行一次，已搬回的檔案不會重複處理。
+    整理中斷時留下的半成品（來源與目標同時存在且沒有完成記錄）直接刪除。
+    還原後變空的目標資料夾會一併移除。
+
+    Args:
+        target_folder: 目標資料夾路徑
+        workers: 搬移用的工作執行緒數量
+        progress: 進度顯示與逐檔記錄（None 表示不顯示也不記錄）
+
+    Returns:
+        (搬回的檔案數, 無法還原的訊息清單)
+
+    Raises:
+        FileNotFoundError: 目標資料夾中沒有日誌，或日誌中的整理都已還原
+    """
+    from .journal import MoveJournal, journal_path, read_journal
+
+    state = read_journal(target_folder)
+    if state is None:
+        raise FileNotFoundError(journal_path(target_folder))
+
+    progress = progress or NullProgress()
+    backend = MoveBackend()
+    dirs = DirectoryCache()
+    errors: List[str] = []
+    restored = 0
+    lock = threading.Lock()
+    journal = MoveJournal(target_folder, undo=True)
+
+    def restore(source: str, target: str) -> None:
+        nonlocal restored
+        try:
+            if os.path.lexists(source):
+                if os.path.lexists(target):
+                    if source in state.done:
+                        raise FileExistsError(f"原位置已有檔案: {source}")
+                    # 整理中斷時的半成品，來源仍是完整的
+                    os.unlink(target)
+                # 否則是上次還原中斷前已搬回、但還沒寫入記錄的檔案
+                journal.undone(source)
+                return
+            size = os.lstat(target).st_size
+            dirs.ensure(os.path.dirname(source))
+            backend.move(target, source, size)
+        except OSError as e:
+            with lock:
+                errors.append(f"{target} - {e}")
+            progress.fail(f"{target} - {e}")
+            return
+
+        journal.undone(source)
+        with lock:
+            restored += 1
+        # 類型資料夾名稱即檔案類型
+        progress.advance(size, os.path.basename(os.path.dirname(target)))
+        if progress.logging:
+            progress.log(f"還原: {target} -> {source}")
+
+    moves = [
+        (src, dst)
+        for src, dst in reversed(list(state.planned.items()))
+        if src not in state.undone and (src in state.done or os.path.lexists(dst))
+    ]
+    try:
+        with progress, MoveEngine(workers) as engine:
+            progress.expect(len(moves))
+            for source, target in moves:
+                engine.submit(restore, source, target)
+        journal.finish()
+    finally:
+        journal.close()
+
+    # 移除還原後變空的目標資料夾（由深到淺）
+    target_root = os.path.abspath(target_folder)
+    emptied: Set[str] = set()
+    for _, target in moves:
+        folder = os.path.dirname(os.path.abspath(target))
+        while folder != target_root and folder.startswith(target_root + os.sep):
+            emptied.add(folder)
+            folder = os.path.dirname(folder)
+    for folder in sorted(emptied, key=len, reverse=True):
+        try:
+            os.rmdir(folder)
+        except OSError:
+            pass
+
+    return restored, errors
+
+
+def _export_summaries(result: ClassifyResult, exports: List[str], console: Console) -> None:
+    """為每個 --export 輸出寫出對應的彙總統計檔"""
+    if not exports:
+        return
+    from .exporters import summary_path, write_summary
+
+    for path in exports:
+        summary = summary_path(path)
+        write_summary(result, summary)
+        console.print(f"[green]已輸出: {path}（彙總: {summary}）[/]")
+
+
+def _finish_profile(
+    profiler: "Profiler", path: str, printer: "ReportPrinter", console: Console
+) -> None:
+    """顯示剖析結果，有指定路徑時另外輸出"""
+    printer.print_profile(profiler)
+    if path:
+        path = os.path.expanduser(path)
+        profiler.save(path)
+        console.print(f"[green]剖析結果已輸出: {path}[/]")
+
+
+def _report_printer() -> "ReportPrinter":
+    """建立報告輸出器（Rich 表格與吐槽產生器在第一次輸出報告時才匯入）"""
+    from .reporter import ReportPrinter
+
+    return ReportPrinter()
+
+
 def run() -> None:
     """主程式入口"""
     console = Console()
@@ -240,6 +1128,13 @@ def run() -> None:
   file-organizer                           # 互動模式
   file-organizer --source ~/Downloads --target ~/Organized
   file-organizer -s ./messy -t ./clean
+  file-organizer -s /mnt/nas/inbox -t ./clean --workers 8
+  file-organizer -s ./messy -t ./clean --dry-run --plan-file plan.json
+  file-organizer --apply plan.json
+  file-organizer -s ~/Inbox -t ~/Organized --incremental   # 每晚排程
+  file-organizer -s ./messy -t ./clean --resume            # 接續中斷的整理
+  file-organizer -t ./clean --undo                         # 還原上一次整理
+  file-organizer -s ~/dev -t ./clean --exclude node_modules --exclude __pycache__ --min-size 1MB
         """,
     )
     parser.add_argument(
@@ -252,17 +1147,262 @@ def run() -> None:
         "--no-gui", action="store_true", help="強制使用 CLI 模式（不使用 GUI 選擇器）"
     )
     parser.add_argument(
-        "--clean", action="store_true", help="處理完成後清理來源資料夾中的空資料夾"
+        "--clean", action="store_true", help="清理來源資料夾中的空資料夾（預設流程在搬移時逐步清理）"
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="搬移檔案的平行執行緒數量（預設 1，適合網路磁碟或跨裝置搬移時調高）",
+    )
+    parser.add_argument(
+        "--dry-run",
+        "--plan",
+        dest="dry_run",
+        action="store_true",
+        help="只建立搬移計畫，不搬移檔案也不建立資料夾",
+    )
+    parser.add_argument(
+        "--plan-file",
+        type=str,
+        metavar="PATH",
+        help="搭配 --dry-run，將計畫輸出為 JSON（.json）或 CSV（.csv）",
+    )
+    parser.add_argument(
+        "--apply",
+        type=str,
+        metavar="PLAN",
+        help="執行先前以 --dry-run --plan-file 輸出的 JSON 計畫",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="接續上一次中斷的整理（依目標資料夾中的搬移日誌）",
+    )
+    parser.add_argument(
+        "--undo",
+        action="store_true",
+        help="依目標資料夾中的搬移日誌，把上一次整理的檔案搬回原位",
+    )
+    parser.add_argument(
+        "--no-journal",
+        action="store_true",
+        help="不寫入搬移日誌（無法 --resume / --undo）",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="在目標資料夾保存掃描索引，之後只處理新增或變動的檔案",
+    )
+    parser.add_argument(
+        "--precreate-dirs",
+        action="store_true",
+        help="先掃描完整棵樹並一次建立所有目標資料夾，再開始搬移",
+    )
+    parser.add_argument(
+        "--dedup",
+        choices=DEDUP_ACTIONS,
+        help="搬移前偵測內容重複的檔案：report 只回報、skip 留在來源、hardlink 以硬連結取代",
+    )
+    parser.add_argument(
+        "--stream-log",
+        type=str,
+        metavar="PATH",
+        help="串流模式：逐檔記錄寫入 JSONL（.csv 為 CSV、.fcol 為欄式二進位），記憶體只保留統計",
+    )
+    parser.add_argument(
+        "--export",
+        action="append",
+        metavar="PATH",
+        help="執行中逐檔寫出記錄（.jsonl / .csv / .fcol 欄式二進位），"
+        "結束時另外寫出彙總統計（例如 run.csv 對應 run.summary.csv），可重複指定",
+    )
+    parser.add_argument(
+        "--full-report",
+        type=int,
+        nargs="?",
+        const=3,
+        default=0,
+        metavar="K",
+        help="完整羞辱報告：每個年份、每個類型的前 K 大檔案與最古老的 K 個檔案（預設 K=3）",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        metavar="PATH",
+        help="剖析各階段與各種操作的次數、耗時與延遲分布，顯示在報告最後；"
+        "指定 PATH 時另外輸出（.json、.speedscope.json 或 .prof）",
+    )
+    parser.add_argument(
+        "--rules",
+        type=str,
+        metavar="PATH",
+        help="從 TOML 規則檔載入自訂分類規則（副檔名群組、檔名樣式、大小門檻、年齡分組）",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        metavar="GLOB",
+        help="排除符合的檔案與資料夾（例如 node_modules、*.tmp；含 / 時比對相對路徑，"
+        "以 / 結尾只比對資料夾），排除的資料夾整棵不掃描，可重複指定",
+    )
+    parser.add_argument(
+        "--include",
+        action="append",
+        metavar="GLOB",
+        help="只處理符合的檔案（例如 *.jpg），可重複指定",
+    )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        metavar="N",
+        help="最多進入 N 層子資料夾（0 表示只處理來源資料夾本身的檔案）",
+    )
+    parser.add_argument(
+        "--min-size",
+        type=str,
+        metavar="SIZE",
+        help="不處理小於此大小的檔案（例如 500KB、1.5GB）",
+    )
+    parser.add_argument(
+        "--older-than",
+        type=str,
+        metavar="AGE",
+        help="只處理修改時間早於此時間之前的檔案（例如 30d、2w、6m、1y；只寫數字為天數）",
+    )
+    parser.add_argument(
+        "--newer-than",
+        type=str,
+        metavar="AGE",
+        help="只處理最近此時間內修改過的檔案（格式同 --older-than）",
+    )
+    parser.add_argument(
+        "-p",
+        "--processes",
+        type=int,
+        metavar="N",
+        help="依最上層子資料夾切分來源樹，以 N 個程序平行分類與搬移",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="持續監看來源資料夾，新檔案寫完後立即整理（Linux 使用 inotify，其他平台輪詢；Ctrl-C 結束）",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        metavar="N",
+        help="使用 asyncio 引擎，每個掛載點最多 N 個同時進行的操作（適合 NFS / SMB）",
+    )
+    parser.add_argument(
+        "-q",
+        "--quiet",
+        action="store_true",
+        help="不顯示即時進度（搭配 --log-file 時仍寫入逐檔記錄）",
+    )
+    parser.add_argument(
+        "--log-file",
+        type=str,
+        metavar="PATH",
+        help="將逐檔的搬移與錯誤訊息附加寫入此檔案",
     )
 
     args = parser.parse_args()
+    profiler: Optional["Profiler"] = None
+    if args.profile is not None:
+        from .profiling import Profiler
+
+        profiler = Profiler()
+    log_file = os.path.expanduser(args.log_file) if args.log_file else None
+    exports = [os.path.expanduser(path) for path in args.export or []]
+
+    rules: Optional["RuleSet"] = None
+    if args.rules:
+        from .rules import RuleSet
+
+        try:
+            rules = RuleSet.load(os.path.expanduser(args.rules))
+        except (OSError, ValueError) as e:
+            console.print(f"[bold red]錯誤：無法讀取規則檔: {e}[/]")
+            return
+
+    scan_filter: Optional["ScanFilter"] = None
+    if (
+        args.exclude
+        or args.include
+        or args.max_depth is not None
+        or args.min_size
+        or args.older_than
+        or args.newer_than
+    ):
+        from .filters import ScanFilter
+        from .rules import parse_age, parse_size
+
+        try:
+            scan_filter = ScanFilter(
+                exclude=args.exclude or [],
+                include=args.include or [],
+                max_depth=args.max_depth,
+                min_size=parse_size(args.min_size) if args.min_size else 0,
+                older_than=parse_age(args.older_than) if args.older_than else None,
+                newer_than=parse_age(args.newer_than) if args.newer_than else None,
+            )
+        except ValueError as e:
+            console.print(f"[bold red]錯誤：篩選條件有誤: {e}[/]")
+            return
 
     console.print()
     console.print("[bold magenta]歡迎使用檔案整理大師！[/]")
     console.print()
 
+    # 執行既有計畫（來源與目標取自計畫檔）
+    if args.apply:
+        from .planner import MovePlan
+
+        try:
+            plan = MovePlan.load(os.path.expanduser(args.apply))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            console.print(f"[bold red]錯誤：無法讀取計畫檔: {e}[/]")
+            return
+
+        os.makedirs(plan.target_folder, exist_ok=True)
+        console.print(f"[green]執行計畫: {args.apply}（{len(plan.moves)} 個檔案）[/]")
+        console.print()
+        result = apply_plan(
+            plan,
+            workers=args.workers,
+            progress=create_progress(console, args.quiet, log_file),
+            detail_k=args.full_report,
+            exports=exports,
+        )
+        _report_printer().print_report(result)
+        _export_summaries(result, exports, console)
+        return
+
+    # 依日誌還原上一次整理（只需要目標資料夾）
+    if args.undo:
+        if not args.target:
+            console.print("[bold red]錯誤：--undo 需要以 -t 指定目標資料夾[/]")
+            return
+        target_folder = os.path.expanduser(args.target)
+        try:
+            restored, errors = undo_organize(
+                target_folder,
+                workers=args.workers,
+                progress=create_progress(console, args.quiet, log_file),
+            )
+        except FileNotFoundError:
+            console.print(f"[bold red]錯誤：{target_folder} 中沒有可以還原的整理記錄[/]")
+            return
+        _report_printer().print_undo(restored, errors)
+        return
+
     # 決定使用 GUI 還是 CLI
-    use_gui = TKINTER_AVAILABLE and not args.no_gui
+    # 來源與目標都有指定時不需要 GUI，也就不必匯入 tkinter
+    use_gui = not args.no_gui and not (args.source and args.target) and _tkinter_available()
 
     # 獲取來源資料夾
     if args.source:
@@ -296,8 +1436,8 @@ def run() -> None:
         console.print("[yellow]未指定目標資料夾，程式結束[/]")
         return
 
-    # 自動建立目標資料夾
-    if not os.path.exists(target_folder):
+    # 自動建立目標資料夾（dry-run 不建立）
+    if not args.dry_run and not os.path.exists(target_folder):
         os.makedirs(target_folder, exist_ok=True)
         console.print(f"[dim]已建立目標資料夾: {target_folder}[/]")
 
@@ -309,26 +1449,177 @@ def run() -> None:
         console.print("[bold red]錯誤：來源和目標資料夾不能相同！[/]")
         return
 
+    # 只建立計畫
+    if args.dry_run:
+        from .planner import build_plan
+
+        console.print("[bold cyan]建立搬移計畫...[/]")
+        plan = build_plan(source_folder, target_folder, rules, scan_filter)
+        _report_printer().print_plan(plan)
+        if args.plan_file:
+            plan.save(os.path.expanduser(args.plan_file))
+            console.print(f"[green]計畫已輸出: {args.plan_file}[/]")
+        return
+
     # 執行檔案分類
     console.print("[bold cyan]開始整理檔案...[/]")
     console.print()
 
-    result = classify_files_by_year_and_type(source_folder, target_folder)
+    if args.processes and (
+        args.incremental
+        or args.dedup
+        or args.stream_log
+        or args.log_file
+        or args.concurrency
+    ):
+        console.print(
+            "[bold red]錯誤：--processes 不支援 --incremental、--dedup、"
+            "--stream-log、--log-file、--concurrency[/]"
+        )
+        return
+
+    if args.concurrency and (args.incremental or args.dedup or args.precreate_dirs):
+        console.print(
+            "[bold red]錯誤：--concurrency 不支援 --incremental、--dedup、--precreate-dirs[/]"
+        )
+        return
+
+    if args.watch and (
+        args.processes
+        or args.concurrency
+        or args.incremental
+        or args.dedup
+        or args.precreate_dirs
+        or args.resume
+    ):
+        console.print(
+            "[bold red]錯誤：--watch 不支援 --processes、--concurrency、--incremental、"
+            "--dedup、--precreate-dirs、--resume[/]"
+        )
+        return
+
+    # 搬移日誌只由預設的執行緒引擎寫入
+    journal = not (args.no_journal or args.processes or args.concurrency or args.watch)
+    state = None
+    if journal:
+        from .journal import journal_path, read_journal
+
+        state = read_journal(target_folder)
+    if args.resume and not journal:
+        console.print(
+            "[bold red]錯誤：--resume 不支援 --no-journal、--processes、--concurrency[/]"
+        )
+        return
+    if args.resume and (state is None or state.undoing):
+        console.print("[bold red]錯誤：沒有可以接續的整理記錄[/]")
+        return
+    if args.resume and state.source_folder != os.path.abspath(source_folder):
+        console.print(
+            f"[bold red]錯誤：上一次整理的來源是 {state.source_folder}，與本次不同[/]"
+        )
+        return
+    if not args.resume and state is not None and not state.finished:
+        console.print(
+            "[bold red]錯誤：目標資料夾中有未完成的整理記錄。"
+            "請加上 --resume 接續、以 --undo 還原，"
+            f"或刪除 {journal_path(target_folder)} 後重新開始[/]"
+        )
+        return
+
+    stream_log = os.path.expanduser(args.stream_log) if args.stream_log else None
+    progress = create_progress(console, args.quiet, log_file, profiler)
+    prof = profiler or NullProfiler()
+
+    # 預設的搬移流程在搬移時就清理空資料夾，其他模式整理完再走訪一次
+    inline_clean = not (args.watch or args.processes or args.concurrency)
+    with prof.phase("organize"):
+        if args.watch:
+            console.print("[bold cyan]監看中，按 Ctrl-C 結束...[/]")
+            result = watch_folder(
+                source_folder,
+                target_folder,
+                workers=args.workers,
+                stream_log=stream_log,
+                exports=exports,
+                progress=progress,
+                rules=rules,
+                detail_k=args.full_report,
+                scan_filter=scan_filter,
+            )
+        elif args.processes:
+            result = organize_sharded(
+                source_folder,
+                target_folder,
+                processes=args.processes,
+                workers=args.workers,
+                precreate_dirs=args.precreate_dirs,
+                progress=progress,
+                rules=rules,
+                detail_k=args.full_report,
+                exports=exports,
+                scan_filter=scan_filter,
+            )
+        elif args.concurrency:
+            import asyncio
+
+            result = asyncio.run(
+                organize_async(
+                    source_folder,
+                    target_folder,
+                    concurrency=args.concurrency,
+                    stream_log=stream_log,
+                    progress=progress,
+                    rules=rules,
+                    detail_k=args.full_report,
+                    exports=exports,
+                    scan_filter=scan_filter,
+                )
+            )
+        else:
+            result = classify_files_by_year_and_type(
+                source_folder,
+                target_folder,
+                workers=args.workers,
+                incremental=args.incremental,
+                precreate_dirs=args.precreate_dirs,
+                dedup=args.dedup,
+                stream_log=stream_log,
+                progress=progress,
+                rules=rules,
+                detail_k=args.full_report,
+                exports=exports,
+                journal=journal,
+                resume=args.resume,
+                profiler=profiler,
+                clean=args.clean,
+                scan_filter=scan_filter,
+            )
 
     # 輸出報告
-    printer = ReportPrinter()
-    printer.print_report(result)
+    printer = _report_printer()
+    with prof.phase("report"):
+        printer.print_report(result)
+    with prof.phase("export"):
+        _export_summaries(result, exports, console)
 
     # 清理空資料夾（如果指定 --clean）
     if args.clean:
         console.print()
-        console.print("[bold yellow]清理空資料夾...[/]")
-        cleaned = clean_empty_folders(source_folder, console)
+        if inline_clean:
+            # 已在搬移時逐步清理
+            cleaned = result.cleaned_count
+        else:
+            console.print("[bold yellow]清理空資料夾...[/]")
+            with prof.phase("cleanup"):
+                cleaned = clean_empty_folders(source_folder, console, scan_filter)
         if cleaned > 0:
             console.print(f"[green]已清理 {cleaned} 個空資料夾[/]")
         else:
             console.print("[dim]沒有需要清理的空資料夾[/]")
 
+    if profiler is not None:
+        _finish_profile(profiler, args.profile, printer, console)
+
 
 if __name__ == "__main__":
     run()
@@ -1,11 +1,16 @@
 """資料模型定義"""
 
+import heapq
+import os
+import threading
+from array import array
+from collections.abc import Sequence
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Optional, Protocol, Tuple, Union, overload
 
 
-@dataclass
+@dataclass(slots=True)
 class FileStats:
     """單一檔案的統計資訊"""
 
@@ -41,59 +46,504 @@ class FileStats:
         return datetime.now().year - self.year
 
 
+# 重複檔案的處理方式（--dedup 的選項，命令列解析時不必匯入 dedup）
+DEDUP_ACTIONS = ("report", "skip", "hardlink")
+
+
+@dataclass
+class DuplicateGroup:
+    """內容完全相同的一組檔案（第一個為保留的正本）"""
+
+    size_bytes: int
+    paths: List[str] = field(default_factory=list)
+
+    @property
+    def kept(self) -> str:
+        """保留的正本路徑"""
+        return self.paths[0]
+
+    @property
+    def duplicates(self) -> List[str]:
+        """正本以外的重複檔案"""
+        return self.paths[1:]
+
+    @property
+    def wasted_bytes(self) -> int:
+        """重複檔案浪費的空間"""
+        return self.size_bytes * (len(self.paths) - 1)
+
+
+@dataclass
+class BackendStats:
+    """單一搬移方式的吞吐量統計"""
+
+    name: str
+    calls: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def throughput_mb(self) -> float:
+        """平均吞吐量（MB/s）"""
+        if self.seconds <= 0:
+            return 0.0
+        return self.bytes / (1024 * 1024) / self.seconds
+
+
+@dataclass
+class CumulativeStats:
+    """歷次執行累計的整理統計（來自索引）"""
+
+    run_count: int = 0
+    total_count: int = 0
+    total_size_bytes: int = 0
+    year_distribution: Dict[int, int] = field(default_factory=dict)
+    type_distribution: Dict[str, int] = field(default_factory=dict)
+
+
+class FileStore(Sequence):
+    """
+    FileStats 的欄式（columnar）儲存
+
+    每個欄位存在 array 或共用字串表中，不保留 FileStats 物件：
+    資料夾與類型字串只存一次、檔名以 UTF-8 串接在同一個 bytearray、
+    修改時間存成 epoch 浮點數。每個檔案約 35 位元組再加上檔名長度，
+    讀取時才組回 FileStats（回傳的是新物件，修改它不會影響儲存內容）。
+    只支援附加，不支援修改與刪除。
+    """
+
+    def __init__(self, items: Iterable[FileStats] = ()) -> None:
+        self._dirs: List[str] = []
+        self._dir_ids: Dict[str, int] = {}
+        self._types: List[str] = []
+        self._type_ids: Dict[str, int] = {}
+        self._dir_col = array("I")
+        self._name_ends = array("Q")
+        self._names = bytearray()
+        self._size_col = array("q")
+        self._mtime_col = array("d")
+        self._year_col = array("H")
+        self._type_col = array("H")
+        self._success_col = bytearray()
+        # 少數例外欄位只記錄有值的列
+        self._errors: Dict[int, str] = {}
+        self._filenames: Dict[int, str] = {}
+        self.extend(items)
+
+    def append(self, stats: FileStats) -> None:
+        """附加一筆記錄"""
+        row = len(self._size_col)
+        folder, name = os.path.split(stats.original_path)
+
+        self._dir_col.append(_table_id(self._dirs, self._dir_ids, folder))
+        self._names += name.encode("utf-8", "surrogateescape")
+        self._name_ends.append(len(self._names))
+        self._size_col.append(stats.size_bytes)
+        self._mtime_col.append(stats.modified_time.timestamp())
+        self._year_col.append(stats.year)
+        self._type_col.append(_table_id(self._types, self._type_ids, stats.file_type))
+        self._success_col.append(stats.success)
+        if stats.error_message:
+            self._errors[row] = stats.error_message
+        if stats.filename != name:
+            self._filenames[row] = stats.filename
+
+    def extend(self, items: Iterable[FileStats]) -> None:
+        """附加多筆記錄（另一個 FileStore 直接串接欄位）"""
+        if isinstance(items, FileStore):
+            self._extend_store(items)
+            return
+        for stats in items:
+            self.append(stats)
+
+    def _extend_store(self, other: "FileStore") -> None:
+        """串接另一個 FileStore 的欄位，只需重新對應字串表編號"""
+        offset = len(self)
+        dir_map = [_table_id(self._dirs, self._dir_ids, d) for d in other._dirs]
+        type_map = [_table_id(self._types, self._type_ids, t) for t in other._types]
+
+        self._dir_col.extend(dir_map[i] for i in other._dir_col)
+        self._type_col.extend(type_map[i] for i in other._type_col)
+        base = len(self._names)
+        self._names += other._names
+        self._name_ends.extend(end + base for end in other._name_ends)
+        self._size_col.extend(other._size_col)
+        self._mtime_col.extend(other._mtime_col)
+        self._year_col.extend(other._year_col)
+        self._success_col += other._success_col
+        self._errors.update((row + offset, msg) for row, msg in other._errors.items())
+        self._filenames.update(
+            (row + offset, name) for row, name in other._filenames.items()
+        )
+
+    def __len__(self) -> int:
+        return len(self._size_col)
+
+    @overload
+    def __getitem__(self, index: int) -> FileStats: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[FileStats]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[FileStats, List[FileStats]]:
+        if isinstance(index, slice):
+            return [self._row(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("FileStore index out of range")
+        return self._row(index)
+
+    def __iter__(self) -> Iterator[FileStats]:
+        for i in range(len(self)):
+            yield self._row(i)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (FileStore, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def _row(self, i: int) -> FileStats:
+        """組回第 i 筆 FileStats"""
+        start = self._name_ends[i - 1] if i > 0 else 0
+        name = self._names[start : self._name_ends[i]].decode("utf-8", "surrogateescape")
+        return FileStats(
+            original_path=os.path.join(self._dirs[self._dir_col[i]], name),
+            filename=self._filenames.get(i, name),
+            size_bytes=self._size_col[i],
+            modified_time=datetime.fromtimestamp(self._mtime_col[i]),
+            year=self._year_col[i],
+            file_type=self._types[self._type_col[i]],
+            success=bool(self._success_col[i]),
+            error_message=self._errors.get(i, ""),
+        )
+
+
+def _table_id(table: List[str], ids: Dict[str, int], value: str) -> int:
+    """字串在共用字串表中的編號（第一次出現時加入）"""
+    index = ids.get(value)
+    if index is None:
+        index = ids[value] = len(table)
+        table.append(value)
+    return index
+
+
+class RecordSink(Protocol):
+    """逐檔記錄的輸出目的地（例如 JSONL / CSV 檔）"""
+
+    def write(self, stats: FileStats) -> None: ...
+
+    def close(self) -> None: ...
+
+
+def _push_bounded(heap: List[Tuple], item: Tuple, k: int) -> None:
+    """維持最多 k 筆「最大」項目的最小堆積（堆積頂端是目前保留的最小項）"""
+    if len(heap) < k:
+        heapq.heappush(heap, item)
+    elif item[:2] > heap[0][:2]:
+        heapq.heapreplace(heap, item)
+
+
+def _ranked(heap: List[Tuple]) -> List[FileStats]:
+    """堆積中的 FileStats，由排名第一開始"""
+    return [item[2] for item in sorted(heap, key=lambda x: x[:2], reverse=True)]
+
+
+class ResultAggregator:
+    """
+    逐筆累計的統計，不保留每個檔案的 FileStats
+
+    計數與分佈在 add() 時 O(1) 更新；只留下前 K 大檔案（最小堆積）
+    與失敗的檔案（寫入 error.txt 需要），記憶體用量與檔案總數無關。
+
+    detail_k > 0 時另外以有界堆積追蹤每個年份、每個類型的前 detail_k 大檔案
+    與最古老的 detail_k 個檔案，同樣在 add() 時一次更新，不需要排序全部檔案。
+    """
+
+    TOP_K = 5
+
+    def __init__(self, detail_k: int = 0) -> None:
+        self.total_count = 0
+        self.success_count = 0
+        self.failed_count = 0
+        self.total_size_bytes = 0
+        self.year_counts: Dict[int, int] = {}
+        self.type_counts: Dict[str, int] = {}
+        self.year_bytes: Dict[int, int] = {}
+        self.type_bytes: Dict[str, int] = {}
+        self.failed_files: List[FileStats] = []
+        self._top: List[Tuple[int, int, FileStats]] = []
+        self.detail_k = detail_k
+        self._top_by_year: Dict[int, List[Tuple[int, int, FileStats]]] = {}
+        self._top_by_type: Dict[str, List[Tuple[int, int, FileStats]]] = {}
+        self._oldest: List[Tuple[float, int, FileStats]] = []
+
+    def add(self, stats: FileStats) -> None:
+        """累計一筆結果"""
+        self.total_count += 1
+        if not stats.success:
+            self.failed_count += 1
+            self.failed_files.append(stats)
+            return
+
+        self.success_count += 1
+        self.total_size_bytes += stats.size_bytes
+        self.year_counts[stats.year] = self.year_counts.get(stats.year, 0) + 1
+        self.type_counts[stats.file_type] = self.type_counts.get(stats.file_type, 0) + 1
+        self.year_bytes[stats.year] = self.year_bytes.get(stats.year, 0) + stats.size_bytes
+        self.type_bytes[stats.file_type] = (
+            self.type_bytes.get(stats.file_type, 0) + stats.size_bytes
+        )
+
+        # 以 total_count 作為同大小時的次序，先到的排前面
+        item = (stats.size_bytes, -self.total_count, stats)
+        _push_bounded(self._top, item, self.TOP_K)
+
+        k = self.detail_k
+        if k:
+            year_heap = self._top_by_year.get(stats.year)
+            if year_heap is None:
+                year_heap = self._top_by_year[stats.year] = []
+            _push_bounded(year_heap, item, k)
+            type_heap = self._top_by_type.get(stats.file_type)
+            if type_heap is None:
+                type_heap = self._top_by_type[stats.file_type] = []
+            _push_bounded(type_heap, item, k)
+            # 修改時間取負值：保留「最大的 -mtime」即最古老的檔案
+            _push_bounded(
+                self._oldest,
+                (-stats.modified_time.timestamp(), -self.total_count, stats),
+                k,
+            )
+
+    def merge(self, other: "ResultAggregator") -> None:
+        """併入另一份統計（例如其他程序處理的分片），other 的記錄排在後面"""
+        offset = self.total_count
+        self.total_count += other.total_count
+        self.success_count += other.success_count
+        self.failed_count += other.failed_count
+        self.total_size_bytes += other.total_size_bytes
+        for year, count in other.year_counts.items():
+            self.year_counts[year] = self.year_counts.get(year, 0) + count
+        for file_type, count in other.type_counts.items():
+            self.type_counts[file_type] = self.type_counts.get(file_type, 0) + count
+        for year, size in other.year_bytes.items():
+            self.year_bytes[year] = self.year_bytes.get(year, 0) + size
+        for file_type, size in other.type_bytes.items():
+            self.type_bytes[file_type] = self.type_bytes.get(file_type, 0) + size
+        self.failed_files.extend(other.failed_files)
+        for key, order, stats in other._top:
+            _push_bounded(self._top, (key, order - offset, stats), self.TOP_K)
+
+        k = self.detail_k
+        if not k:
+            return
+        for mine, theirs in (
+            (self._top_by_year, other._top_by_year),
+            (self._top_by_type, other._top_by_type),
+        ):
+            for group, heap in theirs.items():
+                target = mine.setdefault(group, [])
+                for key, order, stats in heap:
+                    _push_bounded(target, (key, order - offset, stats), k)
+        for key, order, stats in other._oldest:
+            _push_bounded(self._oldest, (key, order - offset, stats), k)
+
+    @property
+    def top_large_files(self) -> List[FileStats]:
+        """前 K 大檔案（由大到小）"""
+        return _ranked(self._top)
+
+    @property
+    def top_by_year(self) -> Dict[int, List[FileStats]]:
+        """每個年份的前 detail_k 大檔案（年份由舊到新）"""
+        return {year: _ranked(heap) for year, heap in sorted(self._top_by_year.items())}
+
+    @property
+    def top_by_type(self) -> Dict[str, List[FileStats]]:
+        """每個類型的前 detail_k 大檔案（類型依檔案數由多到少）"""
+        types = sorted(self._top_by_type, key=lambda t: -self.type_counts.get(t, 0))
+        return {file_type: _ranked(self._top_by_type[file_type]) for file_type in types}
+
+    @property
+    def oldest_files(self) -> List[FileStats]:
+        """最古老的 detail_k 個檔案（由舊到新）"""
+        return _ranked(self._oldest)
+
+
 @dataclass
 class ClassifyResult:
-    """分類結果彙總"""
+    """
+    分類結果彙總
+
+    每次 add() 都會更新累計統計，所有報告用的屬性都是 O(1) 或 O(K)，
+    不必每次重新掃描 files。keep_files=False 時不保留 files（串流模式）；
+    compact=True 時 files 改用欄式的 FileStore，每個檔案不到 100 位元組。
+    detail_k > 0 時另外追蹤每個年份、類型的前 K 大檔案與最古老的檔案（完整報告）。
+    """
 
-    files: List[FileStats] = field(default_factory=list)
+    files: Union[List[FileStats], FileStore] = field(default_factory=list)
     source_folder: str = ""
     target_folder: str = ""
+    skipped_count: int = 0
+    # 接續中斷的整理時，確認上次其實已完成的搬移數
+    resumed_count: int = 0
+    # --clean 在搬移時刪除的空資料夾數
+    cleaned_count: int = 0
+    cumulative: Optional[CumulativeStats] = None
+    duplicate_groups: List[DuplicateGroup] = field(default_factory=list)
+    dedup_action: str = ""
+    backend_stats: List[BackendStats] = field(default_factory=list)
+    keep_files: bool = True
+    compact: bool = False
+    detail_k: int = 0
+    record_sink: Optional[RecordSink] = field(default=None, repr=False, compare=False)
+    _aggregate: ResultAggregator = field(
+        default_factory=ResultAggregator, init=False, repr=False, compare=False
+    )
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        if self.compact and not isinstance(self.files, FileStore):
+            self.files = FileStore(self.files)
+        self._aggregate = ResultAggregator(self.detail_k)
+
+        # 建立時就帶入的 files 也要計入統計
+        for stats in self.files:
+            self._aggregate.add(stats)
+
+    def add(self, stats: FileStats) -> None:
+        """加入一筆檔案結果（可在多個執行緒中同時呼叫）"""
+        with self._lock:
+            self._aggregate.add(stats)
+            if self.keep_files:
+                self.files.append(stats)
+            if self.record_sink is not None:
+                self.record_sink.write(stats)
+
+    def merge(self, other: "ClassifyResult") -> None:
+        """併入另一份結果（例如其他程序處理的分片）"""
+        other_stats = other._stats
+        with self._lock:
+            self._aggregate.merge(other_stats)
+            if self.keep_files:
+                self.files.extend(other.files)
+            if self.record_sink is not None:
+                for stats in other.files:
+                    self.record_sink.write(stats)
+            self.skipped_count += other.skipped_count
+            self.resumed_count += other.resumed_count
+            self.cleaned_count += other.cleaned_count
+
+            by_name = {b.name: b for b in self.backend_stats}
+            for backend in other.backend_stats:
+                mine = by_name.get(backend.name)
+                if mine is None:
+                    mine = by_name[backend.name] = BackendStats(backend.name)
+                    self.backend_stats.append(mine)
+                mine.calls += backend.calls
+                mine.bytes += backend.bytes
+                mine.seconds += backend.seconds
+            self.backend_stats.sort(key=lambda b: -b.bytes)
+
+    def __getstate__(self) -> dict:
+        # 鎖與輸出檔無法跨程序傳遞
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["record_sink"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def _stats(self) -> ResultAggregator:
+        """
+        目前的累計統計
+
+        相容直接對 files 做 append 的舊用法：筆數對不上時從 files 重建一次。
+        """
+        if self.keep_files and len(self.files) != self._aggregate.total_count:
+            with self._lock:
+                self._aggregate = ResultAggregator(self.detail_k)
+                for stats in self.files:
+                    self._aggregate.add(stats)
+        return self._aggregate
 
     @property
     def total_count(self) -> int:
         """總檔案數"""
-        return len(self.files)
+        return self._stats.total_count
 
     @property
     def success_count(self) -> int:
         """成功移動的檔案數"""
-        return sum(1 for f in self.files if f.success)
+        return self._stats.success_count
 
     @property
     def failed_count(self) -> int:
         """失敗的檔案數"""
-        return sum(1 for f in self.files if not f.success)
+        return self._stats.failed_count
 
     @property
     def total_size_bytes(self) -> int:
         """成功移動的總大小"""
-        return sum(f.size_bytes for f in self.files if f.success)
+        return self._stats.total_size_bytes
 
     @property
     def year_distribution(self) -> Dict[int, int]:
         """年份分佈（只計算成功的）"""
-        dist: Dict[int, int] = {}
-        for f in self.files:
-            if f.success:
-                dist[f.year] = dist.get(f.year, 0) + 1
-        return dict(sorted(dist.items()))
+        return dict(sorted(self._stats.year_counts.items()))
 
     @property
     def type_distribution(self) -> Dict[str, int]:
         """類型分佈（只計算成功的，按數量排序）"""
-        dist: Dict[str, int] = {}
-        for f in self.files:
-            if f.success:
-                dist[f.file_type] = dist.get(f.file_type, 0) + 1
-        return dict(sorted(dist.items(), key=lambda x: -x[1]))
+        return dict(sorted(self._stats.type_counts.items(), key=lambda x: -x[1]))
+
+    @property
+    def year_size_distribution(self) -> Dict[int, int]:
+        """各年份的總大小（只計算成功的）"""
+        return dict(sorted(self._stats.year_bytes.items()))
+
+    @property
+    def type_size_distribution(self) -> Dict[str, int]:
+        """各類型的總大小（只計算成功的，按大小排序）"""
+        return dict(sorted(self._stats.type_bytes.items(), key=lambda x: -x[1]))
 
     @property
     def top_large_files(self) -> List[FileStats]:
         """前 5 大檔案"""
-        successful = [f for f in self.files if f.success]
-        return sorted(successful, key=lambda x: -x.size_bytes)[:5]
+        return self._stats.top_large_files
+
+    @property
+    def top_files_by_year(self) -> Dict[int, List[FileStats]]:
+        """每個年份的前 detail_k 大檔案（detail_k 為 0 時為空）"""
+        return self._stats.top_by_year
+
+    @property
+    def top_files_by_type(self) -> Dict[str, List[FileStats]]:
+        """每個類型的前 detail_k 大檔案（detail_k 為 0 時為空）"""
+        return self._stats.top_by_type
+
+    @property
+    def oldest_files(self) -> List[FileStats]:
+        """最古老的 detail_k 個檔案（detail_k 為 0 時為空）"""
+        return self._stats.oldest_files
+
+    @property
+    def duplicate_count(self) -> int:
+        """重複檔案數（不含正本）"""
+        return sum(len(g.paths) - 1 for g in self.duplicate_groups)
+
+    @property
+    def duplicate_wasted_bytes(self) -> int:
+        """重複檔案浪費的總空間"""
+        return sum(g.wasted_bytes for g in self.duplicate_groups)
 
     @property
     def failed_files(self) -> List[FileStats]:
         """失敗的檔案列表"""
-        return [f for f in self.files if not f.success]
+        return list(self._stats.failed_files)
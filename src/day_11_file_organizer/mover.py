@@ -0,0 +1,103 @@
+"""平行搬移引擎 - 有界工作佇列 + 執行緒池"""
+
+import queue
+import threading
+from typing import Any, Callable, Optional
+
+# 佇列中的結束訊號
+_STOP = object()
+
+
+class MoveEngine:
+    """
+    以固定數量的工作執行緒執行搬移工作
+
+    掃描端呼叫 submit() 將工作放入有界佇列，佇列滿時會阻塞，
+    避免掃描速度遠快於搬移時把整棵目錄樹的工作堆在記憶體裡。
+    workers <= 1 時直接在呼叫端執行，不建立任何執行緒。
+
+    工作執行緒中的例外（例如日誌 fsync 失敗、磁碟已滿）不會讓執行緒默默結束：
+    記下第一個例外後不再執行後續工作（只取出丟棄，submit 不會卡住），
+    並由下一次 submit() 或 close() 在呼叫端重新拋出。
+    """
+
+    def __init__(self, workers: int = 1, queue_size: Optional[int] = None) -> None:
+        self.workers = max(1, workers)
+        self._queue: Optional[queue.Queue] = None
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        # 工作執行緒中第一個未處理的例外，與是否已在呼叫端拋出過
+        self._error: Optional[BaseException] = None
+        self._reported = False
+
+        if self.workers > 1:
+            self._queue = queue.Queue(maxsize=queue_size or self.workers * 4)
+            for i in range(self.workers):
+                thread = threading.Thread(
+                    target=self._worker, name=f"mover-{i}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, func: Callable[..., Any], *args: Any) -> None:
+        """
+        送出一個搬移工作（佇列滿時阻塞）
+
+        Raises:
+            BaseException: 先前的工作在工作執行緒中拋出的例外
+        """
+        self._raise_error()
+        if self._queue is None:
+            func(*args)
+        else:
+            self._queue.put((func, args))
+
+    def close(self) -> None:
+        """
+        等待所有工作完成並停止工作執行緒
+
+        Raises:
+            BaseException: 工作在工作執行緒中拋出、還沒回報過的例外
+        """
+        if self._queue is not None:
+            for _ in self._threads:
+                self._queue.put(_STOP)
+            for thread in self._threads:
+                thread.join()
+            self._threads.clear()
+            self._queue = None
+        self._raise_error()
+
+    def __enter__(self) -> "MoveEngine":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _worker(self) -> None:
+        """工作執行緒主迴圈"""
+        assert self._queue is not None
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            if self._error is not None:
+                # 已經失敗：丟棄剩下的工作，讓 submit 與 close 不會卡住
+                continue
+            func, args = item
+            # 工作本身負責處理搬移的例外；這裡攔下的是記錄結果時的錯誤
+            try:
+                func(*args)
+            except BaseException as e:
+                with self._lock:
+                    if self._error is None:
+                        self._error = e
+
+    def _raise_error(self) -> None:
+        """在呼叫端拋出工作執行緒的例外（每個例外只拋出一次）"""
+        with self._lock:
+            if self._error is None or self._reported:
+                return
+            self._reported = True
+            error = self._error
+        raise error
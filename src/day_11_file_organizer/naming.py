@@ -0,0 +1,85 @@
+"""目標檔名索引 - 不必逐檔檢查 os.path.exists 即可取得不重複的檔名"""
+
+import os
+import sys
+import threading
+from typing import Callable, Dict, Set, Tuple
+
+# 不分大小寫的檔案系統（macOS、Windows 預設）上，同名比對也要不分大小寫
+_name_key: Callable[[str], str] = (
+    str.casefold if sys.platform in ("darwin", "win32") else str
+)
+
+
+class NameIndex:
+    """
+    每個目標資料夾的檔名集合
+
+    第一次用到某個資料夾時以 os.scandir 載入既有檔名，之後的保留與比對
+    都在記憶體完成，每個檔案不再需要任何系統呼叫。碰撞時加上遞增序號
+    （report_1.pdf、report_2.pdf ...），每個原始檔名各自記住下一個序號。
+    所有操作都在同一把鎖內完成，可在多個執行緒中同時呼叫。
+
+    exclusive=True 時（多個程序寫入同一個目標資料夾），每個保留的檔名都會以
+    O_CREAT | O_EXCL 建立空的佔位檔，被其他程序搶先建立的檔名改用下一個序號；
+    搬移時直接以 rename 取代佔位檔。此模式下資料夾會在第一次保留時建立。
+    """
+
+    def __init__(self, exclusive: bool = False) -> None:
+        self.exclusive = exclusive
+        self._names: Dict[str, Set[str]] = {}
+        self._counters: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, target_dir: str, filename: str) -> str:
+        """保留一個不會覆蓋既有檔案的目標路徑並回傳"""
+        with self._lock:
+            names = self._names.get(target_dir)
+            if names is None:
+                if self.exclusive:
+                    os.makedirs(target_dir, exist_ok=True)
+                names = self._names[target_dir] = self._load(target_dir)
+
+            key = _name_key(filename)
+            if key not in names:
+                names.add(key)
+                if self._claim(target_dir, filename):
+                    return os.path.join(target_dir, filename)
+
+            name, ext = os.path.splitext(filename)
+            counter = self._counters.get((target_dir, key), 1)
+            while True:
+                candidate = f"{name}_{counter}{ext}"
+                candidate_key = _name_key(candidate)
+                if candidate_key not in names:
+                    names.add(candidate_key)
+                    if self._claim(target_dir, candidate):
+                        break
+                counter += 1
+
+            self._counters[(target_dir, key)] = counter + 1
+            return os.path.join(target_dir, candidate)
+
+    def _claim(self, target_dir: str, filename: str) -> bool:
+        """exclusive 模式下建立佔位檔；檔名已被其他程序取得時回傳 False"""
+        if not self.exclusive:
+            return True
+        try:
+            fd = os.open(
+                os.path.join(target_dir, filename),
+                os.O_CREAT | os.O_EXCL | os.O_WRONLY,
+                0o666,
+            )
+        except FileExistsError:
+            return False
+        os.close(fd)
+        return True
+
+    @staticmethod
+    def _load(target_dir: str) -> Set[str]:
+        """列出資料夾中既有的檔名（資料夾不存在時為空）"""
+        try:
+            with os.scandir(target_dir) as it:
+                return {_name_key(entry.name) for entry in it}
+        except (FileNotFoundError, NotADirectoryError):
+            return set()
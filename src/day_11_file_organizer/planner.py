@@ -0,0 +1,244 @@
+"""搬移計畫 - 先在記憶體中決定所有搬移，再統一執行 I/O"""
+
+import csv
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, List, Optional
+
+from .classifier import classify_entry, failed_stats
+from .models import FileStats
+from .naming import NameIndex
+from .scanner import ScanEntry, scan_files
+
+if TYPE_CHECKING:
+    from .filters import ScanFilter
+    from .rules import RuleSet
+
+# 計畫檔格式版本
+PLAN_VERSION = 1
+
+
+@dataclass
+class PlannedMove:
+    """單一檔案的搬移計畫"""
+
+    source: str
+    target: str
+    size_bytes: int
+    mtime: float
+    year: int
+    file_type: str
+    source_dev: int = 0
+    source_ino: int = 0
+
+    @property
+    def filename(self) -> str:
+        """原始檔名"""
+        return os.path.basename(self.source)
+
+    @property
+    def target_dir(self) -> str:
+        """目標資料夾"""
+        return os.path.dirname(self.target)
+
+    def to_stats(self) -> FileStats:
+        """轉換為成功的 FileStats"""
+        return FileStats(
+            original_path=self.source,
+            filename=self.filename,
+            size_bytes=self.size_bytes,
+            modified_time=datetime.fromtimestamp(self.mtime),
+            year=self.year,
+            file_type=self.file_type,
+            success=True,
+        )
+
+
+@dataclass
+class PlanFailure:
+    """規劃階段就失敗的檔案（例如無法 stat）"""
+
+    source: str
+    error_message: str
+
+    def to_stats(self) -> FileStats:
+        """轉換為失敗的 FileStats"""
+        return FileStats(
+            original_path=self.source,
+            filename=os.path.basename(self.source),
+            size_bytes=0,
+            modified_time=datetime.now(),
+            year=0,
+            file_type="unknown",
+            success=False,
+            error_message=self.error_message,
+        )
+
+
+@dataclass
+class MovePlan:
+    """完整的搬移計畫"""
+
+    source_folder: str = ""
+    target_folder: str = ""
+    created_at: str = field(
+        default_factory=lambda: datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    )
+    moves: List[PlannedMove] = field(default_factory=list)
+    failures: List[PlanFailure] = field(default_factory=list)
+
+    @property
+    def total_size_bytes(self) -> int:
+        """預計搬移的總大小"""
+        return sum(m.size_bytes for m in self.moves)
+
+    @property
+    def target_dirs(self) -> List[str]:
+        """需要建立的目標資料夾（已排序、不重複）"""
+        return sorted({m.target_dir for m in self.moves})
+
+    def ordered_moves(self, target_dev: int) -> List[PlannedMove]:
+        """
+        依執行效率排序的搬移清單
+
+        同裝置的搬移只是 rename，先做；跨裝置需要複製再刪除，放到最後。
+        同一組內維持原本的規劃順序。
+        """
+        return sorted(self.moves, key=lambda m: m.source_dev != target_dev)
+
+    def save(self, path: str) -> None:
+        """依副檔名輸出為 JSON 或 CSV"""
+        if path.lower().endswith(".csv"):
+            self.to_csv(path)
+        else:
+            self.to_json(path)
+
+    def to_json(self, path: str) -> None:
+        """輸出為 JSON（可用 --apply 執行）"""
+        data = {
+            "version": PLAN_VERSION,
+            "source_folder": self.source_folder,
+            "target_folder": self.target_folder,
+            "created_at": self.created_at,
+            "moves": [asdict(m) for m in self.moves],
+            "failures": [asdict(f) for f in self.failures],
+        }
+        # 無法解碼的檔名以 surrogateescape 寫回原本的位元組，load 時原樣讀回
+        with open(path, "w", encoding="utf-8", errors="surrogateescape") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def to_csv(self, path: str) -> None:
+        """輸出為 CSV（方便用試算表檢視）"""
+        with open(path, "w", encoding="utf-8", errors="surrogateescape", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(
+                ["source", "target", "size_bytes", "mtime", "year", "file_type", "error"]
+            )
+            for m in self.moves:
+                writer.writerow(
+                    [m.source, m.target, m.size_bytes, m.mtime, m.year, m.file_type, ""]
+                )
+            for failure in self.failures:
+                writer.writerow([failure.source, "", 0, "", "", "", failure.error_message])
+
+    @classmethod
+    def load(cls, path: str) -> "MovePlan":
+        """
+        讀取 JSON 計畫檔
+
+        Raises:
+            ValueError: 計畫檔版本不支援
+        """
+        with open(path, encoding="utf-8", errors="surrogateescape") as f:
+            data = json.load(f)
+
+        version = data.get("version")
+        if version != PLAN_VERSION:
+            raise ValueError(f"不支援的計畫檔版本: {version}")
+
+        return cls(
+            source_folder=data["source_folder"],
+            target_folder=data["target_folder"],
+            created_at=data.get("created_at", ""),
+            moves=[PlannedMove(**m) for m in data["moves"]],
+            failures=[PlanFailure(**f) for f in data.get("failures", [])],
+        )
+
+
+def iter_plan(
+    entries: Iterable[ScanEntry],
+    target_folder: str,
+    names: NameIndex,
+    on_error: Callable[[ScanEntry, Exception], None],
+    rules: Optional["RuleSet"] = None,
+) -> Iterator[PlannedMove]:
+    """
+    將掃描記錄逐一轉為搬移計畫（串流，不做任何寫入）
+
+    Args:
+        entries: 掃描記錄
+        target_folder: 目標資料夾路徑
+        names: 目標檔名索引（保留的檔名會被登記）
+        on_error: 無法分類的檔案回呼
+        rules: 自訂分類規則（None 表示內建規則）
+    """
+    for entry in entries:
+        try:
+            year, file_type, folder = classify_entry(entry, rules)
+            target_dir = os.path.join(target_folder, folder, file_type)
+            target = names.reserve(target_dir, entry.name)
+        except Exception as e:
+            on_error(entry, e)
+            continue
+
+        yield PlannedMove(
+            source=entry.path,
+            target=target,
+            size_bytes=entry.size,
+            mtime=entry.mtime,
+            year=year,
+            file_type=file_type,
+            source_dev=entry.dev,
+            source_ino=entry.ino,
+        )
+
+
+def build_plan(
+    source_folder: str,
+    target_folder: str,
+    rules: Optional["RuleSet"] = None,
+    scan_filter: Optional["ScanFilter"] = None,
+) -> MovePlan:
+    """
+    掃描來源資料夾並建立完整的搬移計畫（不呼叫 shutil.move 或 os.makedirs）
+
+    Args:
+        source_folder: 來源資料夾路徑
+        target_folder: 目標資料夾路徑
+        rules: 自訂分類規則（None 表示內建規則）
+        scan_filter: 掃描篩選條件（None 表示全部處理）
+
+    Returns:
+        MovePlan: 搬移計畫
+    """
+    # 計畫檔可能在其他工作目錄下執行，一律記錄絕對路徑
+    source_folder = os.path.abspath(source_folder)
+    target_folder = os.path.abspath(target_folder)
+    plan = MovePlan(source_folder=source_folder, target_folder=target_folder)
+
+    def on_error(entry: ScanEntry, error: Exception) -> None:
+        stats = failed_stats(entry.path, entry.name, error)
+        plan.failures.append(PlanFailure(entry.path, stats.error_message))
+
+    plan.moves.extend(
+        iter_plan(
+            scan_files(source_folder, scan_filter=scan_filter),
+            target_folder,
+            NameIndex(),
+            on_error,
+            rules,
+        )
+    )
+    return plan
@@ -0,0 +1,302 @@
+"""執行剖析 - 各階段與各種操作的次數、耗時、資料量與延遲分布（--profile）"""
+
+import marshal
+import threading
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# 延遲直方圖的桶數：第 b 桶是 [2^(b-1), 2^b) 微秒，最後一桶收所有更慢的操作（約 35 分鐘以上）
+_BUCKETS = 32
+
+# pstats 的「檔名」欄位（沒有對應的原始碼位置）
+_PSTATS_FILE = "file-organizer"
+
+Path = Tuple[str, ...]
+
+
+@dataclass
+class OpStats:
+    """一種操作（在呼叫堆疊中的某個位置）的累計數字"""
+
+    path: Path
+    calls: int = 0
+    total_seconds: float = 0.0
+    # 扣除巢狀操作後的時間
+    self_seconds: float = 0.0
+    bytes: int = 0
+    max_seconds: float = 0.0
+    histogram: List[int] = field(default_factory=lambda: [0] * _BUCKETS)
+
+    @property
+    def name(self) -> str:
+        return self.path[-1]
+
+    def percentile(self, q: float) -> float:
+        """第 q 百分位的延遲上限（秒，以直方圖的桶邊界估計）"""
+        if not self.calls:
+            return 0.0
+        rank = q / 100 * self.calls
+        seen = 0
+        for bucket, count in enumerate(self.histogram):
+            seen += count
+            if seen >= rank and count:
+                return min((1 << bucket) / 1e6, self.max_seconds)
+        return self.max_seconds
+
+
+class _Span:
+    """一次計時中的操作（with 區塊）"""
+
+    __slots__ = ("_profiler", "_name", "_bytes", "_start", "_child", "path")
+
+    def __init__(self, profiler: "Profiler", name: str, nbytes: int) -> None:
+        self._profiler = profiler
+        self._name = name
+        self._bytes = nbytes
+        self._child = 0.0
+
+    def __enter__(self) -> "_Span":
+        stack = self._profiler._stack()
+        parent = stack[-1].path if stack else self._profiler._phase
+        self.path = parent + (self._name,)
+        stack.append(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        elapsed = time.perf_counter() - self._start
+        stack = self._profiler._stack()
+        stack.pop()
+        if stack:
+            stack[-1]._child += elapsed
+        self._profiler._record(self.path, elapsed, elapsed - self._child, self._bytes)
+
+
+class Profiler:
+    """
+    低成本的執行剖析器
+
+    op() 以 with 區塊計時一次操作；同一執行緒中的巢狀操作會從外層的自身時間
+    扣除（例如分類時拉取下一筆掃描記錄，掃描時間不算在分類上）。phase() 標記
+    整次執行的階段，工作執行緒中的操作會歸在當時的階段底下。每次操作只做兩次
+    perf_counter 與一次加鎖更新，可在多個執行緒中同時使用。
+    """
+
+    enabled = True
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # 依第一次完成的順序插入
+        self._ops: Dict[Path, OpStats] = {}
+        self._phase: Path = ()
+        self._start = time.perf_counter()
+
+    def op(self, name: str, nbytes: int = 0) -> _Span:
+        """計時一次操作（nbytes 為處理的資料量）"""
+        return _Span(self, name, nbytes)
+
+    def phase(self, name: str) -> _Span:
+        """計時一個階段（只在主執行緒使用）"""
+        return _Phase(self, name)
+
+    def iterate(self, items: Iterable[T], name: str) -> Iterator[T]:
+        """包在迭代器外面，計時每次取得下一筆的時間（例如串流掃描）"""
+        it = iter(items)
+        while True:
+            with _Span(self, name, 0):
+                try:
+                    item = next(it)
+                except StopIteration:
+                    return
+            yield item
+
+    @property
+    def wall_seconds(self) -> float:
+        """建立到現在的時間"""
+        return time.perf_counter() - self._start
+
+    def snapshot(self) -> List[OpStats]:
+        """
+        目前的累計數字（樹狀順序：父節點在子節點之前，
+        同一層依第一次完成的先後；還沒結束的階段排在最後）
+        """
+        with self._lock:
+            ops = dict(self._ops)
+        order = {path: i for i, path in enumerate(ops)}
+
+        def key(path: Path) -> Tuple[int, ...]:
+            return tuple(order.get(path[: i + 1], len(order)) for i in range(len(path)))
+
+        return [ops[path] for path in sorted(ops, key=key)]
+
+    # ---- 輸出 ----
+
+    def save(self, path: str) -> None:
+        """
+        依副檔名輸出：.speedscope.json 為 speedscope 格式，.prof / .pstats 為
+        cProfile 的 pstats 格式（pstats.Stats、snakeviz 可讀），其他為 JSON
+        """
+        lower = path.lower()
+        if lower.endswith(".speedscope.json"):
+            self.to_speedscope(path)
+        elif lower.endswith((".prof", ".pstats")):
+            self.to_pstats(path)
+        else:
+            self.to_json(path)
+
+    def to_json(self, path: str) -> None:
+        """輸出為 JSON（直方圖只列出非零的桶，鍵為該桶的上限微秒數）"""
+        data = {
+            "wall_seconds": self.wall_seconds,
+            "operations": [
+                {
+                    "path": list(stats.path),
+                    "calls": stats.calls,
+                    "total_seconds": stats.total_seconds,
+                    "self_seconds": stats.self_seconds,
+                    "bytes": stats.bytes,
+                    "max_seconds": stats.max_seconds,
+                    "histogram_us": {
+                        str(1 << bucket): count
+                        for bucket, count in enumerate(stats.histogram)
+                        if count
+                    },
+                }
+                for stats in self.snapshot()
+            ],
+        }
+        # NullProfiler 在每次執行都會匯入本模組，json 只在輸出時才匯入
+        import json
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def to_speedscope(self, path: str) -> None:
+        """輸出為 speedscope 的 sampled 格式：每個呼叫堆疊一個樣本，權重為自身時間"""
+        frames: List[dict] = []
+        frame_ids: Dict[str, int] = {}
+        samples: List[List[int]] = []
+        weights: List[float] = []
+        for stats in self.snapshot():
+            stack = []
+            for name in stats.path:
+                if name not in frame_ids:
+                    frame_ids[name] = len(frames)
+                    frames.append({"name": name})
+                stack.append(frame_ids[name])
+            samples.append(stack)
+            weights.append(max(stats.self_seconds, 0.0))
+
+        data = {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "exporter": "file-organizer",
+            "name": "file-organizer",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": "file-organizer",
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+        }
+        import json
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    def to_pstats(self, path: str) -> None:
+        """輸出為 cProfile 的 pstats 格式（同名操作合併，呼叫端記在 callers）"""
+
+        def key(name: str) -> Tuple[str, int, str]:
+            return (_PSTATS_FILE, 0, name)
+
+        # 函式 -> [原始呼叫數, 呼叫數, 自身時間, 累計時間, {呼叫端: [...]}]
+        functions: Dict[Tuple[str, int, str], list] = {}
+        for stats in self.snapshot():
+            entry = functions.setdefault(key(stats.name), [0, 0, 0.0, 0.0, {}])
+            entry[0] += stats.calls
+            entry[1] += stats.calls
+            entry[2] += stats.self_seconds
+            entry[3] += stats.total_seconds
+            if len(stats.path) > 1:
+                caller = entry[4].setdefault(key(stats.path[-2]), [0, 0, 0.0, 0.0])
+                caller[0] += stats.calls
+                caller[1] += stats.calls
+                caller[2] += stats.self_seconds
+                caller[3] += stats.total_seconds
+
+        data = {
+            func: (cc, nc, tt, ct, {c: tuple(v) for c, v in callers.items()})
+            for func, (cc, nc, tt, ct, callers) in functions.items()
+        }
+        with open(path, "wb") as f:
+            marshal.dump(data, f)
+
+    # ---- 內部 ----
+
+    def _stack(self) -> List[_Span]:
+        """目前執行緒的操作堆疊"""
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _record(self, path: Path, elapsed: float, own: float, nbytes: int) -> None:
+        bucket = min(int(elapsed * 1e6).bit_length(), _BUCKETS - 1)
+        with self._lock:
+            stats = self._ops.get(path)
+            if stats is None:
+                stats = self._ops[path] = OpStats(path)
+            stats.calls += 1
+            stats.total_seconds += elapsed
+            stats.self_seconds += own
+            stats.bytes += nbytes
+            if elapsed > stats.max_seconds:
+                stats.max_seconds = elapsed
+            stats.histogram[bucket] += 1
+
+
+class _Phase(_Span):
+    """階段：除了計時，也讓其他執行緒的操作歸在這個階段底下"""
+
+    __slots__ = ("_outer",)
+
+    def __init__(self, profiler: Profiler, name: str) -> None:
+        super().__init__(profiler, name, 0)
+
+    def __enter__(self) -> "_Phase":
+        super().__enter__()
+        self._outer = self._profiler._phase
+        self._profiler._phase = self.path
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._profiler._phase = self._outer
+        super().__exit__(*exc)
+
+
+class NullProfiler:
+    """不剖析（預設），每次操作只多一個空的 with 區塊"""
+
+    enabled = False
+
+    _NULL = nullcontext()
+
+    def op(self, name: str, nbytes: int = 0) -> nullcontext:
+        return self._NULL
+
+    def phase(self, name: str) -> nullcontext:
+        return self._NULL
+
+    def iterate(self, items: Iterable[T], name: str) -> Iterable[T]:
+        return items
@@ -0,0 +1,242 @@
+"""進度顯示 - 以固定頻率重繪的即時進度，逐檔訊息只寫入記錄檔"""
+
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Deque, Dict, Optional, Protocol, TextIO, Tuple, Union
+
+from rich.console import Console, Group
+
+from .profiling import NullProfiler, Profiler
+
+if TYPE_CHECKING:
+    from .models import ClassifyResult
+
+# 進度畫面每秒重繪次數（與檔案數無關）
+REFRESH_PER_SECOND = 4
+
+# 速率以最近幾秒的取樣計算
+_RATE_WINDOW = 5.0
+
+# 類型計數最多顯示幾種
+_MAX_TYPES = 8
+
+
+class ProgressSink(Protocol):
+    """搬移進度的接收端"""
+
+    logging: bool
+
+    def expect(self, count: int) -> None: ...
+
+    def advance(self, size_bytes: int, file_type: str) -> None: ...
+
+    def fail(self, message: str) -> None: ...
+
+    def advance_result(self, result: "ClassifyResult") -> None: ...
+
+    def log(self, message: str) -> None: ...
+
+    def __enter__(self) -> "ProgressSink": ...
+
+    def __exit__(self, *exc: object) -> None: ...
+
+
+class NullProgress:
+    """不顯示進度也不寫記錄（--quiet），每個檔案不做任何額外工作"""
+
+    logging = False
+
+    def expect(self, count: int) -> None:
+        pass
+
+    def advance(self, size_bytes: int, file_type: str) -> None:
+        pass
+
+    def fail(self, message: str) -> None:
+        pass
+
+    def advance_result(self, result: "ClassifyResult") -> None:
+        pass
+
+    def log(self, message: str) -> None:
+        pass
+
+    def __enter__(self) -> "NullProgress":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        pass
+
+
+class ProgressTracker:
+    """
+    搬移進度的計數與即時顯示
+
+    工作執行緒每完成一個檔案只在鎖內更新幾個計數器；畫面由 Rich Live 的背景
+    執行緒以固定頻率讀取計數器重繪（檔案數/秒、MB/秒、剩餘時間、各類型數量），
+    終端機輸出量與檔案數無關。逐檔訊息只在指定 log_path 時寫入記錄檔。
+    指定 profiler 時，每次重繪的耗時記為 render 操作。
+    """
+
+    def __init__(
+        self,
+        console: Optional[Console] = None,
+        log_path: Optional[str] = None,
+        live: bool = True,
+        profiler: Optional[Profiler] = None,
+    ) -> None:
+        self.console = console or Console()
+        self.profiler: Union[Profiler, NullProfiler] = profiler or NullProfiler()
+        self.total: Optional[int] = None
+        self.done = 0
+        self.failed = 0
+        self.bytes = 0
+        self.type_counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        # 無法解碼的檔名以 surrogateescape 寫回原本的位元組
+        self._log: Optional[TextIO] = (
+            open(log_path, "a", encoding="utf-8", errors="surrogateescape") if log_path else None
+        )
+        self.logging = self._log is not None
+        if live:
+            # Live 與表格相關的 Rich 模組只在顯示即時進度時才匯入
+            from rich.live import Live
+
+            self._live: Optional[Live] = Live(
+                self, console=self.console, refresh_per_second=REFRESH_PER_SECOND
+            )
+        else:
+            self._live = None
+        self._start = time.monotonic()
+        self._samples: Deque[Tuple[float, int, int]] = deque()
+
+    def __enter__(self) -> "ProgressTracker":
+        self._start = time.monotonic()
+        self._samples.append((self._start, 0, 0))
+        if self._live is not None:
+            self._live.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        if self._live is not None:
+            self._live.stop()
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+            self.logging = False
+
+    def expect(self, count: int) -> None:
+        """得知還有 count 個檔案要處理（之後才能估計剩餘時間）"""
+        with self._lock:
+            self.total = self.done + count
+
+    def advance(self, size_bytes: int, file_type: str) -> None:
+        """完成一個檔案"""
+        with self._lock:
+            self.done += 1
+            self.bytes += size_bytes
+            self.type_counts[file_type] = self.type_counts.get(file_type, 0) + 1
+
+    def fail(self, message: str) -> None:
+        """一個檔案處理失敗"""
+        with self._lock:
+            self.done += 1
+            self.failed += 1
+            if self._log is not None:
+                self._log.write(f"失敗: {message}\n")
+
+    def advance_result(self, result: "ClassifyResult") -> None:
+        """一次計入一整份結果（例如其他程序完成的分片）"""
+        with self._lock:
+            self.done += result.total_count
+            self.failed += result.failed_count
+            self.bytes += result.total_size_bytes
+            for file_type, count in result.type_distribution.items():
+                self.type_counts[file_type] = self.type_counts.get(file_type, 0) + count
+
+    def log(self, message: str) -> None:
+        """寫入一行逐檔訊息（沒有記錄檔時不做任何事）"""
+        if self._log is not None:
+            with self._lock:
+                self._log.write(message + "\n")
+
+    def __rich__(self) -> Group:
+        """由 Live 的重繪執行緒呼叫，依目前計數器產生畫面"""
+        with self.profiler.op("render"):
+            return self._render()
+
+    def _render(self) -> Group:
+        """產生目前的進度畫面"""
+        from rich.progress_bar import ProgressBar
+        from rich.table import Table
+        from rich.text import Text
+
+        now = time.monotonic()
+        with self._lock:
+            done, failed, size, total = self.done, self.failed, self.bytes, self.total
+            types = sorted(self.type_counts.items(), key=lambda kv: -kv[1])
+
+        # 以滑動視窗計算速率，避免開頭的掃描時間拉低數字
+        samples = self._samples
+        samples.append((now, done, size))
+        while len(samples) > 2 and now - samples[0][0] > _RATE_WINDOW:
+            samples.popleft()
+        since, done_before, size_before = samples[0]
+        elapsed = now - since
+        files_rate = (done - done_before) / elapsed if elapsed > 0 else 0.0
+        mb_rate = (size - size_before) / (1024 * 1024) / elapsed if elapsed > 0 else 0.0
+
+        if total is not None and files_rate > 0:
+            eta = _format_duration(max(total - done, 0) / files_rate)
+        else:
+            eta = "--:--"
+
+        grid = Table.grid(padding=(0, 1))
+        grid.add_row(
+            Text("整理中", style="bold cyan"),
+            ProgressBar(total=total, completed=done, width=40),
+            Text(f"{done:,} / {total:,}" if total is not None else f"{done:,}"),
+        )
+
+        stats = Text(
+            f"{files_rate:,.0f} 檔/秒 · {mb_rate:,.1f} MB/秒 · 剩餘 {eta}",
+            style="green",
+        )
+        if failed:
+            stats.append(f" · 失敗 {failed:,}", style="red")
+
+        type_line = Text(
+            " · ".join(f"{name} {count:,}" for name, count in types[:_MAX_TYPES]),
+            style="dim",
+        )
+        return Group(grid, stats, type_line)
+
+
+def _format_duration(seconds: float) -> str:
+    """秒數轉為 H:MM:SS 或 MM:SS"""
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes:02d}:{secs:02d}"
+
+
+def create_progress(
+    console: Console,
+    quiet: bool = False,
+    log_path: Optional[str] = None,
+    profiler: Optional[Profiler] = None,
+) -> ProgressSink:
+    """
+    依命令列選項建立進度接收端
+
+    Args:
+        console: 顯示進度的 Console
+        quiet: 不顯示即時進度
+        log_path: 逐檔訊息的記錄檔（None 表示不寫）
+        profiler: 記錄每次重繪的耗時（None 表示不剖析）
+    """
+    if quiet and not log_path:
+        return NullProgress()
+    return ProgressTracker(console, log_path=log_path, live=not quiet, profiler=profiler)
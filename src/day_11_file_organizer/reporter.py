@@ -1,6 +1,9 @@
 """報告輸出器 - 使用 Rich 美化終端機輸出"""
 
+import os
 from datetime import datetime
+from functools import cached_property
+from typing import TYPE_CHECKING, List
 
 from rich import box
 from rich.console import Console
@@ -9,7 +12,11 @@ from rich.table import Table
 from rich.text import Text
 
 from .models import ClassifyResult
-from .roast import RoastGenerator
+from .planner import MovePlan
+from .profiling import Profiler
+
+if TYPE_CHECKING:
+    from .roast import RoastGenerator
 
 
 class ReportPrinter:
@@ -17,7 +24,13 @@ class ReportPrinter:
 
     def __init__(self) -> None:
         self.console = Console()
-        self.roaster = RoastGenerator()
+
+    @cached_property
+    def roaster(self) -> "RoastGenerator":
+        """吐槽產生器（第一次輸出羞辱榜時才匯入並建立關鍵字自動機）"""
+        from .roast import RoastGenerator
+
+        return RoastGenerator()
 
     def print_report(self, result: ClassifyResult) -> None:
         """輸出完整報告"""
@@ -35,12 +48,140 @@ class ReportPrinter:
             self._print_shame_board(result)
             self.console.print()
 
+        if result.detail_k and result.success_count > 0:
+            self._print_full_report(result)
+
+        if result.duplicate_groups:
+            self._print_duplicates(result)
+            self.console.print()
+
         if result.failed_count > 0:
             self._print_errors(result)
             self.console.print()
 
+        if result.backend_stats:
+            self._print_backends(result)
+            self.console.print()
+
+        if result.cumulative is not None:
+            self._print_cumulative(result)
+            self.console.print()
+
         self._print_footer()
 
+    def print_plan(self, plan: MovePlan, limit: int = 20) -> None:
+        """輸出搬移計畫摘要（dry-run）"""
+        self.console.print()
+
+        lines = [
+            f"[bold green]預計搬移[/]: {len(plan.moves)} 個檔案",
+            f"[bold red]無法處理[/]: {len(plan.failures)} 個檔案",
+            f"[bold blue]需建立資料夾[/]: {len(plan.target_dirs)} 個",
+            "",
+            f"[bold yellow]預計大小[/]: {self._format_size(plan.total_size_bytes)}",
+        ]
+        self.console.print(
+            Panel(
+                "\n".join(lines),
+                title="[bold]搬移計畫（未執行）[/]",
+                border_style="cyan",
+                padding=(1, 2),
+            )
+        )
+
+        if not plan.moves:
+            return
+
+        table = Table(box=box.SIMPLE, header_style="bold cyan")
+        table.add_column("來源", style="dim", max_width=45, overflow="ellipsis")
+        table.add_column("目標", style="green", max_width=45, overflow="ellipsis")
+
+        for move in plan.moves[:limit]:
+            target = os.path.relpath(move.target, plan.target_folder)
+            table.add_row(os.path.relpath(move.source, plan.source_folder), target)
+
+        self.console.print(table)
+        if len(plan.moves) > limit:
+            self.console.print(f"[dim]...還有 {len(plan.moves) - limit} 個檔案[/]")
+
+    def print_undo(self, restored: int, errors: List[str], limit: int = 10) -> None:
+        """輸出還原結果"""
+        self.console.print()
+        lines = [
+            f"[bold green]已搬回原位[/]: {restored} 個檔案",
+            f"[bold red]無法還原[/]: {len(errors)} 個檔案",
+        ]
+        self.console.print(
+            Panel(
+                "\n".join(lines),
+                title="[bold]還原結果[/]",
+                border_style="cyan",
+                padding=(1, 2),
+            )
+        )
+        for message in errors[:limit]:
+            self.console.print(f"[red]{message}[/]")
+        if len(errors) > limit:
+            self.console.print(f"[dim]...還有 {len(errors) - limit} 個檔案[/]")
+
+    def print_profile(self, profiler: Profiler) -> None:
+        """輸出各階段與各種操作的耗時（--profile）"""
+        wall = profiler.wall_seconds
+        table = Table(
+            title=f"執行剖析（總時間 {self._format_seconds(wall)}）",
+            box=box.SIMPLE,
+            header_style="bold blue",
+        )
+        table.add_column("階段 / 操作", style="cyan", no_wrap=True)
+        table.add_column("次數", style="green", justify="right", no_wrap=True)
+        table.add_column("自身時間", style="yellow", justify="right", no_wrap=True)
+        table.add_column("佔比", style="bold", justify="right", no_wrap=True)
+        table.add_column("p50", justify="right", no_wrap=True)
+        table.add_column("p99", style="red", justify="right", no_wrap=True)
+        table.add_column("資料量", style="magenta", justify="right", no_wrap=True)
+
+        for stats in profiler.snapshot():
+            depth = len(stats.path) - 1
+            label = "  " * depth + stats.name
+            table.add_row(
+                Text(label, style="" if depth else "bold"),
+                f"{stats.calls:,}",
+                self._format_seconds(stats.self_seconds),
+                f"{stats.self_seconds / wall * 100:.1f}%" if wall > 0 else "-",
+                self._format_seconds(stats.percentile(50)),
+                self._format_seconds(stats.percentile(99)),
+                self._format_size(stats.bytes) if stats.bytes else "",
+            )
+
+        self.console.print()
+        self.console.print(table)
+        self.console.print(
+            "[dim]自身時間不含巢狀操作；工作執行緒的操作與主執行緒同時進行，"
+            "佔比加總可能超過 100%。p50 / p99 為延遲直方圖的桶上限。[/]"
+        )
+
+    @staticmethod
+    def _format_seconds(seconds: float) -> str:
+        """人類可讀的時間長度"""
+        if seconds >= 1:
+            return f"{seconds:.2f} s"
+        elif seconds >= 1e-3:
+            return f"{seconds * 1e3:.1f} ms"
+        else:
+            return f"{seconds * 1e6:.0f} µs"
+
+    @staticmethod
+    def _format_size(total_bytes: int) -> str:
+        """人類可讀的總大小"""
+        if total_bytes >= 1024 * 1024 * 1024:
+            return f"{total_bytes / (1024 * 1024 * 1024):.2f} GB"
+        elif total_bytes >= 1024 * 1024:
+            return f"{total_bytes / (1024 * 1024):.2f} MB"
+        elif total_bytes >= 1024:
+            return f"{total_bytes / 1024:.2f} KB"
+        else:
+            return f"{total_bytes} B"
+
     def _print_header(self) -> None:
         """輸出標題"""
         title = Text()
@@ -59,15 +200,7 @@ class ReportPrinter:
     def _print_summary(self, result: ClassifyResult) -> None:
         """輸出摘要面板"""
         # 計算總大小的人類可讀格式
-        total_bytes = result.total_size_bytes
-        if total_bytes >= 1024 * 1024 * 1024:
-            size_str = f"{total_bytes / (1024 * 1024 * 1024):.2f} GB"
-        elif total_bytes >= 1024 * 1024:
-            size_str = f"{total_bytes / (1024 * 1024):.2f} MB"
-        elif total_bytes >= 1024:
-            size_str = f"{total_bytes / 1024:.2f} KB"
-        else:
-            size_str = f"{total_bytes} B"
+        size_str = self._format_size(result.total_size_bytes)
 
         # 建立摘要內容
         lines = [
@@ -77,6 +210,10 @@ class ReportPrinter:
             "",
             f"[bold yellow]處理大小[/]: {size_str}",
         ]
+        if result.skipped_count > 0:
+            lines.append(f"[dim]未變動略過: {result.skipped_count} 個檔案[/]")
+        if result.resumed_count > 0:
+            lines.append(f"[dim]接續上次執行: {result.resumed_count} 個中斷時已完成的搬移[/]")
 
         self.console.print(
             Panel(
@@ -96,6 +233,7 @@ class ReportPrinter:
         max_count = max(dist.values())
         max_bar_width = 30
         current_year = datetime.now().year
+        success_count = result.success_count
 
         self.console.print("[bold]年份分佈[/]")
         self.console.print()
@@ -103,7 +241,7 @@ class ReportPrinter:
         for year, count in dist.items():
             bar_width = int((count / max_count) * max_bar_width) if max_count > 0 else 0
             bar = "\u2588" * bar_width
-            percentage = (count / result.success_count) * 100 if result.success_count > 0 else 0
+            percentage = (count / success_count) * 100 if success_count > 0 else 0
 
             # 依年份遠近上色
             age = current_year - year
@@ -173,6 +311,152 @@ class ReportPrinter:
 
         self.console.print(table)
 
+    def _print_full_report(self, result: ClassifyResult, type_limit: int = 10) -> None:
+        """輸出完整羞辱報告：各年份、各類型的前 K 大檔案與最古老的檔案"""
+        k = result.detail_k
+        by_type = result.top_files_by_type
+        groups = [
+            (f"各年份前 {k} 大檔案", "年份", result.top_files_by_year),
+            (
+                f"各類型前 {k} 大檔案",
+                "類型",
+                {t.upper(): files for t, files in list(by_type.items())[:type_limit]},
+            ),
+        ]
+
+        for title, label, grouped in groups:
+            table = Table(
+                title=f"[bold red]{title}[/]",
+                box=box.ROUNDED,
+                header_style="bold red",
+                border_style="red",
+            )
+            table.add_column(label, style="magenta", justify="center")
+            table.add_column("檔名", style="cyan", max_width=35, overflow="ellipsis")
+            table.add_column("大小", style="yellow", justify="right", width=10)
+            table.add_column("吐槽", style="red", max_width=45, overflow="fold")
+
+            rows = [(str(group), f) for group, files in grouped.items() for f in files]
+            roasts = self.roaster.generate_roasts(f for _, f in rows)
+            previous = ""
+            for (group, f), roast in zip(rows, roasts):
+                # 同一組只在第一列顯示組名
+                table.add_row("" if group == previous else group, f.filename, f.size_display, roast)
+                previous = group
+
+            self.console.print(table)
+            self.console.print()
+
+        if len(by_type) > type_limit:
+            self.console.print(f"[dim]...還有 {len(by_type) - type_limit} 種類型[/]")
+            self.console.print()
+
+        oldest = result.oldest_files
+        table = Table(
+            title=f"[bold red]最古老的 {len(oldest)} 個檔案[/]",
+            box=box.ROUNDED,
+            header_style="bold red",
+            border_style="red",
+        )
+        table.add_column("檔名", style="cyan", max_width=35, overflow="ellipsis")
+        table.add_column("修改日期", style="magenta", justify="center")
+        table.add_column("大小", style="yellow", justify="right", width=10)
+        table.add_column("吐槽", style="red", max_width=45, overflow="fold")
+        for f, roast in zip(oldest, self.roaster.generate_roasts(oldest)):
+            table.add_row(
+                f.filename,
+                f.modified_time.strftime("%Y-%m-%d"),
+                f.size_display,
+                roast,
+            )
+        self.console.print(table)
+        self.console.print()
+
+    def _print_duplicates(self, result: ClassifyResult, limit: int = 10) -> None:
+        """輸出重複檔案表格"""
+        groups = result.duplicate_groups
+        if not groups:
+            return
+
+        action_titles = {
+            "report": "僅回報，仍照常搬移",
+            "skip": "重複檔案留在來源資料夾",
+            "hardlink": "重複檔案以硬連結指向正本",
+        }
+        wasted = self._format_size(result.duplicate_wasted_bytes)
+        table = Table(
+            title=(
+                f"[bold yellow]重複檔案 {result.duplicate_count} 個，浪費 {wasted}[/]"
+                f"\n[dim]{action_titles.get(result.dedup_action, '')}[/]"
+            ),
+            box=box.ROUNDED,
+            header_style="bold yellow",
+        )
+        table.add_column("正本", style="cyan", max_width=40, overflow="ellipsis")
+        table.add_column("份數", style="magenta", justify="right")
+        table.add_column("浪費", style="red", justify="right")
+
+        for group in groups[:limit]:
+            table.add_row(
+                os.path.basename(group.kept),
+                str(len(group.paths)),
+                self._format_size(group.wasted_bytes),
+            )
+
+        self.console.print(table)
+        if len(groups) > limit:
+            self.console.print(f"[dim]...還有 {len(groups) - limit} 組重複檔案[/]")
+
+    def _print_backends(self, result: ClassifyResult) -> None:
+        """輸出各搬移方式的吞吐量"""
+        table = Table(
+            title="搬移方式",
+            box=box.ROUNDED,
+            header_style="bold blue",
+        )
+        table.add_column("方式", style="cyan")
+        table.add_column("檔案數", style="green", justify="right")
+        table.add_column("大小", style="yellow", justify="right")
+        table.add_column("耗時", style="magenta", justify="right")
+        table.add_column("吞吐量", style="bold", justify="right")
+
+        for stats in result.backend_stats:
+            table.add_row(
+                stats.name,
+                str(stats.calls),
+                self._format_size(stats.bytes),
+                f"{stats.seconds:.2f} s",
+                f"{stats.throughput_mb:.1f} MB/s",
+            )
+
+        self.console.print(table)
+
+    def _print_cumulative(self, result: ClassifyResult) -> None:
+        """輸出索引中的累計統計（增量模式）"""
+        cumulative = result.cumulative
+        if cumulative is None:
+            return
+
+        top_types = list(cumulative.type_distribution.items())[:5]
+        lines = [
+            f"[bold blue]累計執行[/]: {cumulative.run_count} 次",
+            f"[bold green]累計整理[/]: {cumulative.total_count} 個檔案"
+            f"（本次 {result.success_count} 個）",
+            f"[bold yellow]累計大小[/]: {self._format_size(cumulative.total_size_bytes)}",
+        ]
+        if top_types:
+            types_str = "、".join(f"{t.upper()} {n}" for t, n in top_types)
+            lines.append(f"[bold magenta]常見類型[/]: {types_str}")
+
+        self.console.print(
+            Panel(
+                "\n".join(lines),
+                title="[bold]累計統計[/]",
+                border_style="blue",
+                padding=(1, 2),
+            )
+        )
+
     def _print_errors(self, result: ClassifyResult) -> None:
         """輸出錯誤列表"""
         failed = result.failed_files
@@ -1,12 +1,76 @@
 """毒舌吐槽產生器"""
 
+import bisect
 import random
-from typing import TYPE_CHECKING
+import re
+from collections import deque
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 if TYPE_CHECKING:
     from .models import FileStats
 
 
+class KeywordAutomaton:
+    """
+    Aho-Corasick 關鍵字自動機
+
+    建立時把所有關鍵字編成一張完整的狀態轉移表，之後一次掃描檔名就能找出
+    所有出現的關鍵字（可重疊，例如「最終」與「最終版」），成本只和檔名長度有關，
+    與關鍵字數量無關。大多數檔名不含任何關鍵字，先以合併的正規表示式快速排除。
+    """
+
+    def __init__(self, keywords: Sequence[str]) -> None:
+        self.keywords = list(keywords)
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[Tuple[int, ...]] = [()]
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto.append({})
+                    outputs.append(())
+                    goto[state][char] = next_state
+                state = next_state
+            outputs[state] += (index,)
+
+        # 廣度優先計算失敗連結，同時補齊每個狀態的轉移（較淺的狀態先完成）
+        fail = [0] * len(goto)
+        delta = [dict(transitions) for transitions in goto]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            fallback = fail[state]
+            outputs[state] += outputs[fallback]
+            for char, next_state in goto[state].items():
+                fail[next_state] = delta[fallback].get(char, 0) if state else 0
+                queue.append(next_state)
+            for char, target in delta[fallback].items():
+                delta[state].setdefault(char, target)
+
+        self._delta = delta
+        self._outputs = outputs
+        self._prefilter = (
+            re.compile("|".join(map(re.escape, self.keywords))) if self.keywords else None
+        )
+
+    def search(self, text: str) -> List[int]:
+        """text 中出現的關鍵字編號（依關鍵字順序，不重複）"""
+        if self._prefilter is None or not self._prefilter.search(text):
+            return []
+        found = set()
+        state = 0
+        delta = self._delta
+        outputs = self._outputs
+        for char in text:
+            state = delta[state].get(char, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+        return sorted(found)
+
+
 class RoastGenerator:
     """檔案吐槽產生器 - 毒舌版"""
 
@@ -158,6 +222,32 @@ class RoastGenerator:
         "普通的檔案，普通的浪費空間",
     ]
 
+    def __init__(
+        self, seed: Optional[int] = None, rng: Optional[random.Random] = None
+    ) -> None:
+        """
+        建立關鍵字自動機與排序好的門檻（只做一次）
+
+        Args:
+            seed: 亂數種子，相同種子產生相同的吐槽順序
+            rng: 自訂的亂數產生器（優先於 seed）
+        """
+        self.rng = rng or random.Random(seed)
+
+        self._keyword_messages = list(self.FILENAME_ROASTS.values())
+        self._automaton = KeywordAutomaton(
+            [keyword.lower() for keyword in self.FILENAME_ROASTS]
+        )
+
+        # 門檻由小到大，bisect 找出不超過目前數值的最大門檻
+        self._age_thresholds = sorted(self.AGE_ROASTS)
+        self._age_messages = [self.AGE_ROASTS[age] for age in self._age_thresholds]
+        self._size_thresholds = sorted(self.SIZE_ROASTS)
+        self._size_messages = [self.SIZE_ROASTS[size] for size in self._size_thresholds]
+        self._type_messages = {
+            file_type.lower(): messages for file_type, messages in self.TYPE_ROASTS.items()
+        }
+
     def generate_roast(self, file: "FileStats") -> str:
         """
         為檔案產生吐槽語句
@@ -169,35 +259,51 @@ class RoastGenerator:
         4. 檔案類型
         5. 預設吐槽
         """
-        candidates: list[str] = []
-        filename_lower = file.filename.lower()
+        return self._roast(file, datetime.now().year)
+
+    def generate_roasts(self, files: Iterable["FileStats"]) -> Iterator[str]:
+        """
+        批次產生吐槽（依 files 順序逐一產生，適合上百萬個檔案）
+
+        與逐一呼叫 generate_roast 的結果相同（相同種子時順序也相同），
+        但目前年份只取一次。
+        """
+        current_year = datetime.now().year
+        roast = self._roast
+        for file in files:
+            yield roast(file, current_year)
+
+    def _roast(self, file: "FileStats", current_year: int) -> str:
+        """依預先編譯的規則挑選一句吐槽"""
+        groups: List[List[str]] = []
 
         # 檢查檔名關鍵字（可累積多個）
-        for keyword, messages in self.FILENAME_ROASTS.items():
-            if keyword.lower() in filename_lower:
-                candidates.extend(messages)
+        for index in self._automaton.search(file.filename.lower()):
+            groups.append(self._keyword_messages[index])
 
         # 檢查年齡（只取最嚴重的一級）
-        age = file.age_years
-        for min_age in sorted(self.AGE_ROASTS.keys(), reverse=True):
-            if age >= min_age:
-                candidates.extend(self.AGE_ROASTS[min_age])
-                break
+        i = bisect.bisect_right(self._age_thresholds, current_year - file.year) - 1
+        if i >= 0:
+            groups.append(self._age_messages[i])
 
         # 檢查大小（只取最嚴重的一級）
-        size_mb = file.size_mb
-        for min_size in sorted(self.SIZE_ROASTS.keys(), reverse=True):
-            if size_mb >= min_size:
-                candidates.extend(self.SIZE_ROASTS[min_size])
-                break
+        i = bisect.bisect_right(self._size_thresholds, file.size_mb) - 1
+        if i >= 0:
+            groups.append(self._size_messages[i])
 
         # 檢查類型
-        if file.file_type.lower() in self.TYPE_ROASTS:
-            candidates.extend(self.TYPE_ROASTS[file.file_type.lower()])
-
-        # 隨機選擇一個吐槽
-        if candidates:
-            return random.choice(candidates)
+        messages = self._type_messages.get(file.file_type.lower())
+        if messages is not None:
+            groups.append(messages)
 
         # 沒有命中任何條件，使用預設吐槽
-        return random.choice(self.DEFAULT_ROASTS)
+        if not groups:
+            return self.rng.choice(self.DEFAULT_ROASTS)
+
+        # 在所有候選中均勻挑選一句（不必串接成新的清單）
+        pick = self.rng.randrange(sum(len(messages) for messages in groups))
+        for messages in groups:
+            if pick < len(messages):
+                break
+            pick -= len(messages)
+        return messages[pick]
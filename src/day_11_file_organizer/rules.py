@@ -0,0 +1,420 @@
+"""分類規則引擎 - 從 TOML 載入自訂規則，編譯成查表、合併的正規表示式與 bisect"""
+
+import bisect
+import fnmatch
+import operator
+import os
+import re
+import sys
+import time
+import tomllib
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Pattern, Sequence, Tuple
+
+from .classifier import EXTENSION_MAPPING
+
+# 大小單位（二進位）
+_SIZE_UNITS = {
+    "": 1,
+    "B": 1,
+    "K": 1024,
+    "KB": 1024,
+    "M": 1024**2,
+    "MB": 1024**2,
+    "G": 1024**3,
+    "GB": 1024**3,
+    "T": 1024**4,
+    "TB": 1024**4,
+}
+
+# 年齡單位（月、年取近似值）
+_AGE_UNITS = {
+    "d": 86400,
+    "w": 7 * 86400,
+    "m": 30 * 86400,
+    "y": 365 * 86400,
+}
+
+_SIZE_RE = re.compile(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?B?)\s*", re.IGNORECASE)
+_AGE_RE = re.compile(r"\s*(\d+(?:\.\d+)?)\s*([dwmy]?)\s*", re.IGNORECASE)
+
+
+def parse_size(value: Any) -> int:
+    """
+    解析大小設定
+
+    Args:
+        value: 位元組數（整數）或 "500MB"、"1.5GB" 這類字串
+
+    Raises:
+        ValueError: 無法解析
+    """
+    if isinstance(value, int):
+        return value
+    match = _SIZE_RE.fullmatch(str(value))
+    if not match:
+        raise ValueError(f"無法解析的大小: {value!r}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).upper()])
+
+
+def parse_age(value: Any) -> float:
+    """
+    解析年齡設定並回傳秒數
+
+    Args:
+        value: 天數（整數）或 "30d"、"2w"、"6m"、"5y" 這類字串
+
+    Raises:
+        ValueError: 無法解析
+    """
+    if isinstance(value, (int, float)):
+        return float(value) * 86400
+    match = _AGE_RE.fullmatch(str(value))
+    if not match:
+        raise ValueError(f"無法解析的時間長度: {value!r}")
+    return float(match.group(1)) * _AGE_UNITS[match.group(2).lower() or "d"]
+
+
+def _folder_name(value: Any) -> str:
+    """
+    檢查類型或年齡分組的名稱可以直接當作一層資料夾
+
+    Raises:
+        ValueError: 名稱是空字串、絕對路徑、包含路徑分隔字元或是 . / ..
+    """
+    name = str(value)
+    if (
+        name in ("", ".", "..")
+        or os.path.isabs(name)
+        or os.path.splitdrive(name)[0]
+        or any(sep and sep in name for sep in (os.sep, os.altsep, "/", "\0"))
+    ):
+        raise ValueError(f"名稱 {name!r} 只能是一層資料夾（不能是絕對路徑、含路徑分隔字元或 . / ..）")
+    return name
+
+
+class PatternRule(NamedTuple):
+    """單一檔名規則（已轉為正規表示式）"""
+
+    file_type: str
+    regex: str
+    # 檔名固定的開頭（glob 第一個萬用字元之前）；空字串表示開頭不固定
+    prefix: str = ""
+    # 檔名中一定會出現的最長固定片段（小寫），用來建立子字串索引
+    literal: str = ""
+    ignore_case: bool = False
+
+
+def _glob_literals(glob: str) -> List[str]:
+    """glob 中萬用字元（*、?、[...]）以外的固定片段，依出現順序"""
+    runs: List[str] = []
+    current = ""
+    i = 0
+    while i < len(glob):
+        char = glob[i]
+        if char in "*?":
+            runs.append(current)
+            current = ""
+        elif char == "[" and "]" in glob[i + 2 :]:
+            runs.append(current)
+            current = ""
+            i = glob.index("]", i + 2)
+        else:
+            current += char
+        i += 1
+    runs.append(current)
+    return runs
+
+
+def _glob_rule(file_type: str, glob: str, ignore_case: bool) -> PatternRule:
+    """將 glob 轉為整個檔名比對的規則"""
+    regex = fnmatch.translate(glob)
+    if ignore_case:
+        regex = f"(?i:{regex})"
+    runs = _glob_literals(glob)
+    return PatternRule(
+        file_type,
+        regex,
+        prefix=runs[0],
+        literal=max(runs, key=len).lower(),
+        ignore_case=ignore_case,
+    )
+
+
+def _has_group_reference(regex: str) -> bool:
+    """
+    regex 是否以編號參照群組（\\1 這類反向參照或 (?(1)...) 條件式）
+
+    合併後群組會重新編號，這類參照會指到其他規則的群組。
+    字元類別中的 \\1 是八進位跳脫，不算參照。
+    """
+    in_class = False
+    i = 0
+    while i < len(regex):
+        char = regex[i]
+        if char == "\\":
+            if not in_class and regex[i + 1 : i + 2] in tuple("123456789"):
+                return True
+            i += 2
+            continue
+        if in_class:
+            if char == "]":
+                in_class = False
+        elif char == "[":
+            in_class = True
+            # 緊接的 ] 或 ^] 是類別中的字元
+            if regex[i + 1 : i + 2] == "^":
+                i += 1
+            if regex[i + 1 : i + 2] == "]":
+                i += 1
+        elif regex.startswith("(?(", i):
+            return True
+        i += 1
+    return False
+
+
+def _regex_rule(file_type: str, regex: str, ignore_case: bool) -> PatternRule:
+    """使用者的正規表示式規則（自檔名開頭比對，無法建立索引）"""
+    compiled = re.compile(regex)
+    if compiled.groupindex:
+        raise ValueError(f"規則 {file_type!r} 的 regex 不能使用具名群組")
+    if _has_group_reference(regex):
+        raise ValueError(f"規則 {file_type!r} 的 regex 不能以編號參照群組（\\1、(?(1)...)）")
+    if ignore_case:
+        regex = f"(?i:{regex})"
+    # 以合併時的形式再編譯一次：(?i) 這類全域旗標只能放在整個運算式開頭，
+    # 合併後會讓所有規則一起失敗，在載入時就指出是哪一條規則
+    try:
+        re.compile(f"(?:{regex})()")
+    except re.error as e:
+        raise ValueError(
+            f"規則 {file_type!r} 的 regex 無法與其他規則合併"
+            f"（全域旗標請改用 (?i:...) 或 ignore_case）: {e}"
+        ) from e
+    return PatternRule(file_type, regex, ignore_case=ignore_case)
+
+
+def _combine(rules: Sequence[Tuple[int, PatternRule]]) -> Tuple[Pattern[str], List[int]]:
+    """
+    將多條規則合併成單一正規表示式
+
+    每條規則結尾加一個空的擷取群組作為標記，比對成功時 lastindex 就是
+    該規則的標記群組，不必逐條嘗試。分支以固定字元開頭時，re 會用第一個
+    字元快速跳過不可能的分支。
+
+    Returns:
+        (合併後的 Pattern, 群組編號 → 規則編號)
+    """
+    parts: List[str] = []
+    marks: List[int] = [-1]
+    for index, rule in rules:
+        groups = re.compile(rule.regex).groups
+        marks.extend([-1] * groups)
+        marks.append(index)
+        parts.append(f"(?:{rule.regex})()")
+    return re.compile("|".join(parts)), marks
+
+
+def _first_chars(rule: PatternRule) -> str:
+    """開頭固定的規則可能的第一個字元"""
+    first = rule.prefix[0]
+    return first.lower() + first.upper() if rule.ignore_case else first
+
+
+class RuleSet:
+    """
+    編譯後的分類規則
+
+    判斷順序：檔名規則 > 大小門檻 > 副檔名對應 > 副檔名本身。
+    年齡分組決定第一層資料夾（取代年份），沒有符合時仍為年份。
+
+    每個檔案的判斷成本不隨規則數量線性增加：
+    - 副檔名：一次 dict 查詢
+    - 檔名規則：依檔名第一個字元取出預先合併好的正規表示式只比對一次，
+      開頭不固定的 glob 以子字串索引篩選（regex 規則每個檔案都會比對）
+    - 大小門檻與年齡分組：在排序好的門檻上 bisect
+    """
+
+    def __init__(
+        self,
+        extensions: Optional[Mapping[str, str]] = None,
+        patterns: Sequence[PatternRule] = (),
+        sizes: Sequence[Tuple[int, str]] = (),
+        ages: Sequence[Tuple[float, str]] = (),
+        now: Optional[float] = None,
+    ) -> None:
+        self.extensions: Dict[str, str] = dict(
+            EXTENSION_MAPPING if extensions is None else extensions
+        )
+        self.patterns = list(patterns)
+        self.rule_count = len(self.patterns) + len(sizes) + len(ages)
+
+        # 檔名規則分三種，每個檔案只需查表加上少數幾次比對：
+        # - 開頭固定的規則：依第一個字元分組，每組預先合併成一個正規表示式
+        # - 開頭不固定但含固定片段的 glob：以片段的前兩個字元建立索引，
+        #   檔名中出現這兩個字元的規則才需要比對
+        # - 其他（regex、純萬用字元）：合併進每一組，每個檔案都會比對
+        self._buckets: Dict[str, Tuple[Pattern[str], List[int]]] = {}
+        self._fallback: Optional[Tuple[Pattern[str], List[int]]] = None
+        self._substrings: Dict[str, List[int]] = {}
+        self._compiled: List[Pattern[str]] = [re.compile(r.regex) for r in self.patterns]
+
+        always = {
+            index
+            for index, rule in enumerate(self.patterns)
+            if not rule.prefix and len(rule.literal) < 2
+        }
+        chars = set()
+        for index, rule in enumerate(self.patterns):
+            if rule.prefix:
+                chars.update(_first_chars(rule))
+            elif index not in always:
+                self._substrings.setdefault(rule.literal[:2], []).append(index)
+        self._substring_keys = frozenset(self._substrings)
+
+        # 每組包含該字元開頭的規則與每次都要比對的規則（保持規則順序）
+        for char in chars:
+            self._buckets[char] = _combine(
+                [
+                    (index, rule)
+                    for index, rule in enumerate(self.patterns)
+                    if index in always or (rule.prefix and char in _first_chars(rule))
+                ]
+            )
+        if always:
+            self._fallback = _combine([(index, self.patterns[index]) for index in sorted(always)])
+
+        # 大小門檻（由小到大）
+        ordered_sizes = sorted(sizes)
+        self._size_mins = [size for size, _ in ordered_sizes]
+        self._size_types = [file_type for _, file_type in ordered_sizes]
+
+        # 年齡分組：轉成修改時間的截止點（由舊到新）
+        now = time.time() if now is None else now
+        ordered_ages = sorted(ages, reverse=True)
+        self._age_cutoffs = [now - age for age, _ in ordered_ages]
+        self._age_folders = [folder for _, folder in ordered_ages]
+
+    @classmethod
+    def load(cls, path: str) -> "RuleSet":
+        """
+        從 TOML 規則檔載入
+
+        Raises:
+            OSError: 無法讀取檔案
+            ValueError: 格式錯誤（tomllib.TOMLDecodeError 也是 ValueError）
+        """
+        with open(path, "rb") as f:
+            return cls.from_dict(tomllib.load(f))
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "RuleSet":
+        """
+        從設定 dict 建立（格式同 TOML 規則檔）
+
+        Raises:
+            ValueError: 格式錯誤
+        """
+        options = data.get("options", {})
+        extensions: Dict[str, str] = (
+            {} if options.get("replace_builtin") else dict(EXTENSION_MAPPING)
+        )
+        for file_type, exts in data.get("types", {}).items():
+            try:
+                file_type = _folder_name(file_type)
+            except ValueError as e:
+                raise ValueError(f"types {e}") from e
+            if isinstance(exts, str):
+                exts = [exts]
+            for ext in exts:
+                ext = str(ext).lower()
+                extensions[ext if ext.startswith(".") else f".{ext}"] = file_type
+
+        patterns: List[PatternRule] = []
+        for i, rule in enumerate(data.get("patterns", [])):
+            file_type = rule.get("type")
+            if not file_type:
+                raise ValueError(f"patterns[{i}] 缺少 type")
+            ignore_case = bool(rule.get("ignore_case", False))
+            try:
+                file_type = _folder_name(file_type)
+                if "glob" in rule:
+                    patterns.append(_glob_rule(file_type, rule["glob"], ignore_case))
+                elif "regex" in rule:
+                    patterns.append(_regex_rule(file_type, rule["regex"], ignore_case))
+                else:
+                    raise ValueError("需要 glob 或 regex")
+            except re.error as e:
+                raise ValueError(f"patterns[{i}] 規則 {file_type!r} 的正規表示式錯誤: {e}") from e
+            except ValueError as e:
+                raise ValueError(f"patterns[{i}] {e}") from e
+
+        sizes: List[Tuple[int, str]] = []
+        for i, rule in enumerate(data.get("sizes", [])):
+            if "min_size" not in rule or not rule.get("type"):
+                raise ValueError(f"sizes[{i}] 需要 min_size 與 type")
+            try:
+                sizes.append((parse_size(rule["min_size"]), _folder_name(rule["type"])))
+            except ValueError as e:
+                raise ValueError(f"sizes[{i}] {e}") from e
+
+        ages: List[Tuple[float, str]] = []
+        for i, rule in enumerate(data.get("ages", [])):
+            if "older_than" not in rule or not rule.get("folder"):
+                raise ValueError(f"ages[{i}] 需要 older_than 與 folder")
+            try:
+                ages.append((parse_age(rule["older_than"]), _folder_name(rule["folder"])))
+            except ValueError as e:
+                raise ValueError(f"ages[{i}] {e}") from e
+
+        return cls(extensions, patterns, sizes, ages)
+
+    def file_type(self, filename: str, size: int) -> str:
+        """決定類型資料夾名稱"""
+        if self.patterns:
+            index = self._match_pattern(filename)
+            if index >= 0:
+                return self.patterns[index].file_type
+
+        if self._size_mins:
+            i = bisect.bisect_right(self._size_mins, size) - 1
+            if i >= 0:
+                return self._size_types[i]
+
+        file_extension = os.path.splitext(filename)[1].lower()
+        file_type = self.extensions.get(file_extension)
+        if file_type is not None:
+            return file_type
+        if file_extension:
+            return sys.intern(file_extension[1:])
+        return "other"
+
+    def _match_pattern(self, filename: str) -> int:
+        """第一個符合的檔名規則編號（依規則檔順序），沒有符合時為 -1"""
+        best = -1
+        compiled = self._buckets.get(filename[:1], self._fallback)
+        if compiled is not None:
+            match = compiled[0].match(filename)
+            if match:
+                best = compiled[1][match.lastindex]
+
+        if self._substrings:
+            # 檔名中相鄰兩個字元（map 在 C 層逐一相加）與索引取交集
+            lowered = filename.lower()
+            hits = self._substring_keys.intersection(map(operator.add, lowered, lowered[1:]))
+            if hits:
+                candidates = sorted(i for key in hits for i in self._substrings[key])
+                for index in candidates:
+                    if best >= 0 and index > best:
+                        break
+                    if self._compiled[index].match(filename):
+                        best = index
+                        break
+        return best
+
+    def folder(self, year: int, mtime: float) -> str:
+        """決定第一層資料夾名稱（年齡分組或年份）"""
+        if self._age_cutoffs:
+            i = bisect.bisect_left(self._age_cutoffs, mtime)
+            if i < len(self._age_cutoffs):
+                return self._age_folders[i]
+        return str(year)
@@ -0,0 +1,281 @@
+"""檔案掃描器 - 以 os.scandir 串流產生檔案記錄"""
+
+import os
+from collections import deque
+from typing import TYPE_CHECKING, Deque, Iterator, List, NamedTuple, Optional, Protocol, Tuple
+
+if TYPE_CHECKING:
+    from .filters import ScanFilter
+
+
+class ScanEntry(NamedTuple):
+    """掃描到的單一檔案（輕量記錄）"""
+
+    path: str
+    name: str
+    parent: str
+    size: int
+    mtime: float
+    dev: int
+    ino: int
+    error: Optional[OSError] = None
+
+
+class ScanState(Protocol):
+    """跨次執行的掃描狀態（ScanIndex、MoveJournal）"""
+
+    def unchanged_subdirs(self, folder: str, mtime_ns: int) -> Optional[List[str]]: ...
+
+    def visit_dir(self, folder: str, mtime_ns: int, subdirs: List[str]) -> None: ...
+
+    def is_unchanged_file(self, path: str, size: int, mtime: float, inode: int) -> bool: ...
+
+
+def _relative(folder: str, prefix_len: int) -> str:
+    """資料夾相對於掃描根目錄的路徑前綴（以 "/" 分隔並結尾；根目錄本身為 ""）"""
+    rel = folder[prefix_len:]
+    if not rel:
+        return ""
+    if os.sep != "/":
+        rel = rel.replace(os.sep, "/")
+    return rel + "/"
+
+
+def _walks_into(
+    name: str, rel: str, scan_filter: Optional["ScanFilter"]
+) -> bool:
+    """是否進入子資料夾（rel 為所在資料夾的相對路徑前綴）"""
+    # 隱藏資料夾（.git 等）與隱藏檔案一樣略過
+    if name.startswith("."):
+        return False
+    return scan_filter is None or not scan_filter.prunes_dir(
+        name, rel + name, rel.count("/") + 1
+    )
+
+
+def scan_files(
+    source_folder: str,
+    index: Optional[ScanState] = None,
+    scan_filter: Optional["ScanFilter"] = None,
+    root: Optional[str] = None,
+) -> Iterator[ScanEntry]:
+    """
+    以 os.scandir 遍歷資料夾，逐一產生檔案記錄
+
+    走訪順序與 os.walk(topdown=True) 相同：先處理目前資料夾的檔案，
+    再依序進入子資料夾。每個檔案只呼叫一次 DirEntry.stat()，
+    平台有快取時（例如 Windows）不會產生額外的系統呼叫。
+    符號連結指向的資料夾不會被進入（等同 os.walk 的 followlinks=False），
+    隱藏檔案與隱藏資料夾都會略過。
+
+    提供 scan_filter 時，排除的資料夾與超過最大深度的資料夾不會被列出，
+    名稱條件在 stat 之前判斷。有檔案被篩選掉的資料夾不回報 visit_dir，
+    下次一定會重新列出，篩選條件改變時不會漏掉檔案；掃描狀態記錄的子資料夾
+    清單則包含所有子資料夾（不論是否進入）。
+
+    提供 index 時會啟用增量掃描：修改時間沒變的資料夾不再列出內容
+    （直接沿用索引中的子資料夾清單），與索引記錄完全相同的檔案也會略過。
+    注意資料夾的修改時間只反映檔案的新增、刪除與改名，
+    原地修改的檔案要等資料夾本身有變動才會被重新檢查。
+
+    Args:
+        source_folder: 來源資料夾路徑（使用 index 時需為絕對路徑）
+        index: 增量掃描索引（或接續執行用的搬移日誌）
+        scan_filter: 篩選條件（None 表示全部處理）
+        root: 篩選條件的路徑與深度以此為準（None 表示 source_folder；分片時為整個來源資料夾）
+
+    Yields:
+        ScanEntry: 檔案記錄；stat 失敗時 error 會帶有例外
+    """
+    prefix_len = len(os.path.join(root if root is not None else source_folder, ""))
+    stack: List[Tuple[str, int]] = [(source_folder, 0)]
+    if index is not None:
+        try:
+            stack = [(source_folder, os.stat(source_folder).st_mtime_ns)]
+        except OSError:
+            return
+
+    while stack:
+        folder, folder_mtime_ns = stack.pop()
+        rel = _relative(folder, prefix_len) if scan_filter is not None else ""
+        subdirs: list[Tuple[str, int]] = []
+
+        # 資料夾沒有變動：不列出內容，只繼續檢查子資料夾
+        if index is not None:
+            known_subdirs = index.unchanged_subdirs(folder, folder_mtime_ns)
+            if known_subdirs is not None:
+                for path in known_subdirs:
+                    if not _walks_into(os.path.basename(path), rel, scan_filter):
+                        continue
+                    try:
+                        subdirs.append((path, os.stat(path).st_mtime_ns))
+                    except OSError:
+                        continue
+                stack.extend(reversed(subdirs))
+                continue
+
+        try:
+            it = os.scandir(folder)
+        except OSError:
+            # 與 os.walk 相同：無法列出的資料夾直接略過
+            continue
+
+        # 掃描狀態要記錄所有子資料夾，實際進入的另外列出
+        all_subdirs: List[str] = []
+        filtered = False
+        with it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+
+                if is_dir:
+                    if not entry.is_symlink():
+                        all_subdirs.append(entry.path)
+                        if not _walks_into(entry.name, rel, scan_filter):
+                            continue
+                        mtime_ns = 0
+                        if index is not None:
+                            try:
+                                mtime_ns = entry.stat().st_mtime_ns
+                            except OSError:
+                                continue
+                        subdirs.append((entry.path, mtime_ns))
+                    continue
+
+                # 跳過隱藏檔案（不需要 stat）
+                if entry.name.startswith("."):
+                    continue
+
+                # 名稱條件不需要 stat
+                if scan_filter is not None and scan_filter.skips_name(entry.name, rel + entry.name):
+                    filtered = True
+                    continue
+
+                try:
+                    st = entry.stat()
+                except OSError as e:
+                    yield ScanEntry(entry.path, entry.name, folder, 0, 0.0, 0, 0, e)
+                    continue
+
+                if scan_filter is not None and scan_filter.skips_stat(st.st_size, st.st_mtime):
+                    filtered = True
+                    continue
+
+                if index is not None and index.is_unchanged_file(
+                    entry.path, st.st_size, st.st_mtime, st.st_ino
+                ):
+                    continue
+
+                yield ScanEntry(
+                    entry.path,
+                    entry.name,
+                    folder,
+                    st.st_size,
+                    st.st_mtime,
+                    st.st_dev,
+                    st.st_ino,
+                )
+
+        if index is not None and not filtered:
+            index.visit_dir(folder, folder_mtime_ns, all_subdirs)
+
+        # 反向推入堆疊，讓子資料夾依原順序被處理
+        stack.extend(reversed(subdirs))
+
+
+def list_dir(
+    folder: str, scan_filter: Optional["ScanFilter"] = None, root: Optional[str] = None
+) -> Tuple[List[str], List[Tuple[str, int]]]:
+    """
+    列出單一資料夾（不 stat 檔案，供非同步掃描分別處理每個檔案）
+
+    隱藏項目、符號連結資料夾與篩選條件的處理方式與 scan_files 相同；
+    大小與修改時間條件要由呼叫端在 stat 之後判斷（ScanFilter.skips_stat）。
+
+    Args:
+        folder: 資料夾路徑
+        scan_filter: 篩選條件（None 表示全部列出）
+        root: 篩選條件的路徑與深度以此為準（None 表示 folder 本身）
+
+    Returns:
+        (檔名清單, [(子資料夾路徑, 裝置編號), ...])
+
+    Raises:
+        OSError: 無法列出資料夾
+    """
+    rel = ""
+    if scan_filter is not None and root is not None:
+        rel = _relative(folder, len(os.path.join(root, "")))
+    names: List[str] = []
+    subdirs: List[Tuple[str, int]] = []
+    with os.scandir(folder) as it:
+        for entry in it:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+
+            if is_dir:
+                if not entry.is_symlink() and _walks_into(entry.name, rel, scan_filter):
+                    try:
+                        subdirs.append((entry.path, entry.stat().st_dev))
+                    except OSError:
+                        continue
+                continue
+
+            if entry.name.startswith("."):
+                continue
+            if scan_filter is None or not scan_filter.skips_name(entry.name, rel + entry.name):
+                names.append(entry.name)
+    return names, subdirs
+
+
+def stat_entry(folder: str, name: str) -> ScanEntry:
+    """stat 單一檔案並建立掃描記錄（失敗時 error 會帶有例外）"""
+    path = os.path.join(folder, name)
+    try:
+        st = os.stat(path)
+    except OSError as e:
+        return ScanEntry(path, name, folder, 0, 0.0, 0, 0, e)
+    return ScanEntry(
+        path, name, folder, st.st_size, st.st_mtime, st.st_dev, st.st_ino
+    )
+
+
+def shard_tree(
+    source_folder: str,
+    min_shards: int,
+    max_depth: int = 3,
+    scan_filter: Optional["ScanFilter"] = None,
+) -> List[Tuple[str, bool]]:
+    """
+    將來源資料夾切成可平行處理的分片
+
+    從最上層子資料夾開始切分；分片數不足 min_shards 時，依廣度優先把遞迴
+    分片再展開一層（最多 max_depth 層），讓大小不均的樹也能切得夠細，
+    交給程序池時閒置的程序才有工作可以接手。
+
+    scan_filter 排除的資料夾不會成為分片。
+
+    Returns:
+        [(資料夾, 是否遞迴), ...]：遞迴分片在前；不遞迴的分片只處理該資料夾
+        本身的檔案（它的子資料夾已是其他分片）
+    """
+    flat: List[Tuple[str, bool]] = []
+    pending: Deque[Tuple[str, int]] = deque([(source_folder, 0)])
+
+    while pending and (not flat or len(flat) + len(pending) < min_shards):
+        folder, depth = pending[0]
+        if depth >= max_depth:
+            break
+        pending.popleft()
+        try:
+            _, subdirs = list_dir(folder, scan_filter, source_folder)
+        except OSError:
+            continue
+        flat.append((folder, False))
+        pending.extend((path, depth + 1) for path, _ in subdirs)
+
+    return [(folder, True) for folder, _ in pending] + flat
@@ -0,0 +1,434 @@
+"""資料夾監看 - inotify（Linux，透過 ctypes）或輪詢，並等檔案寫完才交給整理流程"""
+
+import errno
+import heapq
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+
+import os
+import select
+import struct
+import sys
+import time
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .filters import ScanFilter
+
+# 事件種類
+CREATED = "created"  # 新出現的檔案（可能還沒開始寫入）
+WRITING = "writing"  # 檔案內容被修改，寫入端可能還開著
+CLOSED = "closed"  # 寫入端已關閉，或檔案是整個搬進來的
+REMOVED = "removed"  # 檔案已刪除或搬走
+
+# 檔案最後一次事件後要安靜多久才檢查是否寫完（秒）
+DEFAULT_SETTLE = 0.25
+
+# 輪詢模式的掃描間隔（秒）
+DEFAULT_POLL_INTERVAL = 1.0
+
+# inotify 常數（<sys/inotify.h>）
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+)
+
+# struct inotify_event：int wd; uint32 mask, cookie, len; char name[len]
+_EVENT = struct.Struct("iIII")
+
+_READ_SIZE = 64 * 1024
+
+Event = Tuple[str, str]
+
+
+def _is_excluded(path: str, excluded: Tuple[str, ...]) -> bool:
+    """path 是否位於排除的資料夾（例如放在來源底下的目標資料夾）之中"""
+    return any(path == folder or path.startswith(folder + os.sep) for folder in excluded)
+
+
+def _skips_dir(
+    path: str, root: str, excluded: Tuple[str, ...], scan_filter: Optional["ScanFilter"]
+) -> bool:
+    """
+    不監看的子資料夾：排除的資料夾、隱藏資料夾與篩選條件剪除的子樹
+
+    與 scan_files 走訪時略過的資料夾相同，這些資料夾中的檔案不會被整理，
+    不必為它們加入 watch 或在輪詢時列出。
+    """
+    if _is_excluded(path, excluded):
+        return True
+    name = os.path.basename(path)
+    if name.startswith("."):
+        return True
+    if scan_filter is None:
+        return False
+    relpath = os.path.relpath(path, root).replace(os.sep, "/")
+    return scan_filter.prunes_dir(name, relpath, relpath.count("/") + 1)
+
+
+def _list_files(
+    root: str, excluded: Tuple[str, ...], scan_filter: Optional["ScanFilter"] = None
+) -> Iterable[Tuple[str, os.stat_result]]:
+    """遞迴列出資料夾中的檔案與 stat（略過不監看的資料夾與符號連結資料夾）"""
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            it = os.scandir(current)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not _skips_dir(entry.path, root, excluded, scan_filter):
+                            stack.append(entry.path)
+                        continue
+                    yield entry.path, entry.stat()
+                except OSError:
+                    continue
+
+
+def _open_for_writing(path: str) -> bool:
+    """
+    檔案是否還有寫入端開著（Linux 以 read lease 檢查）
+
+    有任何行程以寫入模式開著檔案時，F_SETLEASE 取得 read lease 會失敗（EAGAIN）。
+    不是自己的檔案、檔案系統不支援或非 Linux 時無法判斷，視為沒有寫入端。
+    """
+    lease = getattr(fcntl, "F_SETLEASE", None)
+    if lease is None:
+        return False
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, "O_NONBLOCK", 0))
+    except OSError:
+        return False
+    try:
+        fcntl.fcntl(fd, lease, fcntl.F_RDLCK)
+    except OSError as e:
+        return e.errno in (errno.EAGAIN, errno.EWOULDBLOCK)
+    else:
+        fcntl.fcntl(fd, lease, fcntl.F_UNLCK)
+        return False
+    finally:
+        os.close(fd)
+
+
+class InotifyWatcher:
+    """
+    以 Linux inotify 監看整棵資料夾樹（透過 ctypes 呼叫 libc，不需要額外套件）
+
+    每個資料夾一個 watch；新建或搬入的子資料夾會即時加入，並把加入前已在
+    裡面的檔案當作 CLOSED 事件回報。沒有事件時 read() 阻塞在 select，
+    閒置時不耗用 CPU。事件佇列溢位時重新列出整棵樹。
+    隱藏資料夾與 scan_filter 剪除的子樹不加入 watch。
+
+    Raises:
+        OSError: 平台不支援 inotify，或 watch 數量超過系統上限
+    """
+
+    def __init__(
+        self,
+        root: str,
+        exclude: Iterable[str] = (),
+        scan_filter: Optional["ScanFilter"] = None,
+    ) -> None:
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify 只支援 Linux")
+        # ctypes.util 會連帶載入 subprocess 等模組，只在監看模式才匯入
+        import ctypes
+        import ctypes.util
+
+        self.root = root
+        self._excluded = tuple(exclude)
+        self._scan_filter = scan_filter
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._fd = fd
+        self._dirs: Dict[int, str] = {}
+        self._pending: List[Event] = []
+        try:
+            self._watch_tree(root, report=False)
+        except OSError:
+            self.close()
+            raise
+
+    def read(self, timeout: Optional[float]) -> List[Event]:
+        """等待最多 timeout 秒（None 表示一直等），回傳這段期間的事件"""
+        events, self._pending = self._pending, []
+        if events:
+            timeout = 0
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return events
+
+        try:
+            data = os.read(self._fd, _READ_SIZE)
+        except BlockingIOError:
+            return events
+
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & _IN_Q_OVERFLOW:
+                # 事件遺失：整棵樹重新列出一次
+                events.extend(
+                    (path, CLOSED)
+                    for path, _ in _list_files(self.root, self._excluded, self._scan_filter)
+                )
+                continue
+            if mask & _IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+
+            folder = self._dirs.get(wd)
+            if folder is None or not name:
+                continue
+            path = os.path.join(folder, os.fsdecode(name))
+
+            if mask & _IN_ISDIR:
+                if mask & (_IN_CREATE | _IN_MOVED_TO) and not _skips_dir(
+                    path, self.root, self._excluded, self._scan_filter
+                ):
+                    try:
+                        self._watch_tree(path, report=True)
+                    except OSError:
+                        continue
+                continue
+
+            if mask & (_IN_DELETE | _IN_MOVED_FROM):
+                events.append((path, REMOVED))
+            elif mask & (_IN_CLOSE_WRITE | _IN_MOVED_TO):
+                events.append((path, CLOSED))
+            elif mask & _IN_MODIFY:
+                events.append((path, WRITING))
+            elif mask & _IN_CREATE:
+                events.append((path, CREATED))
+
+        events.extend(self._pending)
+        self._pending = []
+        return events
+
+    def close(self) -> None:
+        """關閉 inotify"""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def __enter__(self) -> "InotifyWatcher":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _watch_tree(self, folder: str, report: bool) -> None:
+        """為 folder 與所有子資料夾加入 watch；report 時把已存在的檔案當作事件回報"""
+        import ctypes
+
+        stack = [folder]
+        while stack:
+            current = stack.pop()
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(current), _WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err in (errno.ENOENT, errno.ENOTDIR, errno.EACCES):
+                    continue
+                raise OSError(err, os.strerror(err), current)
+            self._dirs[wd] = current
+
+            try:
+                it = os.scandir(current)
+            except OSError:
+                continue
+            with it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if is_dir:
+                        if not _skips_dir(entry.path, self.root, self._excluded, self._scan_filter):
+                            stack.append(entry.path)
+                    elif report:
+                        # watch 加入前就已寫入的檔案不會再有事件
+                        self._pending.append((entry.path, CLOSED))
+
+
+class PollingWatcher:
+    """
+    定期重新列出整棵樹並比對大小與修改時間（沒有 inotify 時的替代方案）
+
+    新增或變動的檔案回報為 CLOSED（無法得知寫入端是否還開著，
+    由 Debouncer 比對前後兩次 stat 判斷是否寫完）。
+    隱藏資料夾與 scan_filter 剪除的子樹不列出。
+    """
+
+    def __init__(
+        self,
+        root: str,
+        exclude: Iterable[str] = (),
+        interval: float = DEFAULT_POLL_INTERVAL,
+        scan_filter: Optional["ScanFilter"] = None,
+    ) -> None:
+        self.root = root
+        self.interval = interval
+        self._excluded = tuple(exclude)
+        self._scan_filter = scan_filter
+        self._snapshot = self._scan()
+        self._next_poll = time.monotonic() + interval
+
+    def read(self, timeout: Optional[float]) -> List[Event]:
+        """等待到下一次輪詢（最多 timeout 秒），回傳與上一次的差異"""
+        wait = self._next_poll - time.monotonic()
+        if timeout is not None and timeout < wait:
+            time.sleep(max(timeout, 0))
+            return []
+        if wait > 0:
+            time.sleep(wait)
+        self._next_poll = time.monotonic() + self.interval
+
+        snapshot = self._scan()
+        previous = self._snapshot
+        self._snapshot = snapshot
+        events: List[Event] = [
+            (path, CLOSED) for path, key in snapshot.items() if previous.get(path) != key
+        ]
+        events.extend((path, REMOVED) for path in previous.keys() - snapshot.keys())
+        return events
+
+    def close(self) -> None:
+        """輪詢不需要釋放資源"""
+
+    def __enter__(self) -> "PollingWatcher":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        """整棵樹的 {路徑: (大小, 修改時間)}"""
+        return {
+            path: (st.st_size, st.st_mtime_ns)
+            for path, st in _list_files(self.root, self._excluded, self._scan_filter)
+        }
+
+
+def create_watcher(
+    root: str,
+    exclude: Iterable[str] = (),
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    scan_filter: Optional["ScanFilter"] = None,
+) -> "InotifyWatcher | PollingWatcher":
+    """優先使用 inotify，不支援（或 watch 數量超過上限）時改為輪詢"""
+    try:
+        return InotifyWatcher(root, exclude, scan_filter)
+    except (OSError, AttributeError):
+        return PollingWatcher(root, exclude, poll_interval, scan_filter)
+
+
+class Debouncer:
+    """
+    等檔案寫完才放行
+
+    每個事件都會把檔案的檢查時間延後 settle 秒；寫入端還開著（WRITING 之後
+    尚未收到 CLOSED）的檔案不會被檢查。到了檢查時間先 stat 一次，
+    再過 settle 秒大小與修改時間都沒變才放行，所以持續變大的檔案會一直等下去。
+    放行前再確認沒有行程以寫入模式開著檔案（監看開始前或新資料夾加入 watch
+    前就開始寫入的檔案沒有 WRITING 事件可依靠，寫入端暫停超過 settle 也不會誤放行）。
+    檢查時間以最小堆積管理，延後時舊的項目留在堆積中、取出時略過。
+    """
+
+    def __init__(self, settle: float = DEFAULT_SETTLE) -> None:
+        self.settle = settle
+        # 路徑 -> [檢查時間, 寫入中, 上一次 stat 的 (大小, 修改時間)]
+        self._pending: Dict[str, list] = {}
+        self._heap: List[Tuple[float, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, path: str, kind: str, now: float) -> None:
+        """記錄一個事件"""
+        if kind == REMOVED:
+            self._pending.pop(path, None)
+            return
+
+        state = self._pending.get(path)
+        if state is None:
+            state = self._pending[path] = [0.0, False, None]
+        state[0] = now + self.settle
+        if kind == WRITING:
+            state[1] = True
+        elif kind == CLOSED:
+            state[1] = False
+        if not state[1]:
+            heapq.heappush(self._heap, (state[0], path))
+
+    def next_deadline(self) -> Optional[float]:
+        """最早的檢查時間（沒有待檢查的檔案時為 None）"""
+        heap = self._heap
+        while heap:
+            deadline, path = heap[0]
+            state = self._pending.get(path)
+            if state is not None and not state[1] and state[0] == deadline:
+                return deadline
+            heapq.heappop(heap)
+        return None
+
+    def pop_ready(self, now: float) -> List[str]:
+        """取出已寫完的檔案"""
+        ready: List[str] = []
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            deadline, path = heapq.heappop(heap)
+            state = self._pending.get(path)
+            if state is None or state[1] or state[0] != deadline:
+                continue
+
+            try:
+                st = os.stat(path)
+            except OSError:
+                self._pending.pop(path, None)
+                continue
+
+            key = (st.st_size, st.st_mtime_ns)
+            if state[2] == key and not _open_for_writing(path):
+                del self._pending[path]
+                ready.append(path)
+            else:
+                # 第一次檢查或還在變動：再等 settle 秒確認
+                state[2] = key
+                state[0] = now + self.settle
+                heapq.heappush(heap, (state[0], path))
+        return ready
+
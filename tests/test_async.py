@@ -0,0 +1,117 @@
+"""organize_async：以 asyncio 同時發出多個檔案操作的整理流程"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+from day_11_file_organizer.main import classify_files_by_year_and_type, organize_async
+
+# 套件的 main 屬性是 CLI 入口函式，模組本身要從 sys.modules 取得
+main_module = sys.modules[organize_async.__module__]
+
+NAMES = [
+    f"d{d}/s{s}/f{d}{s}{i}.{ext}"
+    for d in range(3)
+    for s in range(2)
+    for i, ext in enumerate(["pdf", "jpg", "txt", "zip"])
+]
+
+
+def _make_files(folder, names):
+    for name in names:
+        path = folder / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(name)
+        os.utime(path, (1_700_000_000, 1_700_000_000))
+
+
+def _layout(folder):
+    return sorted(
+        os.path.relpath(os.path.join(path, name), folder)
+        for path, _, files in os.walk(folder)
+        for name in files
+        if not name.startswith(".")
+    )
+
+
+def _track_in_flight(monkeypatch, delay=0.02):
+    """記錄同時在執行緒池中處理的檔案數上限"""
+    state = {"now": 0, "max": 0}
+    lock = threading.Lock()
+    real = main_module.stat_entry
+
+    def slow_stat(folder, name):
+        with lock:
+            state["now"] += 1
+            state["max"] = max(state["max"], state["now"])
+        time.sleep(delay)
+        try:
+            return real(folder, name)
+        finally:
+            with lock:
+                state["now"] -= 1
+
+    monkeypatch.setattr(main_module, "stat_entry", slow_stat)
+    return state
+
+
+def test_same_layout_as_the_sync_engine(tmp_path):
+    _make_files(tmp_path / "a", NAMES)
+    _make_files(tmp_path / "b", NAMES)
+
+    sync_result = classify_files_by_year_and_type(str(tmp_path / "a"), str(tmp_path / "out-a"))
+    async_result = asyncio.run(organize_async(str(tmp_path / "b"), str(tmp_path / "out-b"), 4))
+
+    assert _layout(tmp_path / "out-a") == _layout(tmp_path / "out-b")
+    assert async_result.success_count == sync_result.success_count == len(NAMES)
+    assert async_result.type_distribution == sync_result.type_distribution
+    assert _layout(tmp_path / "b") == []
+
+
+def test_in_flight_files_stay_within_the_limit(tmp_path, monkeypatch):
+    _make_files(tmp_path / "src", NAMES)
+    state = _track_in_flight(monkeypatch)
+
+    result = asyncio.run(organize_async(str(tmp_path / "src"), str(tmp_path / "out"), 3))
+
+    assert result.success_count == len(NAMES)
+    assert 1 < state["max"] <= 3
+
+
+def test_each_device_gets_its_own_limit_and_threads(tmp_path, monkeypatch):
+    source = tmp_path / "src"
+    _make_files(source, NAMES)
+    state = _track_in_flight(monkeypatch, delay=0.05)
+    real = main_module.list_dir
+
+    def fake_devices(folder, *args):
+        # 來源底下的 d0、d1、d2 各自當作不同的掛載點
+        filenames, subdirs = real(folder, *args)
+        return filenames, [
+            (path, 1000 + int(os.path.relpath(path, source).split(os.sep)[0][1:]))
+            for path, _ in subdirs
+        ]
+
+    monkeypatch.setattr(main_module, "list_dir", fake_devices)
+    result = asyncio.run(organize_async(str(source), str(tmp_path / "out"), 2))
+
+    assert result.success_count == len(NAMES)
+    # 共用一個大小為 2 的執行緒池時最多只有 2 個
+    assert 2 < state["max"] <= 2 * 3
+
+
+def test_stream_log_keeps_no_files(tmp_path):
+    _make_files(tmp_path / "src", NAMES)
+    log = tmp_path / "records.jsonl"
+
+    result = asyncio.run(
+        organize_async(str(tmp_path / "src"), str(tmp_path / "out"), 4, stream_log=str(log))
+    )
+
+    records = [json.loads(line) for line in log.read_text(encoding="utf-8").splitlines()]
+    assert len(result.files) == 0
+    assert result.success_count == len(NAMES)
+    assert sorted(r["filename"] for r in records) == sorted(os.path.basename(n) for n in NAMES)
@@ -0,0 +1,144 @@
+"""MoveBackend：跨裝置複製方法的逐級退回與失敗時的清理"""
+
+import errno
+import fcntl
+import os
+import sys
+
+import pytest
+
+from day_11_file_organizer import backends
+from day_11_file_organizer.backends import MoveBackend
+
+pytestmark = pytest.mark.skipif(
+    not sys.platform.startswith("linux"), reason="reflink / sendfile 只在 Linux 嘗試"
+)
+
+DATA = os.urandom(300_000)
+
+
+def _unsupported(code):
+    def fail(*args, **kwargs):
+        raise OSError(code, os.strerror(code))
+
+    return fail
+
+
+def _fake_reflink(dst_fd, request, src_fd):
+    # 以一般讀寫模擬支援 reflink 的檔案系統
+    while True:
+        chunk = os.read(src_fd, 65536)
+        if not chunk:
+            return 0
+        os.write(dst_fd, chunk)
+
+
+def _cross_device_move(backend, tmp_path, name="data.bin"):
+    source = tmp_path / "src" / name
+    source.parent.mkdir(exist_ok=True)
+    source.write_bytes(DATA)
+    os.utime(source, (1_600_000_000, 1_600_000_000))
+    target = tmp_path / "dst" / name
+    target.parent.mkdir(exist_ok=True)
+    # 來源裝置編號與目標不同，不會先試 rename
+    fake_dev = os.stat(target.parent).st_dev + 1
+    method = backend.move(str(source), str(target), len(DATA), source_dev=fake_dev)
+    return method, source, target
+
+
+@pytest.mark.parametrize(
+    "failing, expected",
+    [
+        ((), "reflink"),
+        (("reflink",), "copy_file_range"),
+        (("reflink", "copy_file_range"), "sendfile"),
+        (("reflink", "copy_file_range", "sendfile"), "copy"),
+    ],
+)
+def test_falls_back_to_the_next_method(tmp_path, monkeypatch, failing, expected):
+    calls = {"reflink": 0, "copy_file_range": 0, "sendfile": 0}
+
+    def counted(name, func):
+        def wrapper(*args, **kwargs):
+            calls[name] += 1
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    reflink = _unsupported(errno.EOPNOTSUPP) if "reflink" in failing else _fake_reflink
+    copy_file_range = (
+        _unsupported(errno.EXDEV) if "copy_file_range" in failing else os.copy_file_range
+    )
+    sendfile = _unsupported(errno.EINVAL) if "sendfile" in failing else os.sendfile
+    monkeypatch.setattr(fcntl, "ioctl", counted("reflink", reflink))
+    monkeypatch.setattr(os, "copy_file_range", counted("copy_file_range", copy_file_range))
+    monkeypatch.setattr(os, "sendfile", counted("sendfile", sendfile))
+
+    backend = MoveBackend()
+    method, source, target = _cross_device_move(backend, tmp_path)
+
+    assert method == expected
+    assert target.read_bytes() == DATA
+    assert not source.exists()
+    assert target.stat().st_mtime == 1_600_000_000
+    assert backend.stats[expected].calls == 1
+    assert backend.stats[expected].bytes == len(DATA)
+
+    # 不支援的方法只試一次，同一組裝置之後直接跳過
+    before = dict(calls)
+    method, _, target = _cross_device_move(backend, tmp_path, "second.bin")
+    assert method == expected
+    assert target.read_bytes() == DATA
+    for name in failing:
+        assert calls[name] == before[name]
+
+
+def test_real_error_removes_partial_target(tmp_path, monkeypatch):
+    monkeypatch.setattr(fcntl, "ioctl", _unsupported(errno.EOPNOTSUPP))
+    real = os.copy_file_range
+    state = {"calls": 0}
+
+    def copy_then_fail(src_fd, dst_fd, count, *args):
+        state["calls"] += 1
+        if state["calls"] > 1:
+            raise OSError(errno.EIO, "I/O error")
+        return real(src_fd, dst_fd, 1000)
+
+    monkeypatch.setattr(os, "copy_file_range", copy_then_fail)
+    monkeypatch.setattr(os, "sendfile", _unsupported(errno.EINVAL))
+
+    with pytest.raises(OSError) as excinfo:
+        _cross_device_move(MoveBackend(), tmp_path)
+
+    # 已經複製了一部分，不能再退回下一種方法
+    assert excinfo.value.errno == errno.EIO
+    assert (tmp_path / "src" / "data.bin").read_bytes() == DATA
+    assert not (tmp_path / "dst" / "data.bin").exists()
+
+
+def test_unexpected_error_is_not_treated_as_unsupported(tmp_path, monkeypatch):
+    monkeypatch.setattr(fcntl, "ioctl", _unsupported(errno.ENOSPC))
+    copy_calls = []
+    monkeypatch.setattr(os, "copy_file_range", lambda *args: copy_calls.append(args))
+
+    with pytest.raises(OSError) as excinfo:
+        _cross_device_move(MoveBackend(), tmp_path)
+
+    assert excinfo.value.errno == errno.ENOSPC
+    assert copy_calls == []
+    assert (tmp_path / "src" / "data.bin").exists()
+    assert not (tmp_path / "dst" / "data.bin").exists()
+
+
+def test_same_device_uses_rename(tmp_path, monkeypatch):
+    monkeypatch.setattr(backends, "_copy_methods", lambda: pytest.fail("不應該複製"))
+    source = tmp_path / "a.bin"
+    source.write_bytes(DATA)
+    (tmp_path / "out").mkdir()
+    backend = MoveBackend()
+
+    method = backend.move(str(source), str(tmp_path / "out" / "a.bin"), len(DATA))
+
+    assert method == "rename"
+    assert (tmp_path / "out" / "a.bin").read_bytes() == DATA
+    assert backend.stats["rename"].calls == 1
@@ -0,0 +1,101 @@
+"""搬移時逐步清理搬空的來源資料夾（--clean）"""
+
+import io
+import os
+
+from rich.console import Console
+
+from day_11_file_organizer.cleanup import EmptyDirCleaner
+from day_11_file_organizer.main import classify_files_by_year_and_type, clean_empty_folders
+from day_11_file_organizer.scanner import scan_files
+
+
+def _make_files(folder, names):
+    for name in names:
+        path = folder / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(name)
+
+
+def _dirs(root):
+    return sorted(
+        os.path.relpath(os.path.join(folder, d), root)
+        for folder, dirs, _ in os.walk(root)
+        for d in dirs
+    )
+
+
+def test_removes_emptied_folders_bottom_up(tmp_path):
+    source = tmp_path / "source"
+    _make_files(source, ["a/b/c/1.txt", "a/b/2.txt", "a/3.txt", "d/4.txt"])
+    (source / "e" / "f").mkdir(parents=True)
+    removed = []
+    cleaner = EmptyDirCleaner(str(source), on_remove=removed.append)
+
+    for entry in cleaner.track(scan_files(str(source), cleaner)):
+        os.unlink(entry.path)
+        cleaner.moved(entry.path)
+
+    assert _dirs(source) == []
+    assert source.is_dir()
+    assert cleaner.removed_count == 6
+    # 子資料夾一定比父資料夾先刪除
+    assert removed.index(str(source / "a" / "b" / "c")) < removed.index(str(source / "a" / "b"))
+    assert removed.index(str(source / "a" / "b")) < removed.index(str(source / "a"))
+
+
+def test_keeps_folders_with_remaining_files(tmp_path):
+    source = tmp_path / "source"
+    _make_files(source, ["a/b/keep.txt", "a/b/move.txt", "a/c/move.txt", ".hidden/x", "h/.dotfile"])
+    cleaner = EmptyDirCleaner(str(source))
+
+    for entry in cleaner.track(scan_files(str(source), cleaner)):
+        if entry.name == "keep.txt":
+            cleaner.kept(entry.path)
+        else:
+            os.unlink(entry.path)
+            cleaner.moved(entry.path)
+
+    # 留下檔案的資料夾與其上層、含隱藏檔（掃描不到）的資料夾都保留
+    assert _dirs(source) == [".hidden", "a", "a/b", "h"]
+    assert cleaner.removed_count == 1
+
+
+def test_forwards_to_inner_state(tmp_path):
+    source = tmp_path / "source"
+    _make_files(source, ["a/1.txt"])
+    visited = []
+
+    class State:
+        def unchanged_subdirs(self, folder, mtime_ns):
+            return None
+
+        def visit_dir(self, folder, mtime_ns, subdirs):
+            visited.append(folder)
+
+        def is_unchanged_file(self, path, size, mtime, inode):
+            return False
+
+    cleaner = EmptyDirCleaner(str(source), State())
+    entries = list(cleaner.track(scan_files(str(source), cleaner)))
+
+    assert [e.name for e in entries] == ["1.txt"]
+    assert visited == [str(source), str(source / "a")]
+
+
+def test_organize_clean_matches_post_pass(tmp_path):
+    names = ["x/1.txt", "x/y/2.jpg", "x/y/z/3.pdf", "w/4.txt", "keep/.dotfile"]
+    inline, post = tmp_path / "inline", tmp_path / "post"
+    _make_files(inline / "source", names)
+    _make_files(post / "source", names)
+    (inline / "source" / "empty").mkdir()
+    (post / "source" / "empty").mkdir()
+
+    result = classify_files_by_year_and_type(
+        str(inline / "source"), str(inline / "target"), clean=True
+    )
+    classify_files_by_year_and_type(str(post / "source"), str(post / "target"))
+    cleaned = clean_empty_folders(str(post / "source"), Console(file=io.StringIO()))
+
+    assert _dirs(inline / "source") == _dirs(post / "source") == ["keep"]
+    assert result.cleaned_count == cleaned == 5
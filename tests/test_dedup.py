@@ -0,0 +1,58 @@
+"""重複檔案偵測：分階段雜湊找出內容相同的檔案"""
+
+import os
+
+from day_11_file_organizer.dedup import PARTIAL_CHUNK, find_duplicates
+from day_11_file_organizer.main import classify_files_by_year_and_type
+from day_11_file_organizer.scanner import scan_files
+
+
+def _write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+
+def test_groups_identical_small_files(tmp_path):
+    _write(tmp_path / "a.txt", b"same")
+    _write(tmp_path / "sub" / "b.txt", b"same")
+    _write(tmp_path / "c.txt", b"diff")
+    _write(tmp_path / "empty1", b"")
+    _write(tmp_path / "empty2", b"")
+
+    groups = find_duplicates(scan_files(str(tmp_path)))
+
+    assert [sorted(os.path.basename(p) for p in g.paths) for g in groups] == [["a.txt", "b.txt"]]
+
+
+def test_large_files_differing_only_in_the_middle(tmp_path):
+    size = 3 * PARTIAL_CHUNK
+    base = bytearray(size)
+    changed = bytearray(size)
+    changed[size // 2] = 1
+    # 足以啟動程序池的完整雜湊數
+    for i in range(6):
+        _write(tmp_path / f"same{i}.bin", bytes(base))
+        _write(tmp_path / f"other{i}.bin", bytes(changed))
+
+    groups = find_duplicates(scan_files(str(tmp_path)), processes=2)
+
+    assert sorted(sorted(os.path.basename(p)[:4] for p in g.paths) for g in groups) == [
+        ["othe"] * 6,
+        ["same"] * 6,
+    ]
+    assert all(g.wasted_bytes == 5 * size for g in groups)
+
+
+def test_skip_leaves_duplicates_in_source(tmp_path):
+    source = tmp_path / "source"
+    _write(source / "a.txt", b"same")
+    _write(source / "b.txt", b"same")
+    _write(source / "c.txt", b"unique")
+
+    result = classify_files_by_year_and_type(
+        str(source), str(tmp_path / "target"), dedup="skip"
+    )
+
+    assert result.duplicate_count == 1
+    assert result.success_count == 2
+    assert len(os.listdir(source)) == 1
@@ -0,0 +1,113 @@
+"""DirectoryCache：只在第一次用到時建立目標資料夾"""
+
+import os
+
+import pytest
+
+from day_11_file_organizer.dircache import DirectoryCache
+from day_11_file_organizer.main import classify_files_by_year_and_type
+
+
+def _count_calls(monkeypatch, name):
+    calls = []
+    real = getattr(os, name)
+
+    def counting(path, *args, **kwargs):
+        calls.append(path)
+        return real(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, name, counting)
+    return calls
+
+
+def test_hit_makes_no_syscalls(tmp_path, monkeypatch):
+    cache = DirectoryCache(str(tmp_path))
+    folder = str(tmp_path / "2024")
+    cache.ensure(folder)
+
+    mkdirs = _count_calls(monkeypatch, "mkdir")
+    makedirs = _count_calls(monkeypatch, "makedirs")
+    for _ in range(5):
+        cache.ensure(folder)
+
+    assert os.path.isdir(folder)
+    assert mkdirs == [] and makedirs == []
+    assert cache.mkdir_count == 1
+
+
+def test_known_parent_uses_single_mkdir(tmp_path, monkeypatch):
+    cache = DirectoryCache(str(tmp_path))
+    makedirs = _count_calls(monkeypatch, "makedirs")
+
+    cache.ensure(str(tmp_path / "2024"))
+    cache.ensure(str(tmp_path / "2024" / "pdf"))
+    # 上一層不在快取中時才逐層建立
+    cache.ensure(str(tmp_path / "2023" / "jpg"))
+
+    # os.makedirs 會遞迴呼叫自己建立上一層
+    assert makedirs[0] == str(tmp_path / "2023" / "jpg")
+    assert not any("2024" in path for path in makedirs)
+    assert (tmp_path / "2024" / "pdf").is_dir()
+    assert (tmp_path / "2023" / "jpg").is_dir()
+
+
+def test_existing_folder_and_file_in_the_way(tmp_path):
+    (tmp_path / "2024").mkdir()
+    (tmp_path / "2023").write_text("not a folder")
+    cache = DirectoryCache(str(tmp_path))
+
+    cache.ensure(str(tmp_path / "2024"))
+
+    with pytest.raises(FileExistsError):
+        cache.ensure(str(tmp_path / "2023"))
+
+
+def test_invalidate_recreates_deleted_folder(tmp_path):
+    cache = DirectoryCache(str(tmp_path))
+    folder = tmp_path / "2024" / "pdf"
+    cache.ensure(str(folder))
+    folder.rmdir()
+    (tmp_path / "2024").rmdir()
+
+    cache.ensure(str(folder))
+    assert not folder.exists()
+
+    cache.invalidate(str(folder))
+    cache.ensure(str(folder))
+    assert folder.is_dir()
+
+
+def test_precreate_skips_failures(tmp_path):
+    (tmp_path / "blocked").write_text("file")
+    cache = DirectoryCache(str(tmp_path))
+
+    folder = str(tmp_path / "2024" / "pdf")
+    cache.precreate([folder, str(tmp_path / "blocked" / "x"), folder])
+
+    assert (tmp_path / "2024" / "pdf").is_dir()
+    assert cache.mkdir_count == 1
+
+
+def test_precreate_dirs_matches_default_layout(tmp_path):
+    layouts = []
+    for precreate in (False, True):
+        source = tmp_path / f"source-{precreate}"
+        target = tmp_path / f"target-{precreate}"
+        for name in ["a.pdf", "b.jpg", "sub/c.pdf", "sub/d.txt"]:
+            path = source / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(name)
+            os.utime(path, (1_700_000_000, 1_700_000_000))
+
+        classify_files_by_year_and_type(str(source), str(target), precreate_dirs=precreate)
+        layouts.append(
+            sorted(
+                os.path.relpath(os.path.join(folder, name), target)
+                for folder, _, files in os.walk(target)
+                for name in files
+                if not name.startswith(".")
+            )
+        )
+
+    assert layouts[0] == layouts[1]
+    assert len(layouts[0]) == 4
@@ -0,0 +1,110 @@
+"""逐檔記錄輸出：JSONL / CSV / 欄式格式與 stats_to_record 一致"""
+
+import csv
+import json
+import os
+from datetime import datetime
+
+from day_11_file_organizer.exporters import (
+    RECORD_FIELDS,
+    ColumnarReader,
+    ColumnarRecordWriter,
+    open_record_writer,
+    open_record_writers,
+    stats_to_record,
+)
+from day_11_file_organizer.models import FileStats
+
+STATS = [
+    FileStats("/src/a.txt", "a.txt", 10, datetime(2020, 1, 2, 3, 4, 5), 2020, "txt", True),
+    FileStats(
+        '/src/逗號,"引號"\n換行.pdf',
+        '逗號,"引號"\n換行.pdf',
+        0,
+        datetime(2021, 6, 7, 8, 9, 10),
+        2021,
+        "pdf",
+        False,
+        "權限不足",
+    ),
+]
+
+
+def _write(path, stats, **kwargs):
+    writer = open_record_writer(str(path), **kwargs)
+    for s in stats:
+        writer.write(s)
+    writer.close()
+
+
+def test_jsonl_matches_stats_to_record(tmp_path):
+    path = tmp_path / "run.jsonl"
+    _write(path, STATS)
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == [stats_to_record(s) for s in STATS]
+
+
+def test_csv_matches_stats_to_record(tmp_path):
+    path = tmp_path / "run.csv"
+    _write(path, STATS)
+
+    with open(path, encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == RECORD_FIELDS
+    assert rows[1:] == [[str(v) for v in stats_to_record(s).values()] for s in STATS]
+
+
+def test_exports_overwrite_and_stream_log_appends(tmp_path):
+    export, log = tmp_path / "run.csv", tmp_path / "stream.csv"
+    for _ in range(2):
+        writer = open_record_writers([str(export)], [str(log)])
+        for s in STATS:
+            writer.write(s)
+        writer.close()
+
+    with open(export, encoding="utf-8", newline="") as f:
+        assert len(list(csv.reader(f))) == 1 + len(STATS)
+    with open(log, encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    # 附加時不重複寫標題列
+    assert len(rows) == 1 + 2 * len(STATS)
+    assert rows.count(RECORD_FIELDS) == 1
+
+
+def test_non_utf8_names_are_written_unchanged(tmp_path):
+    # 不是合法 UTF-8 的檔名（os.fsdecode 以 surrogateescape 解碼）
+    name = os.fsdecode(b"caf\xe9.txt")
+    stats = [FileStats(f"/src/{name}", name, 1, datetime(2020, 1, 2), 2020, "txt", True)]
+
+    for ext in ["jsonl", "csv"]:
+        path = tmp_path / f"run.{ext}"
+        _write(path, stats)
+        assert b"caf\xe9.txt" in path.read_bytes()
+
+    with open(tmp_path / "run.jsonl", encoding="utf-8", errors="surrogateescape") as f:
+        assert json.loads(f.readline())["filename"] == name
+    with open(tmp_path / "run.csv", encoding="utf-8", errors="surrogateescape", newline="") as f:
+        assert list(csv.reader(f))[1][1] == name
+
+
+def test_columnar_round_trip_across_row_groups(tmp_path):
+    path = tmp_path / "run.fcol"
+    stats = STATS * 5
+    writer = ColumnarRecordWriter(str(path), row_group_size=3)
+    for s in stats:
+        writer.write(s)
+    writer.close()
+
+    reader = ColumnarReader(str(path))
+    assert reader.num_rows == len(stats)
+    assert reader.columns == RECORD_FIELDS
+    records = list(reader.records())
+    for record, s in zip(records, stats):
+        expected = stats_to_record(s)
+        expected["modified_time"] = int(s.modified_time.timestamp())
+        assert record == expected
+
+
+def test_no_writer_without_paths():
+    assert open_record_writers([]) is None
@@ -0,0 +1,133 @@
+"""ScanFilter：排除的子樹不列出，掃描結果與逐檔檢查相同"""
+
+import os
+
+import pytest
+
+from day_11_file_organizer import scanner
+from day_11_file_organizer.filters import ScanFilter
+from day_11_file_organizer.scanner import list_dir, scan_files
+
+NOW = 1_700_000_000.0
+DAY = 86400
+
+
+@pytest.fixture
+def source(tmp_path):
+    root = tmp_path / "source"
+    files = {
+        "a.txt": (10, 1),
+        "big.iso": (5000, 1),
+        "old.txt": (10, 400),
+        "cache.tmp": (10, 1),
+        "build/out.o": (10, 1),
+        "build/keep.c": (10, 1),
+        "src/main.c": (10, 1),
+        "src/build/gen.o": (10, 1),
+        "src/deep/er/x.txt": (10, 1),
+        "node_modules/pkg/index.js": (10, 1),
+        "logs/2024/app.log": (10, 30),
+        "tmp/tmp.txt": (10, 1),
+    }
+    for rel, (size, age_days) in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x" * size)
+        mtime = NOW - age_days * DAY
+        os.utime(path, (mtime, mtime))
+    return root
+
+
+FILTERS = [
+    ScanFilter(exclude=["node_modules", "*.tmp"], now=NOW),
+    ScanFilter(exclude=["build/*.o"], now=NOW),
+    ScanFilter(exclude=["tmp/"], now=NOW),
+    ScanFilter(include=["*.c", "*.txt"], now=NOW),
+    ScanFilter(max_depth=0, now=NOW),
+    ScanFilter(max_depth=2, now=NOW),
+    ScanFilter(min_size=100, now=NOW),
+    ScanFilter(older_than=7 * DAY, now=NOW),
+    ScanFilter(newer_than=60 * DAY, exclude=["src/deep"], now=NOW),
+]
+
+
+def _rel(root, path):
+    return os.path.relpath(path, root).replace(os.sep, "/")
+
+
+@pytest.mark.parametrize("scan_filter", FILTERS)
+def test_scan_matches_per_file_accepts(source, scan_filter):
+    root = str(source)
+    expected = [e.path for e in scan_files(root) if scan_filter.accepts(e, _rel(root, e.path))]
+
+    assert [e.path for e in scan_files(root, scan_filter=scan_filter)] == expected
+
+
+def test_expected_files(source):
+    def scanned(**kwargs):
+        return sorted(
+            _rel(source, e.path)
+            for e in scan_files(str(source), scan_filter=ScanFilter(now=NOW, **kwargs))
+        )
+
+    assert scanned(exclude=["build/*.o"]) == sorted(set(scanned()) - {"build/out.o"})
+    assert scanned(exclude=["tmp/"]) == sorted(set(scanned()) - {"tmp/tmp.txt"})
+    assert scanned(max_depth=0) == ["a.txt", "big.iso", "cache.tmp", "old.txt"]
+    assert scanned(min_size=100) == ["big.iso"]
+    assert scanned(older_than=100 * DAY) == ["old.txt"]
+
+
+def test_pruned_folders_are_never_listed(source, monkeypatch):
+    listed = []
+    real_scandir = os.scandir
+
+    def recording_scandir(path):
+        listed.append(_rel(source, path))
+        return real_scandir(path)
+
+    monkeypatch.setattr(scanner.os, "scandir", recording_scandir)
+    scan_filter = ScanFilter(exclude=["node_modules", "src/deep"], max_depth=1, now=NOW)
+    list(scan_files(str(source), scan_filter=scan_filter))
+
+    assert "node_modules" not in listed
+    assert "src/deep" not in listed
+    assert "logs/2024" not in listed
+    assert "src" in listed
+
+
+def test_folders_with_filtered_files_are_not_checkpointed(source):
+    visited = []
+
+    class State:
+        def unchanged_subdirs(self, folder, mtime_ns):
+            return None
+
+        def visit_dir(self, folder, mtime_ns, subdirs):
+            visited.append((_rel(source, folder), sorted(_rel(source, d) for d in subdirs)))
+
+        def is_unchanged_file(self, path, size, mtime, inode):
+            return False
+
+    scan_filter = ScanFilter(exclude=["*.tmp", "src/build"], now=NOW)
+    list(scan_files(str(source), State(), scan_filter))
+    folders = dict(visited)
+
+    # 根目錄有 cache.tmp 被排除，下次一定要重新列出
+    assert "." not in folders
+    # 子資料夾清單包含沒有進入的資料夾
+    assert folders["src"] == ["src/build", "src/deep"]
+    assert "src/build" not in folders
+
+
+def test_list_dir_applies_name_filters_relative_to_root(source):
+    scan_filter = ScanFilter(exclude=["src/build"], include=["*.c"], now=NOW)
+
+    names, subdirs = list_dir(str(source / "src"), scan_filter, str(source))
+
+    assert names == ["main.c"]
+    assert sorted(os.path.basename(path) for path, _ in subdirs) == ["deep"]
+
+
+def test_negative_max_depth():
+    with pytest.raises(ValueError):
+        ScanFilter(max_depth=-1)
@@ -0,0 +1,72 @@
+"""啟動時間：匯入 day_11_file_organizer.main 時不載入用到時才匯入的模組"""
+
+import importlib
+import importlib.util
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _bench_import():
+    """benchmarks/bench_import.py（LAZY_MODULES 與預算的唯一來源）"""
+    path = os.path.join(ROOT, "benchmarks", "bench_import.py")
+    spec = importlib.util.spec_from_file_location("bench_import", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+bench_import = _bench_import()
+
+
+def _import_main():
+    """在新的程序中以 -X importtime 匯入，回傳（已載入的延遲模組, 匯入毫秒數）"""
+    script = (
+        "import sys\n"
+        "import day_11_file_organizer.main\n"
+        f"print(' '.join(m for m in {bench_import.LAZY_MODULES!r} if m in sys.modules))"
+    )
+    env = dict(os.environ)
+    src = os.path.join(ROOT, "src")
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (src, env.get("PYTHONPATH")) if p)
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+    # importtime 的最後一行是 day_11_file_organizer.main 本身（累計時間）
+    lines = [line for line in completed.stderr.splitlines() if line.startswith("import time:")]
+    assert lines[-1].endswith("day_11_file_organizer.main")
+    return completed.stdout.split(), int(lines[-1].split("|")[1]) / 1000
+
+
+def test_lazy_modules_not_imported():
+    eager, _ = _import_main()
+    assert eager == []
+
+
+def test_import_budget():
+    """預算與機器有關，只在設定 FILE_ORGANIZER_IMPORT_BUDGET_MS 時檢查（取多次中最快的一次）"""
+    budget = os.environ.get("FILE_ORGANIZER_IMPORT_BUDGET_MS")
+    if not budget:
+        pytest.skip("未設定 FILE_ORGANIZER_IMPORT_BUDGET_MS")
+    best = min(_import_main()[1] for _ in range(5))
+    assert best <= float(budget)
+
+
+def test_legacy_constants_are_served_lazily():
+    from day_11_file_organizer.classifier import EXTENSION_MAPPING
+
+    # 套件的 main 屬性是 CLI 入口函式，模組本身以 import_module 取得
+    main = importlib.import_module("day_11_file_organizer.main")
+
+    assert main.EXTENSION_MAPPING is EXTENSION_MAPPING
+    assert isinstance(main.TKINTER_AVAILABLE, bool)
+    with pytest.raises(AttributeError):
+        main.NO_SUCH_CONSTANT
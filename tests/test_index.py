@@ -0,0 +1,197 @@
+"""ScanIndex：沒有變動的資料夾與檔案在下次增量掃描時略過"""
+
+import os
+import sqlite3
+import sys
+import time
+
+import pytest
+
+from day_11_file_organizer import scanner
+from day_11_file_organizer.index import INDEX_FILENAME, ScanIndex
+from day_11_file_organizer.main import classify_files_by_year_and_type
+from day_11_file_organizer.scanner import scan_files
+
+
+def _make_files(folder, names):
+    for name in names:
+        path = folder / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(name)
+
+
+def _age_dirs(folder, seconds=100):
+    """把資料夾的修改時間調到比「不穩定」門檻更早"""
+    old = time.time() - seconds
+    for path, _, _ in os.walk(folder):
+        os.utime(path, (old, old))
+
+
+def _scan_leaving_files(target, source):
+    """掃描一次，所有檔案都當作留在來源（pending）"""
+    index = ScanIndex(str(target), str(source))
+    entries = list(scan_files(str(source), index))
+    for e in entries:
+        index.record_pending(e.path, e.size, e.mtime, e.ino)
+    index.finish()
+    index.close()
+    return entries
+
+
+def _count_scandir(monkeypatch):
+    listed = []
+    real = scanner.os.scandir
+
+    def counting(path):
+        listed.append(path)
+        return real(path)
+
+    monkeypatch.setattr(scanner.os, "scandir", counting)
+    return listed
+
+
+def test_unchanged_folders_are_not_listed(tmp_path, monkeypatch):
+    source, target = tmp_path / "source", tmp_path / "target"
+    _make_files(source, ["a.txt", "sub/b.txt", "sub/deep/c.txt"])
+    target.mkdir()
+    _age_dirs(source)
+    assert len(_scan_leaving_files(target, source)) == 3
+
+    listed = _count_scandir(monkeypatch)
+    index = ScanIndex(str(target), str(source))
+
+    assert list(scan_files(str(source), index)) == []
+    assert listed == []
+    index.finish()
+    index.close()
+
+
+def test_changed_folder_yields_only_new_files(tmp_path, monkeypatch):
+    source, target = tmp_path / "source", tmp_path / "target"
+    _make_files(source, ["a.txt", "sub/b.txt", "sub/deep/c.txt"])
+    target.mkdir()
+    _age_dirs(source)
+    _scan_leaving_files(target, source)
+
+    _make_files(source, ["sub/new.txt"])
+    listed = _count_scandir(monkeypatch)
+    index = ScanIndex(str(target), str(source))
+
+    assert [e.name for e in scan_files(str(source), index)] == ["new.txt"]
+    assert listed == [str(source / "sub")]
+    # sub 底下原本的 b.txt 沒有變動
+    assert index.skipped_count == 1
+    index.finish()
+    index.close()
+
+
+def test_recently_modified_folders_are_rescanned(tmp_path, monkeypatch):
+    source, target = tmp_path / "source", tmp_path / "target"
+    _make_files(source, ["a.txt", "sub/b.txt"])
+    target.mkdir()
+    # 資料夾剛修改過：時間精度不足時可能漏掉之後加入的檔案，不記錄
+    _scan_leaving_files(target, source)
+
+    listed = _count_scandir(monkeypatch)
+    index = ScanIndex(str(target), str(source))
+
+    assert list(scan_files(str(source), index)) == []
+    assert listed == [str(source), str(source / "sub")]
+    assert index.skipped_count == 2
+    index.finish()
+    index.close()
+
+
+def test_index_is_scoped_to_the_source_folder(tmp_path):
+    target = tmp_path / "target"
+    target.mkdir()
+    for name in ["one", "one-more"]:
+        _make_files(tmp_path / name, ["a.txt"])
+        _age_dirs(tmp_path / name)
+    _scan_leaving_files(target, tmp_path / "one")
+
+    # 名稱前綴相同的另一個來源資料夾不能沿用 one 的記錄
+    index = ScanIndex(str(target), str(tmp_path / "one-more"))
+    assert [e.name for e in scan_files(str(tmp_path / "one-more"), index)] == ["a.txt"]
+    index.close()
+
+
+def test_incremental_runs_accumulate_stats(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "target"
+    _make_files(source, ["a.pdf", "b.jpg", "sub/c.pdf"])
+    target.mkdir()
+
+    first = classify_files_by_year_and_type(str(source), str(target), incremental=True)
+    _make_files(source, ["d.pdf"])
+    second = classify_files_by_year_and_type(str(source), str(target), incremental=True)
+
+    assert first.success_count == 3
+    assert second.success_count == 1
+    assert os.path.exists(target / INDEX_FILENAME)
+    assert second.cumulative.run_count == 2
+    assert second.cumulative.total_count == 4
+    assert second.cumulative.type_distribution == {"pdf": 3, "jpg": 1}
+    assert sum(second.cumulative.year_distribution.values()) == 4
+
+
+def test_incremental_run_creates_the_target_folder(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "target"
+    _make_files(source, ["a.pdf"])
+
+    result = classify_files_by_year_and_type(str(source), str(target), incremental=True)
+
+    assert result.success_count == 1
+    assert os.path.exists(target / INDEX_FILENAME)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Windows 的檔名一定是合法的 Unicode")
+def test_non_utf8_names_round_trip(tmp_path, monkeypatch):
+    source, target = tmp_path / "source", tmp_path / "target"
+    for raw in [b"caf\xe9.txt", b"sub\xff/b.txt"]:
+        path = os.path.join(os.fsencode(source), raw)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(raw)
+    target.mkdir()
+    _age_dirs(source)
+    assert len(_scan_leaving_files(target, source)) == 2
+
+    # 子資料夾清單與待處理檔案都原樣讀回：沒有變動的資料夾不必列出
+    listed = _count_scandir(monkeypatch)
+    index = ScanIndex(str(target), str(source))
+    assert list(scan_files(str(source), index)) == []
+    assert listed == []
+    index.finish()
+    index.close()
+
+    # 資料夾有變動時，名稱無法解碼的舊檔案仍以記錄比對後略過
+    _make_files(source, ["new.txt"])
+    index = ScanIndex(str(target), str(source))
+    assert [e.name for e in scan_files(str(source), index)] == ["new.txt"]
+    assert index.skipped_count == 1
+    index.close()
+
+
+def test_text_index_from_an_older_version_is_converted(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "target"
+    _make_files(source, ["a.txt", "sub/b.txt"])
+    target.mkdir()
+    _age_dirs(source)
+    _scan_leaving_files(target, source)
+
+    # 舊版索引以 TEXT 儲存路徑，沒有設定 user_version
+    conn = sqlite3.connect(str(target / INDEX_FILENAME))
+    with conn:
+        conn.execute("UPDATE pending SET path = CAST(path AS TEXT)")
+        conn.execute("UPDATE dirs SET path = CAST(path AS TEXT)")
+        conn.execute("PRAGMA user_version = 0")
+    conn.close()
+
+    index = ScanIndex(str(target), str(source))
+    assert list(scan_files(str(source), index)) == []
+    index.finish()
+    index.close()
+    conn = sqlite3.connect(str(target / INDEX_FILENAME))
+    assert conn.execute("SELECT COUNT(*) FROM pending").fetchone()[0] == 2
+    assert conn.execute("SELECT DISTINCT typeof(path) FROM dirs").fetchall() == [("blob",)]
+    conn.close()
@@ -0,0 +1,222 @@
+"""搬移日誌：接續中斷的整理、依序還原每一次整理"""
+
+import os
+import shutil
+import sys
+
+import pytest
+
+from day_11_file_organizer.journal import (
+    MoveJournal,
+    compact_journal,
+    journal_path,
+    read_journal,
+)
+from day_11_file_organizer.main import classify_files_by_year_and_type, run, undo_organize
+from day_11_file_organizer.planner import build_plan
+
+
+def _make_files(folder, names):
+    for name in names:
+        path = folder / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(name)
+
+
+def _files(root):
+    """資料夾中的檔案（相對路徑 -> 內容），不含日誌與錯誤記錄"""
+    found = {}
+    for folder, _, files in os.walk(root):
+        for f in files:
+            if f not in (".file-organizer-journal.jsonl", "error.txt"):
+                path = os.path.join(folder, f)
+                with open(path) as fh:
+                    found[os.path.relpath(path, root)] = fh.read()
+    return found
+
+
+def test_library_default_writes_no_journal(tmp_path):
+    _make_files(tmp_path / "source", ["a.txt"])
+
+    classify_files_by_year_and_type(str(tmp_path / "source"), str(tmp_path / "target"))
+
+    assert not os.path.exists(journal_path(str(tmp_path / "target")))
+
+
+def test_finished_run_can_be_undone(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "target"
+    _make_files(source, ["a.txt", "b.jpg", "sub/a.txt", "sub/deep/c.pdf"])
+    before = _files(source)
+
+    classify_files_by_year_and_type(str(source), str(target), journal=True)
+    state = read_journal(str(target))
+    assert state.finished and len(state.done) == 4 and not state.in_flight
+
+    restored, errors = undo_organize(str(target))
+
+    assert (restored, errors) == (4, [])
+    assert _files(source) == before
+    assert _files(target) == {}
+    with pytest.raises(FileNotFoundError):
+        undo_organize(str(target))
+
+
+def test_each_undo_restores_an_earlier_run(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "target"
+    _make_files(source, ["first.txt"])
+    classify_files_by_year_and_type(str(source), str(target), journal=True)
+    _make_files(source, ["second.txt"])
+    classify_files_by_year_and_type(str(source), str(target), journal=True)
+
+    assert undo_organize(str(target)) == (1, [])
+    assert set(_files(source)) == {"second.txt"}
+
+    assert undo_organize(str(target)) == (1, [])
+    assert set(_files(source)) == {"first.txt", "second.txt"}
+
+    with pytest.raises(FileNotFoundError):
+        undo_organize(str(target))
+
+
+def _run_lines(target):
+    with open(journal_path(str(target)), encoding="utf-8", errors="surrogateescape") as f:
+        return [line for line in f if '"op": "run"' in line]
+
+
+def test_undone_runs_are_dropped_when_a_new_run_starts(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "target"
+    _make_files(source, ["first.txt"])
+    classify_files_by_year_and_type(str(source), str(target), journal=True)
+    undo_organize(str(target))
+    assert len(_run_lines(target)) == 1
+
+    _make_files(source, ["second.txt"])
+    classify_files_by_year_and_type(str(source), str(target), journal=True)
+
+    # 已完全還原的第一次整理在新的整理開始時移除
+    assert len(_run_lines(target)) == 1
+    assert undo_organize(str(target)) == (2, [])
+    with pytest.raises(FileNotFoundError):
+        undo_organize(str(target))
+
+
+def test_compact_keeps_the_latest_runs(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "target"
+    for name in ["first.txt", "second.txt", "third.txt"]:
+        _make_files(source, [name])
+        classify_files_by_year_and_type(str(source), str(target), journal=True)
+
+    assert compact_journal(str(target), keep=2)
+    assert not compact_journal(str(target), keep=2)
+    assert len(_run_lines(target)) == 2
+    assert not os.path.exists(journal_path(str(target)) + ".tmp")
+
+    assert undo_organize(str(target)) == (1, [])
+    assert undo_organize(str(target)) == (1, [])
+    assert set(_files(source)) == {"second.txt", "third.txt"}
+    # 最早的整理已經移除，不能再還原
+    with pytest.raises(FileNotFoundError):
+        undo_organize(str(target))
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Windows 的檔名一定是合法的 Unicode")
+def test_non_utf8_file_names_round_trip(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "target"
+    source.mkdir()
+    name = os.fsdecode(b"caf\xe9.txt")
+    with open(os.path.join(source, name), "w") as f:
+        f.write("cafe")
+
+    classify_files_by_year_and_type(str(source), str(target), journal=True)
+    state = read_journal(str(target))
+    assert state.finished
+    assert state.done == {os.path.join(str(source), name)}
+
+    # 壓縮重寫日誌時也要原樣保留檔名
+    _make_files(source, ["a.txt"])
+    classify_files_by_year_and_type(str(source), str(target), journal=True)
+    undo_organize(str(target))
+    assert compact_journal(str(target))
+
+    assert undo_organize(str(target)) == (1, [])
+    assert sorted(os.listdir(source)) == ["a.txt", name]
+
+
+def _crash_midway(source, target):
+    """
+    模擬整理到一半當機：全部寫入計畫，1、2 搬完且有完成記錄，3 搬完但完成記錄
+    沒寫進去，4 跨裝置複製到一半（來源與目標都在），其餘還沒開始；最後一行只寫了一半
+    """
+    plan = build_plan(str(source), str(target))
+    moves = sorted(plan.moves, key=lambda m: m.source)
+    journal = MoveJournal(str(target), str(source))
+    for move in moves:
+        journal.plan(move)
+    for i, move in enumerate(moves[:4]):
+        os.makedirs(move.target_dir, exist_ok=True)
+        if i < 3:
+            os.rename(move.source, move.target)
+        else:
+            shutil.copyfile(move.source, move.target)
+        if i < 2:
+            journal.done(move)
+    journal.close()
+    with open(journal_path(str(target)), "a") as f:
+        f.write('{"op": "do')
+    return moves
+
+
+def test_resume_finishes_an_interrupted_run(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "target"
+    names = [f"{i}.txt" for i in range(1, 7)]
+    _make_files(source, names)
+    moves = _crash_midway(source, target)
+
+    state = read_journal(str(target))
+    assert not state.finished
+    assert sorted(state.in_flight) == sorted(m.source for m in moves[2:])
+
+    result = classify_files_by_year_and_type(str(source), str(target), journal=True, resume=True)
+
+    assert result.resumed_count == 1
+    # 每個檔案只出現一次，沒有因為半成品而多出帶序號的檔名
+    assert sorted(_files(target).values()) == names
+    assert sorted(os.path.basename(p) for p in _files(target)) == names
+    assert _files(source) == {}
+    assert read_journal(str(target)).finished
+
+    # 接續延續同一段記錄，一次 --undo 就還原整個整理
+    assert undo_organize(str(target)) == (6, [])
+    assert sorted(_files(source)) == names
+
+
+def test_new_run_after_partial_line(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "target"
+    _make_files(source, ["a.txt"])
+    os.makedirs(target)
+    with open(journal_path(str(target)), "w") as f:
+        f.write('{"op": "run", "sou')
+
+    classify_files_by_year_and_type(str(source), str(target), journal=True)
+
+    state = read_journal(str(target))
+    assert state.finished and len(state.done) == 1
+
+
+def test_cli_refuses_to_start_over_an_unfinished_run(tmp_path, monkeypatch, capsys):
+    source, target = tmp_path / "source", tmp_path / "target"
+    _make_files(source, [f"{i}.txt" for i in range(1, 7)])
+    _crash_midway(source, target)
+
+    monkeypatch.setattr(sys, "argv", ["file-organizer", "-s", str(source), "-t", str(target)])
+    run()
+    assert "--resume" in capsys.readouterr().out
+    assert len(_files(source)) == 3
+
+    monkeypatch.setattr(
+        sys, "argv", ["file-organizer", "-s", str(source), "-t", str(target), "--resume", "-q"]
+    )
+    run()
+    capsys.readouterr()
+    assert _files(source) == {}
+    assert len(_files(target)) == 6
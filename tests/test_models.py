@@ -0,0 +1,182 @@
+"""ClassifyResult 的逐筆累計統計、前 K 大檔案與欄式 FileStore"""
+
+import os
+import threading
+from datetime import datetime
+
+import pytest
+
+from day_11_file_organizer.models import ClassifyResult, FileStats, FileStore
+
+
+def _stats(i, size, year=2024, file_type="pdf", success=True):
+    return FileStats(
+        original_path=f"/src/dir{i % 3}/file{i}.{file_type}",
+        filename=f"file{i}.{file_type}",
+        size_bytes=size,
+        modified_time=datetime(year, 1 + i % 12, 1, 12, 0),
+        year=year,
+        file_type=file_type,
+        success=success,
+        error_message="" if success else f"error {i}",
+    )
+
+
+def _sample():
+    types = ["pdf", "jpg", "txt", "mp4"]
+    return [
+        _stats(i, (i * 7919) % 1000, year=2018 + i % 5, file_type=types[i % 4], success=i % 11 != 0)
+        for i in range(200)
+    ]
+
+
+def _expected(files):
+    ok = [f for f in files if f.success]
+    years, types = {}, {}
+    for f in ok:
+        years[f.year] = years.get(f.year, 0) + 1
+        types[f.file_type] = types.get(f.file_type, 0) + 1
+    return {
+        "total": len(files),
+        "success": len(ok),
+        "failed": len(files) - len(ok),
+        "size": sum(f.size_bytes for f in ok),
+        "years": dict(sorted(years.items())),
+        "types": types,
+        # 同大小時先加入的排前面
+        "top": sorted(ok, key=lambda f: -f.size_bytes)[:5],
+    }
+
+
+def _actual(result):
+    return {
+        "total": result.total_count,
+        "success": result.success_count,
+        "failed": result.failed_count,
+        "size": result.total_size_bytes,
+        "years": result.year_distribution,
+        "types": result.type_distribution,
+        "top": result.top_large_files,
+    }
+
+
+def test_incremental_stats_match_a_full_recount():
+    files = _sample()
+    result = ClassifyResult()
+    for stats in files:
+        result.add(stats)
+
+    assert _actual(result) == _expected(files)
+    assert result.failed_files == [f for f in files if not f.success]
+    assert list(result.type_distribution.values()) == sorted(
+        result.type_distribution.values(), reverse=True
+    )
+
+
+def test_top_files_keep_arrival_order_on_ties():
+    result = ClassifyResult()
+    for i in range(8):
+        result.add(_stats(i, 100))
+    result.add(_stats(8, 50))
+
+    assert [f.filename for f in result.top_large_files] == [
+        f"file{i}.pdf" for i in range(5)
+    ]
+
+
+def test_streaming_mode_keeps_stats_without_files():
+    files = _sample()
+    result = ClassifyResult(keep_files=False)
+    for stats in files:
+        result.add(stats)
+
+    assert len(result.files) == 0
+    assert _actual(result) == _expected(files)
+
+
+def test_initial_files_and_direct_appends_are_counted():
+    files = _sample()
+    result = ClassifyResult(files=files[:50])
+    assert result.total_count == 50
+
+    # 舊用法：直接對 files 做 append，統計在下次讀取時重建
+    result.files.extend(files[50:])
+    assert _actual(result) == _expected(files)
+
+
+def test_concurrent_adds():
+    files = _sample()
+    result = ClassifyResult(keep_files=False)
+
+    def add_all(chunk):
+        for stats in chunk:
+            result.add(stats)
+
+    threads = [threading.Thread(target=add_all, args=(files[i::4],)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    expected = _expected(files)
+    actual = _actual(result)
+    # 多執行緒時同大小檔案的先後不固定，只比較大小
+    assert [f.size_bytes for f in actual.pop("top")] == [f.size_bytes for f in expected.pop("top")]
+    assert actual == expected
+
+
+def test_file_stats_has_no_instance_dict():
+    stats = _stats(1, 10)
+    assert not hasattr(stats, "__dict__")
+    with pytest.raises(AttributeError):
+        stats.extra = 1
+
+
+def test_file_store_round_trips_records():
+    files = _sample()
+    # 檔名與路徑不同、非 UTF-8 的檔名都要原樣讀回
+    files.append(
+        FileStats(
+            original_path="/src/raw/" + os.fsdecode(b"caf\xe9.txt"),
+            filename="renamed.txt",
+            size_bytes=3,
+            modified_time=datetime(2020, 5, 6, 7, 8, 9),
+            year=2020,
+            file_type="txt",
+            success=True,
+        )
+    )
+    store = FileStore(files)
+
+    assert len(store) == len(files)
+    assert store == files
+    assert list(store) == files
+    assert store[-1] == files[-1]
+    assert store[10:20:3] == files[10:20:3]
+    with pytest.raises(IndexError):
+        store[len(files)]
+
+
+def test_file_store_extend_with_another_store():
+    files = _sample()
+    store = FileStore(files[:120])
+    other = FileStore(files[120:])
+    # other 的字串表編號與 store 不同
+    other.append(_stats(999, 1, file_type="iso"))
+
+    store.extend(other)
+
+    assert store == files + [_stats(999, 1, file_type="iso")]
+
+
+def test_compact_result_matches_list_result():
+    files = _sample()
+    plain = ClassifyResult()
+    compact = ClassifyResult(compact=True)
+    for stats in files:
+        plain.add(stats)
+        compact.add(stats)
+
+    assert isinstance(compact.files, FileStore)
+    assert _actual(compact) == _actual(plain)
+    assert compact.files == plain.files
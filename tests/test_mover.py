@@ -0,0 +1,87 @@
+"""MoveEngine：所有工作都會執行，工作執行緒的例外在呼叫端拋出"""
+
+import os
+import threading
+
+import pytest
+
+from day_11_file_organizer.main import classify_files_by_year_and_type
+from day_11_file_organizer.mover import MoveEngine
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_runs_every_job(workers):
+    done = []
+    lock = threading.Lock()
+
+    def job(i):
+        with lock:
+            done.append(i)
+
+    with MoveEngine(workers, queue_size=2) as engine:
+        for i in range(200):
+            engine.submit(job, i)
+
+    assert sorted(done) == list(range(200))
+
+
+def test_worker_exception_raised_on_close():
+    def job(i):
+        if i == 3:
+            raise OSError("磁碟已滿")
+
+    with pytest.raises(OSError, match="磁碟已滿"):
+        with MoveEngine(4) as engine:
+            for i in range(4):
+                engine.submit(job, i)
+
+
+def test_worker_exception_raised_on_submit_and_stops_work():
+    failed = threading.Event()
+    ran_after = []
+
+    def job(i):
+        if i == 0:
+            failed.set()
+            raise RuntimeError("boom")
+        ran_after.append(i)
+
+    engine = MoveEngine(2, queue_size=1)
+    engine.submit(job, 0)
+    failed.wait(5)
+    with pytest.raises(RuntimeError, match="boom"):
+        # 例外記錄下來之後，下一次（或再下一次）submit 就會拋出
+        for i in range(1, 100):
+            engine.submit(job, i)
+    # 已回報的例外不會在 close 時再拋出一次
+    engine.close()
+    assert len(ran_after) < 99
+
+
+def test_threaded_organize_matches_sequential(tmp_path):
+    def organize(name, workers):
+        source = tmp_path / name / "source"
+        for i in range(60):
+            path = source / f"d{i % 5}" / f"f{i % 12}.{('txt', 'jpg', 'pdf')[i % 3]}"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(str(i))
+        target = tmp_path / name / "target"
+        result = classify_files_by_year_and_type(str(source), str(target), workers=workers)
+        moved = sorted(
+            os.path.relpath(os.path.join(folder, f), target)
+            for folder, _, files in os.walk(target)
+            for f in files
+            if f != "error.txt" and not f.startswith(".")
+        )
+        return result, moved, source
+
+    seq_result, seq_moved, seq_source = organize("seq", 1)
+    par_result, par_moved, par_source = organize("par", 8)
+
+    assert len(seq_moved) == 60
+    # 同名檔案的序號取決於完成順序，只比較每個資料夾的檔案數
+    assert sorted(os.path.dirname(p) for p in par_moved) == sorted(
+        os.path.dirname(p) for p in seq_moved
+    )
+    assert par_result.success_count == seq_result.success_count == 60
+    assert not any(files for _, _, files in os.walk(par_source))
@@ -0,0 +1,118 @@
+"""NameIndex：碰撞時的遞增序號與既有檔名"""
+
+import os
+import threading
+from pathlib import Path
+
+from day_11_file_organizer.main import organize_sharded
+from day_11_file_organizer.naming import NameIndex
+
+
+def test_suffixes_increment_per_name(tmp_path):
+    names = NameIndex()
+    folder = str(tmp_path)
+
+    reserved = [os.path.basename(names.reserve(folder, "report.pdf")) for _ in range(4)]
+    other = os.path.basename(names.reserve(folder, "notes.txt"))
+
+    assert reserved == ["report.pdf", "report_1.pdf", "report_2.pdf", "report_3.pdf"]
+    assert other == "notes.txt"
+
+
+def test_existing_files_are_not_overwritten(tmp_path):
+    (tmp_path / "a.txt").write_text("old")
+    (tmp_path / "a_1.txt").write_text("old")
+
+    target = NameIndex().reserve(str(tmp_path), "a.txt")
+
+    assert os.path.basename(target) == "a_2.txt"
+
+
+def test_suffixed_name_already_reserved(tmp_path):
+    names = NameIndex()
+    folder = str(tmp_path)
+
+    # 原始檔名本身就長得像帶序號的檔名
+    assert os.path.basename(names.reserve(folder, "a_1.txt")) == "a_1.txt"
+    assert os.path.basename(names.reserve(folder, "a.txt")) == "a.txt"
+    assert os.path.basename(names.reserve(folder, "a.txt")) == "a_2.txt"
+
+
+def test_folders_are_independent(tmp_path):
+    names = NameIndex()
+
+    first = names.reserve(str(tmp_path / "x"), "a.txt")
+    second = names.reserve(str(tmp_path / "y"), "a.txt")
+
+    assert os.path.basename(first) == os.path.basename(second) == "a.txt"
+    # 非 exclusive 模式不建立資料夾或檔案
+    assert not (tmp_path / "x").exists()
+
+
+def test_threads_never_share_a_name(tmp_path):
+    names = NameIndex()
+    results = []
+    lock = threading.Lock()
+
+    def reserve_many():
+        for _ in range(200):
+            target = names.reserve(str(tmp_path), "same.bin")
+            with lock:
+                results.append(target)
+
+    threads = [threading.Thread(target=reserve_many) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(results)) == len(results) == 1600
+
+
+def test_exclusive_creates_placeholders(tmp_path):
+    folder = str(tmp_path / "new")
+    names = NameIndex(exclusive=True)
+
+    first = names.reserve(folder, "a.txt")
+    second = names.reserve(folder, "a.txt")
+
+    assert os.path.basename(second) == "a_1.txt"
+    assert os.path.isfile(first) and os.path.isfile(second)
+    assert os.path.getsize(first) == 0
+
+
+def test_exclusive_skips_names_taken_by_other_processes(tmp_path):
+    folder = str(tmp_path)
+    mine = NameIndex(exclusive=True)
+    other = NameIndex(exclusive=True)
+
+    # mine 在 other 保留之前就已載入資料夾，記憶體中看不到 other 的佔位檔
+    assert os.path.basename(mine.reserve(folder, "seed.txt")) == "seed.txt"
+    assert os.path.basename(other.reserve(folder, "b.txt")) == "b.txt"
+    taken = other.reserve(folder, "c.txt")
+
+    # O_EXCL 失敗時改用下一個序號
+    assert os.path.basename(mine.reserve(folder, "b.txt")) == "b_1.txt"
+    assert os.path.basename(mine.reserve(folder, "c.txt")) == "c_1.txt"
+    assert os.path.basename(taken) == "c.txt"
+
+
+def test_sharded_organize_keeps_every_file(tmp_path):
+    source = tmp_path / "source"
+    for shard in range(6):
+        for i in range(5):
+            path = source / f"shard{shard}" / f"same{i}.txt"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(f"{shard}-{i}")
+    target = tmp_path / "target"
+
+    result = organize_sharded(str(source), str(target), processes=3)
+
+    contents = sorted(
+        Path(folder, f).read_text()
+        for folder, _, files in os.walk(target)
+        for f in files
+        if f != "error.txt"
+    )
+    assert result.success_count == 30
+    assert contents == sorted(f"{shard}-{i}" for shard in range(6) for i in range(5))
@@ -0,0 +1,165 @@
+"""搬移計畫：dry-run 不碰檔案系統，JSON / CSV 輸出與 --apply 執行"""
+
+import csv
+import json
+import os
+import sys
+
+import pytest
+
+from day_11_file_organizer.main import apply_plan, run
+from day_11_file_organizer.planner import PLAN_VERSION, MovePlan, build_plan
+
+
+@pytest.fixture
+def source(tmp_path):
+    root = tmp_path / "source"
+    for rel in ["a.txt", "b.jpg", "sub/a.txt", "sub/c.pdf", "sub/deep/d.mp3"]:
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(rel)
+    return root
+
+
+def _files(root):
+    return sorted(
+        os.path.relpath(os.path.join(folder, f), root)
+        for folder, _, files in os.walk(root)
+        for f in files
+    )
+
+
+def _saved(plan, tmp_path):
+    path = str(tmp_path / "saved.json")
+    plan.save(path)
+    return path
+
+
+def test_build_plan_does_not_touch_disk(source, tmp_path):
+    target = tmp_path / "target"
+    before = _files(source)
+
+    plan = build_plan(str(source), str(target))
+
+    assert _files(source) == before
+    assert not target.exists()
+    assert len(plan.moves) == 5
+    # 同名檔案在計畫階段就分配好不同的目標
+    targets = [m.target for m in plan.moves]
+    assert len(set(targets)) == len(targets)
+    assert sorted(os.path.basename(t) for t in targets if t.endswith(".txt")) == [
+        "a.txt",
+        "a_1.txt",
+    ]
+
+
+def test_json_round_trip(source, tmp_path):
+    plan = build_plan(str(source), str(tmp_path / "target"))
+    path = str(tmp_path / "plan.json")
+    plan.save(path)
+
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["version"] == PLAN_VERSION
+    loaded = MovePlan.load(path)
+
+    assert loaded == plan
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Windows 的檔名一定是合法的 Unicode")
+def test_non_utf8_names_round_trip(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "target"
+    source.mkdir()
+    raw = os.path.join(os.fsencode(source), b"caf\xe9.txt")
+    with open(raw, "wb") as f:
+        f.write(b"cafe")
+    plan = build_plan(str(source), str(target))
+
+    for name in ["plan.json", "plan.csv"]:
+        plan.save(str(tmp_path / name))
+        assert b"caf\xe9.txt" in (tmp_path / name).read_bytes()
+
+    result = apply_plan(MovePlan.load(str(tmp_path / "plan.json")))
+    assert result.success_count == 1
+    assert not os.path.exists(raw)
+
+
+def test_load_rejects_unknown_version(tmp_path):
+    path = tmp_path / "plan.json"
+    path.write_text(json.dumps({"version": PLAN_VERSION + 1, "moves": []}))
+
+    with pytest.raises(ValueError):
+        MovePlan.load(str(path))
+
+
+def test_csv_export(source, tmp_path):
+    plan = build_plan(str(source), str(tmp_path / "target"))
+    path = str(tmp_path / "plan.csv")
+    plan.save(path)
+
+    with open(path, encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+
+    assert [(r["source"], r["target"]) for r in rows] == [
+        (m.source, m.target) for m in plan.moves
+    ]
+    assert [int(r["size_bytes"]) for r in rows] == [m.size_bytes for m in plan.moves]
+
+
+def test_apply_moves_every_planned_file(source, tmp_path):
+    target = tmp_path / "target"
+    plan = build_plan(str(source), str(target))
+    os.makedirs(target)
+
+    result = apply_plan(MovePlan.load(_saved(plan, tmp_path)))
+
+    assert result.success_count == 5
+    for move in plan.moves:
+        assert not os.path.exists(move.source)
+        assert os.path.exists(move.target)
+
+
+def test_apply_renames_targets_taken_after_planning(source, tmp_path):
+    target = tmp_path / "target"
+    plan = build_plan(str(source), str(target))
+    taken = next(m.target for m in plan.moves if m.target.endswith("b.jpg"))
+    os.makedirs(os.path.dirname(taken))
+    with open(taken, "w") as f:
+        f.write("already here")
+
+    apply_plan(plan)
+
+    with open(taken) as f:
+        assert f.read() == "already here"
+    with open(os.path.join(os.path.dirname(taken), "b_1.jpg")) as f:
+        assert f.read() == "b.jpg"
+
+
+def test_cli_dry_run_then_apply(source, tmp_path, monkeypatch, capsys):
+    target = tmp_path / "target"
+    plan_file = str(tmp_path / "plan.json")
+    before = _files(source)
+
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "file-organizer",
+            "-s",
+            str(source),
+            "-t",
+            str(target),
+            "--dry-run",
+            "--plan-file",
+            plan_file,
+        ],
+    )
+    run()
+    assert _files(source) == before
+    assert not target.exists()
+
+    monkeypatch.setattr(sys, "argv", ["file-organizer", "--apply", plan_file, "-q"])
+    run()
+    capsys.readouterr()
+
+    assert _files(source) == []
+    assert len([f for f in _files(target) if f != "error.txt"]) == 5
@@ -0,0 +1,178 @@
+"""Profiler：巢狀操作的自身時間、延遲百分位與 pstats / speedscope 輸出"""
+
+import io
+import json
+import pstats
+import threading
+import types
+
+import pytest
+
+from day_11_file_organizer import profiling
+from day_11_file_organizer.profiling import NullProfiler, Profiler
+
+
+class _Clock:
+    """可手動前進的 perf_counter"""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def perf_counter(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = _Clock()
+    monkeypatch.setattr(profiling, "time", types.SimpleNamespace(perf_counter=fake.perf_counter))
+    return fake
+
+
+def _by_path(profiler):
+    return {stats.path: stats for stats in profiler.snapshot()}
+
+
+def _nested_run(clock):
+    profiler = Profiler()
+    with profiler.phase("move"):
+        for _ in range(2):
+            with profiler.op("classify"):
+                clock.advance(1.0)
+                with profiler.op("scan"):
+                    clock.advance(3.0)
+                clock.advance(1.0)
+        with profiler.op("rename", nbytes=4096):
+            clock.advance(0.5)
+    return profiler
+
+
+def test_nested_ops_subtract_from_self_time(clock):
+    ops = _by_path(_nested_run(clock))
+
+    classify = ops[("move", "classify")]
+    assert classify.calls == 2
+    assert classify.total_seconds == pytest.approx(10.0)
+    assert classify.self_seconds == pytest.approx(4.0)
+
+    scan = ops[("move", "classify", "scan")]
+    assert scan.total_seconds == pytest.approx(6.0)
+    assert scan.self_seconds == pytest.approx(6.0)
+
+    phase = ops[("move",)]
+    assert phase.total_seconds == pytest.approx(10.5)
+    assert phase.self_seconds == pytest.approx(0.0)
+    assert ops[("move", "rename")].bytes == 4096
+    # 父節點排在子節點之前
+    assert list(ops) == [
+        ("move",),
+        ("move", "classify"),
+        ("move", "classify", "scan"),
+        ("move", "rename"),
+    ]
+
+
+def test_worker_thread_ops_belong_to_the_current_phase(clock):
+    profiler = Profiler()
+
+    def work():
+        with profiler.op("copy"):
+            clock.advance(2.0)
+
+    with profiler.phase("move"):
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+
+    ops = _by_path(profiler)
+    assert ops[("move", "copy")].total_seconds == pytest.approx(2.0)
+    # 其他執行緒的操作不從階段的自身時間扣除
+    assert ops[("move",)].self_seconds == pytest.approx(2.0)
+
+
+def test_iterate_times_each_next(clock):
+    profiler = Profiler()
+
+    def slow():
+        for i in range(3):
+            clock.advance(0.25)
+            yield i
+
+    assert list(profiler.iterate(slow(), "scan")) == [0, 1, 2]
+    scan = _by_path(profiler)[("scan",)]
+    # 最後一次取得 StopIteration 也算一次
+    assert scan.calls == 4
+    assert scan.total_seconds == pytest.approx(0.75)
+
+
+def test_histogram_percentiles(clock):
+    profiler = Profiler()
+    for i in range(100):
+        with profiler.op("stat"):
+            clock.advance(1000e-6 if i % 10 == 9 else 10e-6)
+
+    stat = _by_path(profiler)[("stat",)]
+    assert sum(stat.histogram) == 100
+    # 10 微秒落在 [8, 16) 微秒的桶，1 毫秒落在 [512, 1024) 微秒的桶
+    assert stat.percentile(50) == pytest.approx(16e-6)
+    assert stat.percentile(90) == pytest.approx(16e-6)
+    assert stat.percentile(99) == pytest.approx(1000e-6)
+    assert stat.max_seconds == pytest.approx(1000e-6)
+
+
+def test_pstats_output_loads(clock, tmp_path):
+    profiler = _nested_run(clock)
+    path = tmp_path / "run.prof"
+    profiler.save(str(path))
+
+    stats = pstats.Stats(str(path), stream=io.StringIO())
+    scan = stats.stats[("file-organizer", 0, "scan")]
+    classify = stats.stats[("file-organizer", 0, "classify")]
+    assert scan[:2] == (2, 2)
+    assert scan[2] == pytest.approx(6.0)
+    assert classify[3] == pytest.approx(10.0)
+    assert ("file-organizer", 0, "classify") in scan[4]
+    assert stats.total_tt == pytest.approx(10.5)
+
+    stats.sort_stats("cumulative").print_stats()
+    assert "classify" in stats.stream.getvalue()
+
+
+def test_speedscope_output(clock, tmp_path):
+    profiler = _nested_run(clock)
+    path = tmp_path / "run.speedscope.json"
+    profiler.save(str(path))
+
+    data = json.loads(path.read_text(encoding="utf-8"))
+    frames = [frame["name"] for frame in data["shared"]["frames"]]
+    profile = data["profiles"][0]
+    stacks = [tuple(frames[i] for i in sample) for sample in profile["samples"]]
+
+    assert profile["type"] == "sampled"
+    assert stacks == [stats.path for stats in profiler.snapshot()]
+    assert profile["weights"] == pytest.approx([0.0, 4.0, 6.0, 0.5])
+    assert profile["endValue"] == pytest.approx(10.5)
+
+
+def test_json_output(clock, tmp_path):
+    profiler = _nested_run(clock)
+    path = tmp_path / "run.json"
+    profiler.save(str(path))
+
+    data = json.loads(path.read_text(encoding="utf-8"))
+    rename = data["operations"][-1]
+    assert rename["path"] == ["move", "rename"]
+    assert rename["bytes"] == 4096
+    assert sum(rename["histogram_us"].values()) == 1
+
+
+def test_null_profiler_is_transparent():
+    profiler = NullProfiler()
+    items = [1, 2, 3]
+
+    with profiler.phase("move"), profiler.op("scan"):
+        pass
+    assert profiler.iterate(items, "scan") is items
@@ -0,0 +1,119 @@
+"""ProgressTracker：以固定頻率重繪的進度，逐檔訊息只寫入記錄檔"""
+
+import io
+import os
+import threading
+import time
+
+from rich.console import Console
+
+from day_11_file_organizer.progress import (
+    NullProgress,
+    ProgressTracker,
+    _format_duration,
+    create_progress,
+)
+
+
+def _console():
+    return Console(file=io.StringIO(), force_terminal=True, width=100)
+
+
+def test_create_progress_picks_sink(tmp_path):
+    console = _console()
+
+    assert isinstance(create_progress(console, quiet=True), NullProgress)
+
+    quiet_with_log = create_progress(console, quiet=True, log_path=str(tmp_path / "log.txt"))
+    assert isinstance(quiet_with_log, ProgressTracker)
+    assert quiet_with_log._live is None
+    assert quiet_with_log.logging
+    quiet_with_log.__exit__(None, None, None)
+
+    assert isinstance(create_progress(console), ProgressTracker)
+
+
+def test_counters_from_many_threads():
+    tracker = ProgressTracker(_console(), live=False)
+    tracker.expect(4000)
+
+    def work():
+        for i in range(1000):
+            tracker.advance(10, "pdf" if i % 2 else "jpg")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    with tracker:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        tracker.fail("broken.txt")
+
+    assert tracker.total == 4000
+    assert tracker.done == 4001
+    assert tracker.failed == 1
+    assert tracker.bytes == 40000
+    assert tracker.type_counts == {"pdf": 2000, "jpg": 2000}
+
+
+def test_messages_go_only_to_the_log_file(tmp_path):
+    console = _console()
+    log_path = tmp_path / "progress.log"
+
+    with ProgressTracker(console, log_path=str(log_path), live=False) as tracker:
+        tracker.log("a.txt -> 2024/txt/a.txt")
+        tracker.fail("b.txt: 權限不足")
+
+    assert log_path.read_text(encoding="utf-8").splitlines() == [
+        "a.txt -> 2024/txt/a.txt",
+        "失敗: b.txt: 權限不足",
+    ]
+    assert console.file.getvalue() == ""
+    assert not tracker.logging
+
+
+def test_log_file_keeps_non_utf8_names(tmp_path):
+    log_path = tmp_path / "progress.log"
+    name = os.fsdecode(b"caf\xe9.txt")
+
+    with ProgressTracker(_console(), log_path=str(log_path), live=False) as tracker:
+        tracker.log(f"{name} -> 2024/txt/{name}")
+        tracker.fail(f"{name}: 權限不足")
+
+    assert log_path.read_bytes().decode("utf-8", "surrogateescape").splitlines() == [
+        f"{name} -> 2024/txt/{name}",
+        f"失敗: {name}: 權限不足",
+    ]
+
+
+def test_redraws_do_not_scale_with_file_count(monkeypatch):
+    renders = []
+    original = ProgressTracker.__rich__
+
+    def counting(self):
+        renders.append(time.monotonic())
+        return original(self)
+
+    monkeypatch.setattr(ProgressTracker, "__rich__", counting)
+    console = _console()
+    tracker = ProgressTracker(console)
+    tracker.expect(20000)
+
+    start = time.monotonic()
+    with tracker:
+        for _ in range(20000):
+            tracker.advance(1024, "pdf")
+        time.sleep(0.3)
+    elapsed = time.monotonic() - start
+
+    # 每秒最多重繪 REFRESH_PER_SECOND 次，另加開始與結束各一次
+    assert len(renders) <= elapsed * 4 + 3
+    output = console.file.getvalue()
+    assert "20,000 / 20,000" in output
+    assert "pdf 20,000" in output
+
+
+def test_format_duration():
+    assert _format_duration(0) == "00:00"
+    assert _format_duration(75.9) == "01:15"
+    assert _format_duration(3 * 3600 + 62) == "3:01:02"
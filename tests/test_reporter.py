@@ -0,0 +1,86 @@
+"""完整羞辱報告（--full-report）：各年份、各類型前 K 大與最古老的檔案"""
+
+import io
+import random
+from datetime import datetime
+
+from rich.console import Console
+
+from day_11_file_organizer.models import ClassifyResult, FileStats
+from day_11_file_organizer.reporter import ReportPrinter
+
+
+def _sample(count=500, seed=3):
+    rng = random.Random(seed)
+    files = []
+    for i in range(count):
+        year = rng.randint(2010, 2024)
+        file_type = rng.choice(["pdf", "jpg", "txt", "mp4", "zip"])
+        files.append(
+            FileStats(
+                original_path=f"/src/file{i}.{file_type}",
+                filename=f"file{i}.{file_type}",
+                # 大小重複很多，檢查同大小時先到的排前面
+                size_bytes=rng.randint(1, 50) * 1024,
+                modified_time=datetime(year, rng.randint(1, 12), rng.randint(1, 28)),
+                year=year,
+                file_type=file_type,
+                success=i % 13 != 0,
+            )
+        )
+    return files
+
+
+def _top(files, k):
+    return sorted(files, key=lambda f: -f.size_bytes)[:k]
+
+
+def _result(files, k):
+    result = ClassifyResult(detail_k=k)
+    for stats in files:
+        result.add(stats)
+    return result
+
+
+def test_top_k_matches_a_full_sort():
+    files = _sample()
+    ok = [f for f in files if f.success]
+    result = _result(files, 3)
+
+    years = sorted({f.year for f in ok})
+    assert list(result.top_files_by_year) == years
+    for year in years:
+        assert result.top_files_by_year[year] == _top([f for f in ok if f.year == year], 3)
+
+    assert list(result.top_files_by_type) == list(result.type_distribution)
+    for file_type, top in result.top_files_by_type.items():
+        assert top == _top([f for f in ok if f.file_type == file_type], 3)
+
+    assert result.oldest_files == sorted(ok, key=lambda f: f.modified_time)[:3]
+
+
+def test_detail_disabled_by_default():
+    result = _result(_sample(50), 0)
+
+    assert result.top_files_by_year == {}
+    assert result.top_files_by_type == {}
+    assert result.oldest_files == []
+
+
+def test_full_report_prints_every_group():
+    files = _sample(200)
+    result = _result(files, 2)
+    printer = ReportPrinter()
+    printer.console = Console(file=io.StringIO(), width=200)
+
+    printer.print_report(result)
+
+    output = printer.console.file.getvalue()
+    assert "各年份前 2 大檔案" in output
+    assert "各類型前 2 大檔案" in output
+    assert "最古老的 2 個檔案" in output
+    for top in result.top_files_by_year.values():
+        for f in top:
+            assert f.filename in output
+    for f in result.oldest_files:
+        assert f.modified_time.strftime("%Y-%m-%d") in output
@@ -0,0 +1,93 @@
+"""RoastGenerator：預先編譯的關鍵字自動機與可指定種子的批次吐槽"""
+
+import random
+from datetime import datetime
+
+from day_11_file_organizer.models import FileStats
+from day_11_file_organizer.roast import KeywordAutomaton, RoastGenerator
+
+
+def _file(filename, year=None, size_mb=0.0, file_type="txt"):
+    year = year or datetime.now().year
+    return FileStats(
+        original_path=f"/src/{filename}",
+        filename=filename,
+        size_bytes=int(size_mb * 1024 * 1024),
+        modified_time=datetime(year, 1, 1),
+        year=year,
+        file_type=file_type,
+        success=True,
+    )
+
+
+def _candidates(file):
+    """逐條比對的參考實作：所有可能被選中的吐槽"""
+    gen = RoastGenerator
+    candidates = []
+    for keyword, messages in gen.FILENAME_ROASTS.items():
+        if keyword.lower() in file.filename.lower():
+            candidates.extend(messages)
+    for min_age in sorted(gen.AGE_ROASTS, reverse=True):
+        if file.age_years >= min_age:
+            candidates.extend(gen.AGE_ROASTS[min_age])
+            break
+    for min_size in sorted(gen.SIZE_ROASTS, reverse=True):
+        if file.size_mb >= min_size:
+            candidates.extend(gen.SIZE_ROASTS[min_size])
+            break
+    candidates.extend(gen.TYPE_ROASTS.get(file.file_type.lower(), []))
+    return set(candidates) or set(gen.DEFAULT_ROASTS)
+
+
+def test_automaton_finds_overlapping_keywords():
+    automaton = KeywordAutomaton(["he", "she", "his", "hers", "最終", "最終版"])
+
+    assert automaton.search("ushers") == [0, 1, 3]
+    assert automaton.search("報告_最終版.doc") == [4, 5]
+    assert automaton.search("nothing here") == [0]
+    assert automaton.search("xyz") == []
+    assert KeywordAutomaton([]).search("anything") == []
+
+
+def test_automaton_matches_substring_search():
+    rng = random.Random(7)
+    alphabet = "abc最終版"
+    keywords = sorted({"".join(rng.choices(alphabet, k=rng.randint(1, 4))) for _ in range(30)})
+    automaton = KeywordAutomaton(keywords)
+
+    for _ in range(500):
+        text = "".join(rng.choices(alphabet, k=rng.randint(0, 20)))
+        expected = [i for i, keyword in enumerate(keywords) if keyword in text]
+        assert automaton.search(text) == expected
+
+
+def test_roasts_come_from_the_same_candidates():
+    year = datetime.now().year
+    files = [
+        _file("最終版_final_copy.PPT", year - 11, 600, "ppt"),
+        _file("Untitled 備份.xlsx", year - 6, 60, "xls"),
+        _file("notes.txt"),
+        _file("temp.zip", year - 3, 25, "zip"),
+    ]
+
+    for file in files:
+        expected = _candidates(file)
+        seen = {RoastGenerator(seed=seed).generate_roast(file) for seed in range(300)}
+        assert seen <= expected
+        # 候選句子不多，三百個種子應該都選得到
+        assert seen == expected
+
+
+def test_seeded_batch_matches_single_calls():
+    year = datetime.now().year
+    files = [
+        _file(f"{name}_{i}.doc", year - i % 12, i * 7 % 700, "doc")
+        for i, name in enumerate(["report", "final", "test", "備份", "plain"] * 20)
+    ]
+
+    batch = list(RoastGenerator(seed=42).generate_roasts(files))
+    single = RoastGenerator(seed=42)
+
+    assert batch == [single.generate_roast(file) for file in files]
+    assert batch == list(RoastGenerator(rng=random.Random(42)).generate_roasts(files))
+    assert batch != list(RoastGenerator(seed=43).generate_roasts(files))
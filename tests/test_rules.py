@@ -0,0 +1,178 @@
+"""RuleSet：編譯後的規則與逐條比對的結果相同"""
+
+import os
+import random
+import re
+import string
+import sys
+
+import pytest
+
+from day_11_file_organizer.rules import RuleSet, parse_age, parse_size
+
+
+def _naive_file_type(rules, sizes, filename, size):
+    """對照組：依規則檔順序逐條比對，再依大小門檻（由小到大）與副檔名"""
+    for rule in rules.patterns:
+        if re.match(rule.regex, filename):
+            return rule.file_type
+    matching = [file_type for min_size, file_type in sizes if size >= min_size]
+    if matching:
+        return matching[-1]
+    ext = os.path.splitext(filename)[1].lower()
+    if ext in rules.extensions:
+        return rules.extensions[ext]
+    return sys.intern(ext[1:]) if ext else "other"
+
+
+def _random_rules(rng):
+    words = ["img", "IMG_", "report", "Screenshot", "inv", "data", "備份", "a", "dsc"]
+    patterns = []
+    for i in range(120):
+        word = rng.choice(words) + "".join(rng.choices(string.ascii_letters, k=rng.randint(0, 2)))
+        kind = i % 6
+        if kind == 0:
+            patterns.append({"type": f"t{i}", "glob": f"*{word}*"})
+        elif kind == 1:
+            regex = f".*{re.escape(word)}(\\d|x)+"
+            patterns.append({"type": f"t{i}", "regex": regex, "ignore_case": True})
+        elif kind == 2:
+            patterns.append({"type": f"t{i}", "glob": f"?{word}*.[jp]*"})
+        else:
+            patterns.append({"type": f"t{i}", "glob": f"{word}*", "ignore_case": i % 4 == 0})
+    return {
+        "types": {"pictures": ["jpg", "png"], "custom": ["xyz"]},
+        "patterns": patterns,
+        "sizes": [{"min_size": "1KB", "type": "small"}, {"min_size": "1MB", "type": "big"}],
+    }
+
+
+def _random_names(rng, count):
+    prefixes = ["IMG_", "img", "DSC", "report_", "Screenshot ", "invoice-", "data", "備份_", "x", ""]
+    exts = [".jpg", ".PNG", ".pdf", ".xyz", ".tar.gz", ""]
+    return [
+        f"{rng.choice(prefixes)}{rng.choice(['', 'a', 'Inv', 'REPORT'])}"
+        f"{rng.randrange(1000)}{rng.choice(exts)}"
+        for _ in range(count)
+    ]
+
+
+def test_compiled_rules_match_naive_loop():
+    rng = random.Random(1234)
+    data = _random_rules(rng)
+    rules = RuleSet.from_dict(data)
+    sizes = sorted((parse_size(rule["min_size"]), rule["type"]) for rule in data["sizes"])
+
+    for name in _random_names(rng, 5000):
+        size = rng.choice([0, 100, 2048, 5 * 1024**2])
+        assert rules.file_type(name, size) == _naive_file_type(rules, sizes, name, size), name
+
+
+def test_first_matching_rule_wins():
+    rules = RuleSet.from_dict(
+        {
+            "patterns": [
+                {"type": "contains", "glob": "*shot*"},
+                {"type": "prefix", "glob": "Screen*"},
+                {"type": "regex", "regex": ".*\\d+"},
+            ]
+        }
+    )
+
+    assert rules.file_type("Screenshot 1.png", 0) == "contains"
+    assert rules.file_type("Screen 1.png", 0) == "prefix"
+    assert rules.file_type("photo 1.png", 0) == "regex"
+    assert rules.file_type("photo.png", 0) == "png"
+
+
+def test_user_groups_do_not_shift_rule_markers():
+    rules = RuleSet.from_dict(
+        {
+            "patterns": [
+                {"type": "grouped", "regex": "(ab|cd)(\\d)+x"},
+                {"type": "after", "glob": "ab*"},
+            ]
+        }
+    )
+
+    assert rules.file_type("ab12x.txt", 0) == "grouped"
+    assert rules.file_type("ab.txt", 0) == "after"
+
+
+@pytest.mark.parametrize("regex", ["(a)\\1", "(a)?(?(1)b|c)", "[^]]\\1"])
+def test_rejects_numbered_group_references(regex):
+    with pytest.raises(ValueError):
+        RuleSet.from_dict({"patterns": [{"type": "x", "regex": regex}]})
+
+
+@pytest.mark.parametrize("regex", ["(a)[\\1]", "[]\\1]x", "a\\\\1"])
+def test_allows_escapes_that_are_not_references(regex):
+    RuleSet.from_dict({"patterns": [{"type": "x", "regex": regex}]})
+
+
+@pytest.mark.parametrize("regex", ["(?i)invoice", "a(?x) b", "(?s).*"])
+def test_rejects_global_flags_naming_the_rule(regex):
+    with pytest.raises(ValueError, match="invoices"):
+        RuleSet.from_dict(
+            {
+                "patterns": [
+                    {"type": "screenshots", "glob": "Screenshot*"},
+                    {"type": "invoices", "regex": regex},
+                ]
+            }
+        )
+
+
+def test_scoped_flags_are_allowed():
+    rules = RuleSet.from_dict({"patterns": [{"type": "invoices", "regex": "(?i:invoice)\\d+"}]})
+    assert rules.file_type("INVOICE12.pdf", 0) == "invoices"
+
+
+def test_rejects_named_groups():
+    with pytest.raises(ValueError):
+        RuleSet.from_dict({"patterns": [{"type": "x", "regex": "(?P<n>a)b"}]})
+
+
+@pytest.mark.parametrize("name", ["/etc", "../escape", "a/b", ".", "..", os.path.abspath("x")])
+@pytest.mark.parametrize(
+    "make",
+    [
+        lambda name: {"types": {name: ["foo"]}},
+        lambda name: {"patterns": [{"type": name, "glob": "*.foo"}]},
+        lambda name: {"sizes": [{"min_size": "1MB", "type": name}]},
+        lambda name: {"ages": [{"older_than": "1y", "folder": name}]},
+    ],
+)
+def test_rejects_names_that_are_not_a_single_folder(make, name):
+    with pytest.raises(ValueError, match="一層資料夾"):
+        RuleSet.from_dict(make(name))
+
+
+def test_age_folders():
+    now = 1_000_000_000.0
+    rules = RuleSet(ages=[(parse_age("1y"), "old"), (parse_age("5y"), "ancient")], now=now)
+
+    assert rules.folder(2024, now - 10 * 86400) == "2024"
+    assert rules.folder(2020, now - 2 * 365 * 86400) == "old"
+    assert rules.folder(2010, now - 10 * 365 * 86400) == "ancient"
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (500, 500),
+        ("500", 500),
+        ("1KB", 1024),
+        ("1.5 gb", int(1.5 * 1024**3)),
+        ("2M", 2 * 1024**2),
+    ],
+)
+def test_parse_size(value, expected):
+    assert parse_size(value) == expected
+
+
+def test_parse_invalid():
+    with pytest.raises(ValueError):
+        parse_size("lots")
+    with pytest.raises(ValueError):
+        parse_age("3 fortnights")
@@ -0,0 +1,86 @@
+"""scan_files：與 os.walk + os.stat 相同的檔案、順序與 stat 結果"""
+
+import os
+
+from day_11_file_organizer.scanner import scan_files, stat_entry
+
+
+def _make_tree(root):
+    """建立有多層子資料夾、隱藏檔案與隱藏資料夾的來源樹"""
+    files = [
+        "a.txt",
+        "b.jpg",
+        ".hidden.txt",
+        "docs/report.pdf",
+        "docs/2023/old.pdf",
+        "docs/2023/deeper/x.md",
+        "photos/c.png",
+        "photos/d.png",
+        ".git/config",
+        "photos/.cache/thumb.png",
+        "empty_sibling/z.bin",
+    ]
+    for rel in files:
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x" * len(rel))
+    (root / "empty").mkdir()
+
+
+def _walk_files(source):
+    """原本的做法：os.walk（topdown）+ os.stat，略過隱藏檔案與資料夾"""
+    paths = []
+    for folder, dirs, files in os.walk(source):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        paths.extend(os.path.join(folder, f) for f in files if not f.startswith("."))
+    return paths
+
+
+def test_same_files_and_order_as_os_walk(tmp_path):
+    _make_tree(tmp_path)
+    source = str(tmp_path)
+
+    assert [e.path for e in scan_files(source)] == _walk_files(source)
+
+
+def test_entries_match_os_stat(tmp_path):
+    _make_tree(tmp_path)
+
+    entries = list(scan_files(str(tmp_path)))
+    assert entries
+    for entry in entries:
+        st = os.stat(entry.path)
+        assert entry.error is None
+        assert entry.name == os.path.basename(entry.path)
+        assert entry.parent == os.path.dirname(entry.path)
+        assert (entry.size, entry.mtime, entry.dev, entry.ino) == (
+            st.st_size,
+            st.st_mtime,
+            st.st_dev,
+            st.st_ino,
+        )
+
+
+def test_skips_hidden_and_symlinked_dirs(tmp_path):
+    _make_tree(tmp_path)
+    outside = tmp_path.parent / (tmp_path.name + "_outside")
+    outside.mkdir()
+    (outside / "linked.txt").write_text("x")
+    (tmp_path / "link").symlink_to(outside, target_is_directory=True)
+
+    names = {e.name for e in scan_files(str(tmp_path))}
+    assert "linked.txt" not in names
+    assert ".hidden.txt" not in names
+    assert "config" not in names
+    assert "thumb.png" not in names
+    assert {"a.txt", "x.md", "z.bin"} <= names
+
+
+def test_unreadable_source_yields_nothing(tmp_path):
+    assert list(scan_files(str(tmp_path / "missing"))) == []
+
+
+def test_stat_entry_reports_errors(tmp_path):
+    entry = stat_entry(str(tmp_path), "missing.txt")
+    assert isinstance(entry.error, FileNotFoundError)
+    assert entry.path == str(tmp_path / "missing.txt")
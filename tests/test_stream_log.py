@@ -0,0 +1,58 @@
+"""串流模式（--stream-log）：逐檔記錄附加寫入記錄檔，記憶體只保留統計"""
+
+import csv
+import json
+import os
+import sys
+
+import pytest
+
+from day_11_file_organizer.main import classify_files_by_year_and_type, run
+
+# 不是合法 UTF-8 的檔名（os.fsdecode 以 surrogateescape 解碼）
+RAW_NAME = b"caf\xe9.pdf"
+
+pytestmark = pytest.mark.skipif(
+    sys.platform == "win32", reason="Windows 的檔名一定是合法的 Unicode"
+)
+
+
+def _make_files(folder, names):
+    for name in names:
+        path = os.path.join(os.fsencode(folder), name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(name)
+
+
+def test_stream_log_keeps_non_utf8_names(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "target"
+    _make_files(source, [RAW_NAME, b"sub/b.jpg"])
+    log = tmp_path / "records.jsonl"
+
+    result = classify_files_by_year_and_type(str(source), str(target), stream_log=str(log))
+
+    assert result.success_count == 2
+    assert len(result.files) == 0
+    with open(log, encoding="utf-8", errors="surrogateescape") as f:
+        records = [json.loads(line) for line in f]
+    assert sorted(r["filename"] for r in records) == ["b.jpg", os.fsdecode(RAW_NAME)]
+
+
+def test_cli_stream_log_csv_appends_across_runs(tmp_path, monkeypatch):
+    source, target = tmp_path / "source", tmp_path / "target"
+    log = tmp_path / "records.csv"
+    argv = [
+        "file-organizer", "-s", str(source), "-t", str(target), "--stream-log", str(log), "-q",
+    ]
+    monkeypatch.setattr(sys, "argv", argv)
+
+    _make_files(source, [RAW_NAME])
+    run()
+    _make_files(source, [b"b.jpg"])
+    run()
+
+    with open(log, encoding="utf-8", errors="surrogateescape", newline="") as f:
+        rows = list(csv.reader(f))
+    assert [row[1] for row in rows] == ["filename", os.fsdecode(RAW_NAME), "b.jpg"]
+    assert RAW_NAME in log.read_bytes()
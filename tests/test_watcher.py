@@ -0,0 +1,219 @@
+"""監看模式：inotify / 輪詢事件、等檔案寫完的 Debouncer 與 watch_folder"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from day_11_file_organizer.filters import ScanFilter
+from day_11_file_organizer.main import watch_folder
+from day_11_file_organizer.watcher import (
+    CLOSED,
+    REMOVED,
+    WRITING,
+    Debouncer,
+    InotifyWatcher,
+    PollingWatcher,
+)
+
+linux_only = pytest.mark.skipif(
+    not sys.platform.startswith("linux"), reason="inotify 只支援 Linux"
+)
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def _collect(watcher, until, timeout=3.0):
+    """持續讀取事件，直到 until(events) 成立"""
+    events = []
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and not until(events):
+        events.extend(watcher.read(0.1))
+    return events
+
+
+def test_debouncer_waits_for_a_stable_stat(tmp_path):
+    path = tmp_path / "a.txt"
+    path.write_text("a")
+    debouncer = Debouncer(settle=1.0)
+
+    debouncer.add(str(path), CLOSED, now=0.0)
+    assert debouncer.next_deadline() == 1.0
+    assert debouncer.pop_ready(0.5) == []
+    # 第一次檢查只記錄 stat，再過 settle 秒沒變才放行
+    assert debouncer.pop_ready(1.0) == []
+    assert debouncer.pop_ready(2.0) == [str(path)]
+    assert len(debouncer) == 0
+
+
+def test_debouncer_restarts_when_the_file_changes(tmp_path):
+    path = tmp_path / "a.txt"
+    path.write_text("a")
+    debouncer = Debouncer(settle=1.0)
+
+    debouncer.add(str(path), CLOSED, now=0.0)
+    assert debouncer.pop_ready(1.0) == []
+    path.write_text("grown")
+    assert debouncer.pop_ready(2.0) == []
+    assert debouncer.pop_ready(3.0) == [str(path)]
+
+
+def test_debouncer_holds_files_still_being_written(tmp_path):
+    path = tmp_path / "a.txt"
+    path.write_text("a")
+    debouncer = Debouncer(settle=1.0)
+
+    debouncer.add(str(path), WRITING, now=0.0)
+    assert debouncer.next_deadline() is None
+    assert debouncer.pop_ready(10.0) == []
+
+    debouncer.add(str(path), CLOSED, now=10.0)
+    assert debouncer.pop_ready(11.0) == []
+    assert debouncer.pop_ready(12.0) == [str(path)]
+
+    debouncer.add(str(path), CLOSED, now=20.0)
+    debouncer.add(str(path), REMOVED, now=20.5)
+    assert len(debouncer) == 0
+    assert debouncer.next_deadline() is None
+
+
+@linux_only
+def test_debouncer_skips_files_open_for_writing(tmp_path):
+    path = tmp_path / "a.txt"
+    path.write_text("a")
+    debouncer = Debouncer(settle=1.0)
+
+    with open(path, "a"):
+        debouncer.add(str(path), CLOSED, now=0.0)
+        assert debouncer.pop_ready(1.0) == []
+        assert debouncer.pop_ready(2.0) == []
+    assert debouncer.pop_ready(3.0) == [str(path)]
+
+
+def test_polling_watcher_reports_differences(tmp_path):
+    (tmp_path / "old.txt").write_text("old")
+    (tmp_path / "gone.txt").write_text("gone")
+    (tmp_path / "out").mkdir()
+    watcher = PollingWatcher(str(tmp_path), exclude=[str(tmp_path / "out")], interval=0.01)
+
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "new.txt").write_text("new")
+    (tmp_path / "old.txt").write_text("changed")
+    (tmp_path / "gone.txt").unlink()
+    (tmp_path / "out" / "moved.txt").write_text("moved")
+
+    events = set(watcher.read(1.0))
+    assert events == {
+        (str(tmp_path / "sub" / "new.txt"), CLOSED),
+        (str(tmp_path / "old.txt"), CLOSED),
+        (str(tmp_path / "gone.txt"), REMOVED),
+    }
+    assert watcher.read(1.0) == []
+
+
+def _make_pruned_tree(root):
+    """隱藏資料夾、篩選條件排除的資料夾與超過最大深度的資料夾"""
+    for folder in [".git/objects", "node_modules/pkg", "a/b/c", "keep"]:
+        (root / folder).mkdir(parents=True)
+    return ScanFilter(exclude=["node_modules/"], max_depth=2)
+
+
+def test_polling_watcher_skips_pruned_folders(tmp_path, monkeypatch):
+    scan_filter = _make_pruned_tree(tmp_path)
+    listed = []
+    real = os.scandir
+
+    def counting(path):
+        listed.append(os.path.relpath(path, tmp_path))
+        return real(path)
+
+    monkeypatch.setattr(os, "scandir", counting)
+    watcher = PollingWatcher(str(tmp_path), interval=0.01, scan_filter=scan_filter)
+    assert sorted(listed) == [".", "a", "a/b", "keep"]
+
+    for folder in [".git/objects", "node_modules/pkg", "a/b/c", "keep"]:
+        (tmp_path / folder / "new.txt").write_text("new")
+    assert watcher.read(1.0) == [(str(tmp_path / "keep" / "new.txt"), CLOSED)]
+
+
+@linux_only
+def test_inotify_skips_pruned_folders(tmp_path):
+    scan_filter = _make_pruned_tree(tmp_path)
+    with InotifyWatcher(str(tmp_path), scan_filter=scan_filter) as watcher:
+        watched = sorted(os.path.relpath(path, tmp_path) for path in watcher._dirs.values())
+        assert watched == [".", "a", "a/b", "keep"]
+
+        # 之後才建立的隱藏資料夾與排除的資料夾也不加入 watch
+        (tmp_path / ".cache").mkdir()
+        (tmp_path / "keep" / "node_modules").mkdir()
+        expected = (str(tmp_path / "keep" / "new.txt"), CLOSED)
+        (tmp_path / "keep" / "new.txt").write_text("new")
+        events = _collect(watcher, lambda ev: expected in ev)
+
+        assert expected in events
+        assert len(watcher._dirs) == 4
+
+
+@linux_only
+def test_inotify_reports_new_files_and_folders(tmp_path):
+    (tmp_path / "out").mkdir()
+    with InotifyWatcher(str(tmp_path), exclude=[str(tmp_path / "out")]) as watcher:
+        (tmp_path / "a.txt").write_text("a")
+        (tmp_path / "out" / "ignored.txt").write_text("x")
+        # 先在別處建好再整個搬進來：加入 watch 前已存在的檔案也要回報
+        staging = tmp_path.parent / f"{tmp_path.name}-staging"
+        (staging / "deep").mkdir(parents=True)
+        (staging / "deep" / "b.txt").write_text("b")
+        os.rename(staging, tmp_path / "moved")
+
+        expected = {str(tmp_path / "a.txt"), str(tmp_path / "moved" / "deep" / "b.txt")}
+        events = _collect(
+            watcher, lambda ev: expected <= {p for p, kind in ev if kind == CLOSED}
+        )
+
+        assert expected <= {path for path, kind in events if kind == CLOSED}
+        assert not any("ignored" in path for path, _ in events)
+
+        later = (str(tmp_path / "moved" / "deep" / "c.txt"), CLOSED)
+        (tmp_path / "moved" / "deep" / "c.txt").write_text("c")
+        assert later in _collect(watcher, lambda ev: later in ev)
+
+
+def test_watch_folder_organizes_existing_and_new_files(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "source" / "organized"
+    source.mkdir()
+    (source / "existing.pdf").write_text("existing")
+    stop = threading.Event()
+    results = []
+
+    thread = threading.Thread(
+        target=lambda: results.append(
+            watch_folder(str(source), str(target), settle=0.05, poll_interval=0.05, stop=stop)
+        )
+    )
+    thread.start()
+    try:
+        assert _wait_for(lambda: not (source / "existing.pdf").exists())
+        (source / "sub").mkdir()
+        (source / "sub" / "new.jpg").write_text("new")
+        (source / ".hidden.txt").write_text("hidden")
+        assert _wait_for(lambda: not (source / "sub" / "new.jpg").exists())
+    finally:
+        stop.set()
+        thread.join(timeout=10)
+
+    moved = sorted(
+        name for _, _, files in os.walk(target) for name in files if not name.startswith(".")
+    )
+    assert moved == ["existing.pdf", "new.jpg"]
+    assert (source / ".hidden.txt").exists()
+    assert results[0].success_count == 2